@@ -0,0 +1,236 @@
+"""
+LLM Server Backends for ConvAi-IntroEval
+
+The pipeline builds every request in Ollama's /api/generate shape (model,
+prompt, options, format, stream, keep_alive) and reads every response in
+that shape ("response", "done", "prompt_eval_count", "eval_count", ...).
+A backend translates both directions for one kind of server, so the
+prompts, parsing and queue code stay the same whichever server runs the
+model:
+- ollama    Ollama's native API (default)
+- llamacpp  llama.cpp's llama-server (/completion)
+- openai    any OpenAI-compatible server exposing /v1/completions
+            (vLLM, LM Studio, llama-server, Ollama's /v1, ...)
+
+Environment:
+    LLM_BACKEND   ollama|llamacpp|openai (default ollama)
+    LLM_API_KEY   bearer token for OpenAI-compatible servers that require one
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+LLM_BACKEND = os.environ.get("LLM_BACKEND", "ollama").lower()
+LLM_API_KEY = os.environ.get("LLM_API_KEY", "")
+PROBE_TIMEOUT_SECONDS = 5
+PRELOAD_TIMEOUT_SECONDS = 300  # First load reads the weights from disk
+
+
+class OllamaBackend:
+    """Ollama's native API - requests and responses pass through unchanged"""
+    name = "ollama"
+    health_path = "/api/tags"
+    # prompt_eval_count excludes prefix tokens reused from the KV cache
+    reports_cached_prefix = True
+
+    def headers(self) -> Dict[str, str]:
+        return {}
+
+    def generate_request(self, payload: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Return the request path and body for a generate payload"""
+        return "/api/generate", payload
+
+    def parse_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return data
+
+    def parse_stream_line(self, line: bytes) -> Optional[Dict[str, Any]]:
+        """Parse one streamed line into a response-shaped chunk (None to skip it)"""
+        return json.loads(line)
+
+    def model_digest(self, session: requests.Session, base_url: str, model: str) -> Optional[str]:
+        """Identify the exact model weights served, for the response cache"""
+        response = session.get(f"{base_url}/api/tags", timeout=PROBE_TIMEOUT_SECONDS)
+        if response.status_code != 200:
+            return None
+        for entry in response.json().get("models", []):
+            name = entry.get("name", "")
+            if name == model or (name.endswith(":latest") and name.split(":")[0] == model):
+                return entry.get("digest")
+        return None
+
+    def preload(self, base_url: str, model: str, keep_alive: str) -> bool:
+        """Load the model without generating; Ollama treats a prompt-less generate as a load request"""
+        response = requests.post(
+            f"{base_url}/api/generate",
+            json={"model": model, "keep_alive": keep_alive},
+            timeout=PRELOAD_TIMEOUT_SECONDS
+        )
+        return response.status_code == 200
+
+    def resident_models(self, base_url: str, model: str) -> List[str]:
+        """Models the server currently holds in memory"""
+        response = requests.get(f"{base_url}/api/ps", timeout=2)
+        if response.status_code != 200:
+            return []
+        return [entry.get("name", "") for entry in response.json().get("models", [])]
+
+
+class LlamaCppBackend(OllamaBackend):
+    """llama.cpp's llama-server; it serves the one model it was started with"""
+    name = "llamacpp"
+    health_path = "/health"
+    reports_cached_prefix = True  # timings.prompt_n counts only tokens not reused (cache_prompt)
+
+    def generate_request(self, payload: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        options = payload.get("options", {})
+        body = {
+            "prompt": payload["prompt"],
+            "stream": payload.get("stream", False),
+            "cache_prompt": True,  # Reuse the KV cache for the shared rubric prefix
+            "n_predict": options.get("num_predict", -1)
+        }
+        for key in ("temperature", "top_p", "top_k", "seed", "stop"):
+            if key in options:
+                body[key] = options[key]
+        output_format = payload.get("format")
+        if isinstance(output_format, dict):
+            body["json_schema"] = output_format
+        elif output_format == "json":
+            body["json_schema"] = {}  # Any JSON value
+        return "/completion", body
+
+    def parse_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        timings = data.get("timings", {})
+        result = {
+            "response": data.get("content", ""),
+            "done": True,
+            "prompt_eval_count": timings.get("prompt_n", data.get("tokens_evaluated", 0)),
+            "eval_count": timings.get("predicted_n", data.get("tokens_predicted", 0))
+        }
+        if timings:
+            result["prompt_eval_duration"] = int(timings.get("prompt_ms", 0) * 1e6)
+            result["eval_duration"] = int(timings.get("predicted_ms", 0) * 1e6)
+            result["total_duration"] = result["prompt_eval_duration"] + result["eval_duration"]
+        return result
+
+    def parse_stream_line(self, line: bytes) -> Optional[Dict[str, Any]]:
+        line = line.decode("utf-8") if isinstance(line, bytes) else line
+        if not line.startswith("data: "):
+            return None
+        data = json.loads(line[len("data: "):])
+        if data.get("stop"):
+            return self.parse_response(data)
+        return {"response": data.get("content", ""), "done": False}
+
+    def model_digest(self, session: requests.Session, base_url: str, model: str) -> Optional[str]:
+        response = session.get(f"{base_url}/props", timeout=PROBE_TIMEOUT_SECONDS)
+        if response.status_code != 200:
+            return None
+        props = response.json()
+        return props.get("model_path") or props.get("default_generation_settings", {}).get("model")
+
+    def preload(self, base_url: str, model: str, keep_alive: str) -> bool:
+        # The server loads its model at startup; /health reports 503 until it is ready
+        return requests.get(f"{base_url}/health", timeout=PROBE_TIMEOUT_SECONDS).status_code == 200
+
+    def resident_models(self, base_url: str, model: str) -> List[str]:
+        return [model] if self.preload(base_url, model, "") else []
+
+
+class OpenAICompatibleBackend(OllamaBackend):
+    """Any server implementing OpenAI's /v1/completions (raw prompt, no chat template)"""
+    name = "openai"
+    health_path = "/v1/models"
+    reports_cached_prefix = False  # usage.prompt_tokens counts the whole prompt
+
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {LLM_API_KEY}"} if LLM_API_KEY else {}
+
+    def generate_request(self, payload: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        options = payload.get("options", {})
+        body = {
+            "model": payload["model"],
+            "prompt": payload["prompt"],
+            "stream": payload.get("stream", False)
+        }
+        for key in ("temperature", "top_p", "seed", "stop"):
+            if key in options:
+                body[key] = options[key]
+        if options.get("num_predict", -1) > 0:
+            body["max_tokens"] = options["num_predict"]
+        if body["stream"]:
+            body["stream_options"] = {"include_usage": True}
+        output_format = payload.get("format")
+        if isinstance(output_format, dict):
+            body["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "response", "schema": output_format}
+            }
+        elif output_format == "json":
+            body["response_format"] = {"type": "json_object"}
+        return "/v1/completions", body
+
+    def parse_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        choices = data.get("choices") or [{}]
+        usage = data.get("usage") or {}
+        return {
+            "response": choices[0].get("text", ""),
+            "done": True,
+            "prompt_eval_count": usage.get("prompt_tokens", 0),
+            "eval_count": usage.get("completion_tokens", 0)
+        }
+
+    def parse_stream_line(self, line: bytes) -> Optional[Dict[str, Any]]:
+        line = line.decode("utf-8") if isinstance(line, bytes) else line
+        if not line.startswith("data: "):
+            return None
+        if line.strip() == "data: [DONE]":
+            return {"response": "", "done": True}
+        data = json.loads(line[len("data: "):])
+        if data.get("error"):
+            return {"error": data["error"]}
+        chunk = {"response": "".join(choice.get("text", "") for choice in data.get("choices", [])), "done": False}
+        if data.get("usage"):
+            chunk["prompt_eval_count"] = data["usage"].get("prompt_tokens", 0)
+            chunk["eval_count"] = data["usage"].get("completion_tokens", 0)
+        return chunk
+
+    def _list_models(self, base_url: str, session: Optional[requests.Session] = None) -> List[Dict[str, Any]]:
+        response = (session or requests).get(
+            f"{base_url}/v1/models", headers=self.headers(), timeout=PROBE_TIMEOUT_SECONDS
+        )
+        return response.json().get("data", []) if response.status_code == 200 else []
+
+    def model_digest(self, session: requests.Session, base_url: str, model: str) -> Optional[str]:
+        # No weight digest in this API; the model id and creation time are the closest identity
+        for entry in self._list_models(base_url, session):
+            if entry.get("id") == model:
+                return f"{entry['id']}@{entry.get('created', '')}"
+        return None
+
+    def preload(self, base_url: str, model: str, keep_alive: str) -> bool:
+        return model in self.resident_models(base_url, model)
+
+    def resident_models(self, base_url: str, model: str) -> List[str]:
+        return [entry.get("id", "") for entry in self._list_models(base_url)]
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (OllamaBackend, LlamaCppBackend, OpenAICompatibleBackend)
+}
+
+
+def get_backend(name: str = LLM_BACKEND) -> OllamaBackend:
+    """
+    Create the backend for a server type.
+
+    Raises:
+        ValueError: If the name is not one of BACKENDS
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM_BACKEND '{name}' (expected one of: {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
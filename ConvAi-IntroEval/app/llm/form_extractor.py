@@ -1,4 +1,3 @@
-import requests
 import json
 import datetime
 import asyncio
@@ -6,7 +5,11 @@ from pathlib import Path
 import re
 
 # Import DISABLE_LLM from .utils
-from .utils import DISABLE_LLM
+from .utils import DISABLE_LLM, parse_llm_json
+from .llm_client import generate
+from .schemas import EXTRACTION_SCHEMA, EXTRACTION_SECTIONS, response_format
+from .stream_parser import partial_token_handler
+from .prompt_builder import PromptBuilder
 
 # Import file organization functions
 import sys
@@ -15,9 +18,8 @@ if str(Path(__file__).parent.parent.parent) not in sys.path:
     sys.path.append(str(Path(__file__).parent.parent.parent))
 from file_organizer import organize_path, log_file_operation
 
-def get_extraction_prompt(transcript_text: str) -> str:
-    """Creates and returns the prompt for extracting data from transcripts - optimized for college students"""
-    return f"""
+# Static extraction instructions; the transcript is appended after them
+EXTRACTION_INSTRUCTIONS = """
     You are a precise data extraction assistant that parses and structures information in JSON from college student self-introduction transcripts.    
     
     EXTRACTION RULES:
@@ -29,86 +31,42 @@ def get_extraction_prompt(transcript_text: str) -> str:
     6. List multiple items separately and clearly when found in the text.
     7. Prioritize accuracy and completeness over brevity.
     8. If information is ambiguous, extract the literal statement rather than interpreting it.
+    9. Answer with one JSON object using the section and field keys shown in quotes below.
     
-    ### Personal Details 
-    - Name (full name as mentioned)
-    - Age (exact number only - if mentioned, but not required for evaluation)
-    - Languages known (list all mentioned languages with proficiency levels if stated)
-    - Hometown/Origin (where they're from - city, state, or region)
-
-    ### Academic Focus
-    - Current degree program (B.Tech, B.E., M.Tech, etc.)
-    - Year of study (1st year, 2nd year, 3rd year, 4th year, final year)
-    - Major/Specialization (Computer Science, Mechanical, Electronics, etc.)
-    - College/University (full institution name)
-    - CGPA (exact value with scale, e.g., "8.5/10" - only if mentioned proudly)
-    - Academic projects (course projects, final year projects, semester projects)
-
-    ### Practical Experience
-    - Internships (summer internships, industry exposure, company names, duration)
-    - Workshops and certifications (specific workshops attended, certifications earned)
-    - College competitions (hackathons, coding competitions, technical events participated)
-    - Research projects (projects with professors, research work, publications)
-    - Applied learning experiences (practical implementations, real-world applications)
-
-    ### Skills Development
-    - Programming languages (all languages mentioned with proficiency if stated)
-    - Tools & technologies (frameworks, software, platforms explored)
-    - Technical skills (domain-specific technical capabilities)
-    - Soft skills (communication, teamwork, leadership skills developed through group projects)
-    - Leadership roles (positions in college clubs, events organized, team leadership)
-
-    ### Personal Context & Motivation
-    - Interests and hobbies (personal interests, recreational activities)
-    - Career aspirations (what they want to become, future goals in their field)
-    - Field of interest (specific areas within their domain they're passionate about)
-    - What motivates them (driving factors, inspiration, passion areas)
-    - Initiative in learning (self-learning efforts, extra-curricular technical activities)
-
-    ### Current Projects & Work (if any)
-    - Current projects (ongoing academic or personal projects)
-    - Project name (exact project title)
-    - Technology/tools used (list all technologies mentioned)
-    - Problem statement (concise description of the problem addressed)
-    - Solution implemented (specific approach or methodology used)
-    - Your role (specific responsibilities in team projects)
-
-    ### Work Experience (if any)
-    - Company name (full organization name - internships or part-time work)
-    - Role (exact position title)
-    - Duration (time period or months worked)
-    - Skills gained (specific skills acquired during this experience)
-    - Key responsibilities (main duties and learning outcomes)
-
-    ### Achievements & Extra-curricular Activities
-    - Academic achievements (scholarships, academic awards, honors)
-    - Technical achievements (competition wins, project recognitions)
-    - Extra-curricular activities (clubs, societies, volunteering, organizing events)
-    - Relevant hobbies (activities that complement their academic/career interests)
+""" + "".join(
+    f'    ### {title} ("{key}")\n' + "".join(f'    - "{field}": {description}\n' for field, description in fields) + "\n"
+    for key, title, fields in EXTRACTION_SECTIONS
+) + """    IMPORTANT: Extract information exactly as stated in the text. Focus on college-relevant experiences and academic journey. Do not add any interpretation or inferences.
 
-    ### Career Goals & Preferences
-    - Target role/field (specific job roles or career paths they're interested in)
-    - Short-term goals (immediate career objectives post-graduation)
-    - Long-term aspirations (career vision, where they see themselves)
-    - Professional interests (specific domains or technologies they want to work with)
-
-    IMPORTANT: Extract information exactly as stated in the text. Focus on college-relevant experiences and academic journey. Do not add any interpretation or inferences.
+    """
 
-    Text: {transcript_text}
-    \"\"\""""
 
-def extract_fields_from_transcript(transcript_text: str, roll_number: str = None) -> dict:
+def get_extraction_prompt(transcript_text: str) -> str:
+    """Creates and returns the prompt for extracting data from transcripts - optimized for college students"""
+    return (PromptBuilder("extraction")
+            .add("instructions", EXTRACTION_INSTRUCTIONS + "Text: ")
+            .add_transcript(transcript_text)
+            .add("closing", """
+    \"\"\"""")
+            .build())
+
+def extract_fields_from_transcript(transcript_text: str, roll_number: str = None, prompt: str = None,
+                                   on_partial=None) -> dict:
     """Returns the complete extracted fields from transcript as a dictionary
     
     Args:
         transcript_text (str): The transcript text to process
         roll_number (str, optional): Student roll number for file organization
+        prompt (str, optional): Extraction prompt already assembled from the transcript
+        on_partial (callable, optional): Called as on_partial(stage, path, value) for each
+            section completed while the response streams in
     
     Returns:
         dict: Status and file path information
     """
     
-    prompt = get_extraction_prompt(transcript_text)
+    if prompt is None:
+        prompt = get_extraction_prompt(transcript_text)
     if DISABLE_LLM:
         print("[⚠️ LLM DISABLED] Skipping extract_fields_from_transcript LLM call.")
         return {
@@ -117,72 +75,74 @@ def extract_fields_from_transcript(transcript_text: str, roll_number: str = None
         }
 
     try:
-        # Use non-streaming mode for cleaner queue operation
         print("📤 [QUEUE] Sending extraction request to LLM API...")
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={
-                "model": "mistral",
-                "prompt": prompt,
-                "stream": False,  # Disable streaming for queue mode
-                "temperature": 0.1,  # Remove randomness for consistent output
-                "top_p": 0.95,        # Set top_p to 1.0 for deterministic sampling
-                "top_k": 40,         # Limit token selection to top 40 tokens
-                "seed": 42,          # Fixed seed for reproducible results                
-                "stop": ["\n\n"]     # Stop token for clean output termination
-            },
-            timeout=300  # 5 minutes timeout for LLM API call
+        response_json = generate(
+            prompt, stage="extraction", format=response_format(EXTRACTION_SCHEMA),
+            on_token=partial_token_handler("extraction", on_partial)
         )
         
-        if response.status_code == 200:
-            # Process the complete response
-            print(f"📥 [QUEUE] Received extraction response from LLM API")
-            
-            response_json = response.json()
-            extracted_text = response_json.get('response', '')
-            
-            # After streaming is complete, save the extracted data
-            if not extracted_text.strip():
-                print("❌ No data extracted from LLM response")
-                return {"status": "error", "message": "No data returned from LLM"}
-            
-            print(f"\n✅ LLM extraction completed. Total response length: {len(extracted_text)} characters")
-            
-            # Use file organization system for saving extracted forms
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"form_{timestamp}.json"
-            
-            # Use organize_path to get the proper file path with roll number organization
-            file_path = organize_path("filled_forms", filename, roll_number)
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            try:
-                # Save the extracted data to a JSON file
-                json_data = {
-                    "timestamp": datetime.datetime.now().isoformat(),
-                    "extracted_fields": extracted_text
-                }
-                with open(file_path, "w", encoding="utf-8") as f:
-                    json.dump(json_data, f, indent=2, ensure_ascii=False)
-                
-                print(f"✅ Saved extracted data to: {file_path}")
-                log_file_operation("CREATE form", file_path, roll_number)
-                
-                # Return status information 
-                return {
-                    "status": "saved", 
-                    "file": str(file_path)
-                }
-            
-            except Exception as save_error:
-                print(f"❌ Error saving JSON file: {str(save_error)}")
-                return {"status": "error", "message": f"Error saving to file: {str(save_error)}"}
-        else:
-            print(f"Error calling LLM: {response.status_code}")
-            return {"status": "error", "message": f"LLM API error: {response.status_code}"}
+        # Process the complete response
+        print(f"📥 [QUEUE] Received extraction response from LLM API")
+        
+        extracted_text = response_json.get('response', '')
+        
+        # After streaming is complete, save the extracted data
+        if not extracted_text.strip():
+            print("❌ No data extracted from LLM response")
+            return {"status": "error", "message": "No data returned from LLM"}
+        
+        print(f"\n✅ LLM extraction completed. Total response length: {len(extracted_text)} characters")
+        
+        # Normalize the extracted JSON (repairing it only if schema output was not used)
+        try:
+            extracted_fields = parse_llm_json(extracted_text, "extraction")
+            extracted_text = json.dumps(extracted_fields, indent=2, ensure_ascii=False)
+        except json.JSONDecodeError:
+            print("⚠️ Extraction response is not valid JSON - saving the raw text")
+        
+        return save_extracted_fields(extracted_text, roll_number)
     
     except Exception as e:
         print(f"Exception calling LLM: {str(e)}")
         return {"status": "error", "message": f"Exception: {str(e)}"}
 
 
+def save_extracted_fields(extracted_text: str, roll_number: str = None) -> dict:
+    """Save extracted form fields as filled_forms/<roll>/form_<timestamp>.json
+    
+    Args:
+        extracted_text (str): Extracted fields (JSON text)
+        roll_number (str, optional): Student roll number for file organization
+    
+    Returns:
+        dict: Status and file path information
+    """
+    # Use file organization system for saving extracted forms
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"form_{timestamp}.json"
+    
+    # Use organize_path to get the proper file path with roll number organization
+    file_path = organize_path("filled_forms", filename, roll_number)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    try:
+        # Save the extracted data to a JSON file
+        json_data = {
+            "timestamp": datetime.datetime.now().isoformat(),
+            "extracted_fields": extracted_text
+        }
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(json_data, f, indent=2, ensure_ascii=False)
+        
+        print(f"✅ Saved extracted data to: {file_path}")
+        log_file_operation("CREATE form", file_path, roll_number)
+        
+        # Return status information 
+        return {
+            "status": "saved", 
+            "file": str(file_path)
+        }
+    
+    except Exception as save_error:
+        print(f"❌ Error saving JSON file: {str(save_error)}")
+        return {"status": "error", "message": f"Error saving to file: {str(save_error)}"}
@@ -0,0 +1,118 @@
+"""
+Fused Form Extraction + Profile Rating for ConvAi-IntroEval
+
+In the default pipeline the transcript goes through Mistral twice: once to
+extract the form and again, as that form, to rate the profile. In fused
+mode (LLM_FUSED_PROFILE=1) a single schema-constrained request returns
+both. The form file is still written to filled_forms/ exactly as the
+extractor writes it, and the profile rating is validated the same way,
+so the rest of the pipeline and the UI see the usual outputs with one
+full LLM round trip less per task.
+"""
+import datetime
+import json
+
+from .utils import DISABLE_LLM, parse_llm_json, fix_json_and_rating_calculation
+from .llm_client import generate
+from .schemas import FUSED_PROFILE_SCHEMA, response_format
+from .stream_parser import partial_token_handler
+from .prompt_builder import PromptBuilder
+from .form_extractor import EXTRACTION_INSTRUCTIONS, save_extracted_fields
+from .profile_rater_updated import PROFILE_RATING_PREFIX
+
+# Static part of the fused prompt (both task descriptions); the transcript follows it
+FUSED_PROMPT_PREFIX = (
+    """
+    Complete TWO tasks for the college student self-introduction transcript given at the end.
+
+    TASK 1 - "extracted_fields": structure the student's information.
+    """
+    + EXTRACTION_INSTRUCTIONS
+    + """
+    TASK 2 - "profile_rating": evaluate the profile described by your extracted_fields from TASK 1.
+
+    """
+    + PROFILE_RATING_PREFIX
+    + """
+    OUTPUT: Return ONE JSON object with exactly two keys:
+    - "extracted_fields": the sections from TASK 1, writing "Not Mentioned" for anything not stated
+    - "profile_rating": the evaluation object from TASK 2
+    """
+)
+
+
+def get_fused_prompt(transcript_text: str) -> str:
+    """Creates and returns the fused extraction + profile rating prompt"""
+    return (PromptBuilder("fused")
+            .add("instructions", FUSED_PROMPT_PREFIX + """
+    Text: """)
+            .add_transcript(transcript_text)
+            .add("closing", """
+
+    Respond ONLY with the JSON object, no additional text.
+    """)
+            .build())
+
+
+def extract_and_rate_profile(transcript_text: str, roll_number: str = None, prompt: str = None,
+                             on_partial=None) -> dict:
+    """Extracts the form and rates the profile with one LLM request
+    
+    Args:
+        transcript_text (str): The transcript text to process
+        roll_number (str, optional): Student roll number for file organization
+        prompt (str, optional): Fused prompt already assembled from the transcript
+        on_partial (callable, optional): Called as on_partial(stage, path, value) for each
+            form section or rubric item completed while the response streams in
+    
+    Returns:
+        dict: Form save status and file path (as extract_fields_from_transcript), plus
+              "profile_rating" holding the validated rating when the form was saved
+    """
+    if prompt is None:
+        prompt = get_fused_prompt(transcript_text)
+    if DISABLE_LLM:
+        print("[⚠️ LLM DISABLED] Skipping extract_and_rate_profile LLM call.")
+        return {
+            "status": "disabled",
+            "message": "LLM call skipped (safe edit mode)"
+        }
+
+    try:
+        print("📤 [QUEUE] Sending fused extraction + profile rating request to LLM API...")
+        # One level deeper than the single-task stages: sections sit under "extracted_fields"
+        response_json = generate(
+            prompt, stage="fused", format=response_format(FUSED_PROFILE_SCHEMA),
+            on_token=partial_token_handler("fused", on_partial, max_depth=3)
+        )
+        print(f"📥 [QUEUE] Received fused response from LLM API")
+        
+        result = parse_llm_json(response_json.get('response', ''), "fused")
+        extracted_fields = result.get("extracted_fields")
+        profile_rating = result.get("profile_rating")
+        if not extracted_fields:
+            print("❌ No data extracted from fused LLM response")
+            return {"status": "error", "message": "No data returned from LLM"}
+        
+        # Derive the form file exactly as the extractor writes it
+        if isinstance(extracted_fields, str):
+            extracted_text = extracted_fields
+        else:
+            extracted_text = json.dumps(extracted_fields, indent=2, ensure_ascii=False)
+        saved = save_extracted_fields(extracted_text, roll_number)
+        if saved.get("status") != "saved" or not isinstance(profile_rating, dict):
+            return saved
+        
+        # Validate the rating as evaluate_profile_rating does
+        rating_data = fix_json_and_rating_calculation(json.dumps(profile_rating), rating_type="profile")
+        if rating_data.get("status") != "error":
+            rating_data["evaluated_file"] = saved["file"]
+            rating_data["evaluation_timestamp"] = datetime.datetime.now().isoformat()
+            rating_data["fused_evaluation"] = True
+            print(f"✅ Fused profile rating completed for {saved['file']}")
+        saved["profile_rating"] = rating_data
+        return saved
+    
+    except Exception as e:
+        print(f"Exception in fused extraction + profile rating: {str(e)}")
+        return {"status": "error", "message": f"Exception: {str(e)}"}
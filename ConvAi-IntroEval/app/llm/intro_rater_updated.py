@@ -1,6 +1,7 @@
-import requests
 import json
 import datetime
+import sys
+from functools import lru_cache
 from pathlib import Path
 
 # Import helper functions from .utils
@@ -11,10 +12,33 @@ from .utils import (
     fix_json_and_rating_calculation, 
     DISABLE_LLM
 )
+from .llm_client import generate
+from .schemas import INTRO_RATING_SCHEMA, response_format
+from .stream_parser import partial_token_handler
+from .prompt_builder import PromptBuilder
 
+# Import local speech analytics (top-level module)
+if str(Path(__file__).parent.parent.parent) not in sys.path:
+    sys.path.append(str(Path(__file__).parent.parent.parent))
+from speech_analytics import analyze_transcript, describe_pacing
 
-def get_intro_rating_prompt(transcript_text: str) -> str:
-    """Creates and returns the prompt for evaluating intro rating with improved flexibility"""
+
+@lru_cache(maxsize=2)
+def get_intro_rating_prefix(measured_fluency: bool = False) -> str:
+    """Static rubric part of the intro rating prompt
+    
+    It comes first and is identical for every student (one variant per fluency mode), so
+    Ollama can reuse the evaluated prefix (KV cache) from the previous intro rating; only
+    the transcript suffix is evaluated per call.
+    """
+    if measured_fluency:
+        fluency_instruction = ""
+        fluency_json = ""
+    else:
+        fluency_instruction = """
+       - Fluency: [Describe the specific fluency and pacing - smooth, hesitant, fast-paced, well-paced, etc.]"""
+        fluency_json = ',\n        "Fluency: [Describe the specific fluency and pacing you noticed]"'
+    
     return f"""
     You are an expert communication coach specializing in evaluating college student self-introductions for interview preparation. Your task is to provide an objective, data-driven rating based on the provided transcript and specific evaluation criteria.
 
@@ -72,8 +96,7 @@ def get_intro_rating_prompt(transcript_text: str) -> str:
 
     5. INSIGHTS (Provide 2-3 brief, specific observations about the speaker based on what you actually heard):
        - Tone: [Describe the specific tone you observed - confident, nervous, enthusiastic, etc.]
-       - Style: [Describe the specific speaking style - formal, conversational, structured, rambling, etc.]
-       - Fluency: [Describe the specific fluency and pacing - smooth, hesitant, fast-paced, well-paced, etc.]
+       - Style: [Describe the specific speaking style - formal, conversational, structured, rambling, etc.]{fluency_instruction}
        - Consider cultural differences in communication styles when assessing tone and style.
 
     6. FEEDBACK (Provide 2-3 specific, actionable suggestions for improvement based on gaps you identified):
@@ -103,8 +126,7 @@ def get_intro_rating_prompt(transcript_text: str) -> str:
       }},
       "insights": [
         "Tone: [Describe the specific tone you observed]",
-        "Style: [Describe the specific speaking style you heard]",
-        "Fluency: [Describe the specific fluency and pacing you noticed]"
+        "Style: [Describe the specific speaking style you heard]"{fluency_json}
       ],
       "feedback": [
         "[Specific actionable suggestion for interview preparation #1]",
@@ -124,21 +146,45 @@ def get_intro_rating_prompt(transcript_text: str) -> str:
         "notes": "explain any observed strengths/weaknesses and areas for improvement focusing on interview readiness"
       }}
     }}
+    """
+
+
+def get_intro_rating_prompt(transcript_text: str, speech_metrics: dict = None) -> str:
+    """Creates and returns the prompt for evaluating intro rating with improved flexibility
+    
+    When speech_metrics (measured locally from segment timings) are given, fluency and
+    pacing are not asked of the LLM; the measured summary is passed as context instead.
+    """
+    if speech_metrics:
+        delivery_context = f"""
+    MEASURED DELIVERY (from audio timing - do not re-assess fluency or pacing): {describe_pacing(speech_metrics)[len("Fluency: "):]}
+"""
+    else:
+        delivery_context = ""
     
+    return (PromptBuilder("intro")
+            .add("rubric", get_intro_rating_prefix(bool(speech_metrics)))
+            .add("delivery", delivery_context)
+            .add("transcript_header", """
     TRANSCRIPT TO EVALUATE:
     ---BEGIN TRANSCRIPT---
-    {transcript_text}
+    """)
+            .add_transcript(transcript_text)
+            .add("closing", """
     ---END TRANSCRIPT---
 
     IMPORTANT: Respond ONLY with the JSON object, no additional text. Ensure the sum of all category scores (grammar_and_clarity + structure + info_coverage + relevance_to_role) matches the intro_rating value and the calculated_sum in grading_debug.
-    """
+    """)
+            .build())
 
-def evaluate_intro_rating(transcript_path=None) -> dict:
+def evaluate_intro_rating(transcript_path=None, on_partial=None) -> dict:
     """
     Evaluates an intro rating based on the transcript data (synchronous version)
     
     Args:
         transcript_path (str, optional): Path to specific transcript file. Defaults to None (uses latest).
+        on_partial (callable, optional): Called as on_partial(stage, path, value) for each
+            rubric item completed while the response streams in
     
     Returns:
         dict: Rating results
@@ -148,8 +194,16 @@ def evaluate_intro_rating(transcript_path=None) -> dict:
         file_path, transcript_text = get_latest_transcript_file(transcript_path)
         if not transcript_text:
             return {"status": "error", "message": "Failed to load transcript data"}
-          # Generate the evaluation prompt
-        prompt = get_intro_rating_prompt(transcript_text)
+        
+        # Measure pacing, pauses and fillers locally from the segment timings
+        speech_metrics = analyze_transcript(file_path)
+        if speech_metrics and speech_metrics.get("words_per_minute") is None:
+            # Too little timed speech, or a batched decode without segment timings:
+            # leave fluency to the LLM rather than passing unmeasured pacing
+            speech_metrics = None
+
+        # Generate the evaluation prompt
+        prompt = get_intro_rating_prompt(transcript_text, speech_metrics)
         
         if DISABLE_LLM:
             print("[⚠️ LLM DISABLED] Skipping evaluate_intro_rating_sync LLM call.")
@@ -158,65 +212,59 @@ def evaluate_intro_rating(transcript_path=None) -> dict:
                 "message": "LLM call skipped (safe edit mode)"
             }
         
-        # Call the LLM with non-streaming mode for cleaner queue operation
         print("📤 [QUEUE] Sending intro rating evaluation request to Mistral API...")
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={
-                "model": "mistral",
-                "prompt": prompt,
-                "stream": False,  # Disable streaming for queue mode
-                "temperature": 0.1,  # Remove randomness for consistent output
-                "top_p": 0.95,        # Set top_p to 1.0 for deterministic sampling
-                "top_k": 40,         # Limit token selection to top 40 tokens
-                "seed": 42,          # Fixed seed for reproducible results
-                "stop": ["\n\n"]     # Stop token for clean output termination
-            },
-            timeout=300  # 5 minutes timeout for LLM API call
+        response_json = generate(
+            prompt, stage="intro", format=response_format(INTRO_RATING_SCHEMA),
+            on_token=partial_token_handler("intro", on_partial)
         )
         
-        if response.status_code == 200:
-            # Process the complete response
-            print(f"📥 [QUEUE] Received intro rating response from LLM API")
+        # Process the complete response
+        print(f"📥 [QUEUE] Received intro rating response from LLM API")
+        
+        rating_text = response_json.get('response', '')
+        
+        try:
+            # Parse and fix the JSON response using the utility function
+            # Pass the specific functions for enhancing and generating feedback for intro rating
+            rating_data = fix_json_and_rating_calculation(
+                rating_text, 
+                rating_type="intro",
+                enhance_info_coverage_calculation_func=enhance_info_coverage_calculation,
+                generate_default_feedback_func=generate_default_feedback
+            )
+
+            if rating_data.get("status") == "error":
+                print(f"❌ Error processing LLM response: {rating_data.get('message')}")
+                return rating_data
+
+            # Replace the fluency insight with the measured one
+            if speech_metrics:
+                insights = rating_data.get("insights")
+                if not isinstance(insights, list):
+                    insights = []
+                insights = [i for i in insights if not str(i).lower().startswith("fluency")]
+                insights.append(describe_pacing(speech_metrics))
+                rating_data["insights"] = insights
+                rating_data["speech_metrics"] = speech_metrics
             
-            response_json = response.json()
-            rating_text = response_json.get('response', '')
+            # Add metadata about the evaluated file
+            rating_data["evaluated_file"] = str(file_path)
+            rating_data["evaluation_timestamp"] = datetime.datetime.now().isoformat()
             
-            try:
-                # Parse and fix the JSON response using the utility function
-                # Pass the specific functions for enhancing and generating feedback for intro rating
-                rating_data = fix_json_and_rating_calculation(
-                    rating_text, 
-                    rating_type="intro",
-                    enhance_info_coverage_calculation_func=enhance_info_coverage_calculation,
-                    generate_default_feedback_func=generate_default_feedback
-                )
-
-                if rating_data.get("status") == "error":
-                    print(f"❌ Error processing LLM response: {rating_data.get('message')}")
-                    return rating_data
-
-                # Add metadata about the evaluated file
-                rating_data["evaluated_file"] = str(file_path)
-                rating_data["evaluation_timestamp"] = datetime.datetime.now().isoformat()
-                
-                # NOTE: File saving is now handled by the background process in main.py
-                # This eliminates duplicate file saving and ensures proper file organization
-                print(f"✅ Intro rating evaluation completed for {file_path}")
-                print("📁 File will be saved by background process with proper organization")
-                
-                return rating_data
+            # NOTE: File saving is now handled by the background process in main.py
+            # This eliminates duplicate file saving and ensures proper file organization
+            print(f"✅ Intro rating evaluation completed for {file_path}")
+            print("📁 File will be saved by background process with proper organization")
             
-            except Exception as e:
-                print(f"❌ Unexpected error after attempting to fix JSON in intro_rater: {str(e)}")
-                return {
-                    "status": "error", 
-                    "message": f"Unexpected error processing response: {str(e)}",
-                    "raw_response": rating_text
-                }
-        else:
-            print(f"Error calling LLM: {response.status_code}")
-            return {"status": "error", "message": f"LLM API error: {response.status_code}"}
+            return rating_data
+        
+        except Exception as e:
+            print(f"❌ Unexpected error after attempting to fix JSON in intro_rater: {str(e)}")
+            return {
+                "status": "error", 
+                "message": f"Unexpected error processing response: {str(e)}",
+                "raw_response": rating_text
+            }
     
     except Exception as e:
         print(f"Exception in intro rating evaluation: {str(e)}")
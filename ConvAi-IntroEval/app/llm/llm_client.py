@@ -0,0 +1,429 @@
+"""
+Shared LLM Client for ConvAi-IntroEval
+
+All LLM stages (form extraction, profile rating, intro rating) send their
+requests through one pooled client instead of opening a fresh connection
+per call with duplicated options:
+- One requests.Session with a keep-alive connection pool to the LLM server
+  (Ollama by default; llama.cpp and OpenAI-compatible servers through
+  backends.py, which translates requests and responses)
+- Generation options centralized and sent under "options", where Ollama
+  actually reads them (top-level sampling fields are ignored)
+- Per-call timeout and retry policy (connection failures and 5xx only)
+- Per-call latency recorded in the metrics registry as llm.<stage>.*,
+  including prompt-eval time split by prefix cache reuse (warm/cold)
+- A process-wide concurrency limit, spread over one or more server
+  endpoints, so independent stages can run in parallel slots
+- A persistent response cache: generation is seeded and near-greedy, so a
+  repeated prompt (re-runs after failures, re-rates, duplicate uploads) is
+  answered from disk. Entries are keyed by the model digest, options,
+  format and prompt hash, so pulling a new model or editing a prompt
+  misses automatically; bump LLM_CACHE_VERSION to drop everything else
+
+Environment:
+    LLM_TIMEOUT_SECONDS   read timeout per call (default 300)
+    LLM_MAX_RETRIES       retries after a connection failure or 5xx (default 2)
+    LLM_POOL_SIZE         keep-alive connections kept open (default 4, or more
+                          when LLM_MAX_CONCURRENCY is higher)
+    LLM_MAX_CONCURRENCY   in-flight generate calls per process (default: the
+                          advertised parallel slots, or 2 when unknown)
+    LLM_ENDPOINTS         comma-separated server base URLs (default LLM_BASE_URL)
+    OLLAMA_NUM_PARALLEL   parallel request slots of each Ollama server; the same
+                          variable Ollama itself reads, so a shared environment
+                          advertises the server's capacity to the app
+    LLM_CACHE_ENABLED     set to 0 to always call the model (default 1)
+    LLM_CACHE_MAX_MB      response cache size budget (default 64)
+    LLM_CACHE_TTL_HOURS   maximum age of a cached response, 0 = no limit (default 168)
+    LLM_CACHE_VERSION     part of every cache key; change it to invalidate all entries
+    LLM_NUM_CTX           context window requested from the server (default 8192); one
+                          value for every stage, since Ollama reloads the model whenever
+                          num_ctx changes between requests
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from .utils import LLM_BASE_URL, MISTRAL_MODEL, MISTRAL_KEEP_ALIVE
+    from .backends import OllamaBackend, get_backend
+except ImportError:  # Fallback for direct execution if needed
+    from utils import LLM_BASE_URL, MISTRAL_MODEL, MISTRAL_KEEP_ALIVE
+    from backends import OllamaBackend, get_backend
+
+# Import the metrics registry (top-level module)
+if str(Path(__file__).parent.parent.parent) not in sys.path:
+    sys.path.append(str(Path(__file__).parent.parent.parent))
+from metrics import metrics
+from disk_cache import DiskLRUCache
+
+LLM_NUM_CTX = int(os.environ.get("LLM_NUM_CTX", "8192"))
+
+# Generation options shared by every stage
+DEFAULT_OPTIONS = {
+    "temperature": 0.1,  # Remove randomness for consistent output
+    "top_p": 0.95,
+    "top_k": 40,         # Limit token selection to top 40 tokens
+    "seed": 42,          # Fixed seed for reproducible results
+    "num_ctx": LLM_NUM_CTX  # Fits the rubric prompts; Ollama's default window truncates them
+}
+
+LLM_TIMEOUT_SECONDS = float(os.environ.get("LLM_TIMEOUT_SECONDS", "300"))
+LLM_CONNECT_TIMEOUT_SECONDS = 5
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BACKOFF_SECONDS = 2.0
+CHARS_PER_TOKEN = 4  # Rough estimate for English prompt text
+PREFIX_HIT_RATIO = 0.5  # Evaluating under half the prompt means the prefix was cached
+LLM_ENDPOINTS = [url.strip() for url in os.environ.get("LLM_ENDPOINTS", LLM_BASE_URL).split(",") if url.strip()]
+OLLAMA_NUM_PARALLEL = int(os.environ.get("OLLAMA_NUM_PARALLEL", "0") or 0)  # 0 = not advertised
+LLM_PARALLEL_SLOTS = OLLAMA_NUM_PARALLEL * len(LLM_ENDPOINTS)
+LLM_MAX_CONCURRENCY = max(1, int(os.environ.get("LLM_MAX_CONCURRENCY", str(LLM_PARALLEL_SLOTS or 2))))
+LLM_POOL_SIZE = int(os.environ.get("LLM_POOL_SIZE", str(max(4, LLM_MAX_CONCURRENCY))))
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "1") != "0"
+LLM_CACHE_DIR = Path(__file__).parent.parent.parent / "cache" / "llm"
+LLM_CACHE_MAX_MB = int(os.environ.get("LLM_CACHE_MAX_MB", "64"))
+LLM_CACHE_TTL_HOURS = float(os.environ.get("LLM_CACHE_TTL_HOURS", "168"))
+LLM_CACHE_VERSION = os.environ.get("LLM_CACHE_VERSION", "1")
+MODEL_DIGEST_REFRESH_SECONDS = 300  # Notice an `ollama pull` within a few minutes
+CACHED_RESPONSE_FIELDS = ("response", "done", "prompt_eval_count", "eval_count", "total_duration", "eval_duration")
+
+
+class LLMError(Exception):
+    """Raised when the LLM server cannot produce a response"""
+
+
+class LLMClient:
+    """
+    Pooled, keep-alive client for text generation.
+
+    Requests and responses use Ollama's /api/generate shape; the backend
+    translates them for other server types. At most max_concurrency calls
+    are in flight at once; each call goes to the endpoint with the fewest
+    in-flight requests.
+    """
+
+    def __init__(self, base_url: str = LLM_BASE_URL, model: str = MISTRAL_MODEL,
+                 keep_alive: str = MISTRAL_KEEP_ALIVE, pool_size: int = LLM_POOL_SIZE,
+                 max_concurrency: int = LLM_MAX_CONCURRENCY, endpoints: Optional[List[str]] = None,
+                 cache: Optional[DiskLRUCache] = None, backend: Optional[OllamaBackend] = None):
+        self.backend = backend or get_backend()
+        self.endpoints = [url.rstrip("/") for url in (endpoints or [base_url])]
+        self.base_url = self.endpoints[0]
+        self.model = model
+        self.keep_alive = keep_alive
+        self.max_concurrency = max_concurrency
+        self._pool_size = pool_size
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._in_flight = {url: 0 for url in self.endpoints}
+        self._in_flight_lock = threading.Lock()
+        self.session = self._new_session()
+        self.cache = cache
+        self._model_digest = None
+        self._model_digest_checked = 0.0
+        self._digest_lock = threading.Lock()
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        # Retries are handled in _generate_with_retries() so they can be counted per stage
+        adapter = HTTPAdapter(pool_connections=len(self.endpoints), pool_maxsize=self._pool_size, max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(self.backend.headers())
+        return session
+
+    def _acquire_endpoint(self) -> str:
+        with self._in_flight_lock:
+            url = min(self.endpoints, key=lambda u: self._in_flight[u])
+            self._in_flight[url] += 1
+            return url
+
+    def _release_endpoint(self, url: str):
+        with self._in_flight_lock:
+            self._in_flight[url] -= 1
+
+    def build_payload(self, prompt: str, options: Optional[Dict[str, Any]] = None, **fields) -> Dict[str, Any]:
+        """
+        Build a non-streaming generate request with the shared options.
+
+        Args:
+            prompt: Full prompt text
+            options: Per-call overrides merged over DEFAULT_OPTIONS
+            **fields: Extra top-level request fields (format, context, ...)
+        """
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False,
+            "keep_alive": self.keep_alive,  # Keep the model warm for the next task
+            "options": {**DEFAULT_OPTIONS, **(options or {})}
+        }
+        payload.update({key: value for key, value in fields.items() if value is not None})
+        return payload
+
+    def model_digest(self) -> Optional[str]:
+        """
+        Identity of the served model weights (Ollama: digest from /api/tags),
+        refreshed every few minutes.
+
+        Returns:
+            The digest, or None if no endpoint reports the model
+        """
+        with self._digest_lock:
+            if time.time() - self._model_digest_checked < MODEL_DIGEST_REFRESH_SECONDS:
+                return self._model_digest
+            self._model_digest_checked = time.time()
+            self._model_digest = None
+            for url in self.endpoints:
+                try:
+                    self._model_digest = self.backend.model_digest(self.session, url, self.model)
+                except (requests.RequestException, ValueError):
+                    continue
+                if self._model_digest:
+                    return self._model_digest
+            return None
+
+    def ping(self) -> bool:
+        """Check that the first endpoint answers"""
+        try:
+            response = self.session.get(f"{self.base_url}{self.backend.health_path}", timeout=5)
+            return response.status_code == 200
+        except requests.RequestException:
+            return False
+
+    def cache_key(self, payload: Dict[str, Any]) -> Optional[str]:
+        """
+        Cache key for a generate payload, or None when the response must not be cached
+        (unseeded sampling, or the model digest is unknown).
+        """
+        if "seed" not in payload["options"]:
+            return None
+        digest = self.model_digest()
+        if digest is None:
+            return None
+        key_fields = {
+            "version": LLM_CACHE_VERSION,
+            "backend": self.backend.name,
+            "model": self.model,
+            "digest": digest,
+            "options": payload["options"],
+            "prompt": hashlib.sha256(payload["prompt"].encode("utf-8")).hexdigest(),
+            # format, system, ... - everything else that changes the output
+            **{key: value for key, value in payload.items()
+               if key not in ("model", "prompt", "options", "stream", "keep_alive")}
+        }
+        return hashlib.sha256(json.dumps(key_fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def generate(self, prompt: str, stage: str = "generate", options: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None, retries: Optional[int] = None,
+                 on_token: Optional[Callable[[str], None]] = None, cache: bool = True,
+                 **fields) -> Dict[str, Any]:
+        """
+        Run one generate call and return the response in Ollama's shape.
+
+        With on_token the response is streamed: on_token receives each text
+        chunk as it is generated and the return value is assembled from the
+        stream in the same shape as a non-streaming response.
+
+        Args:
+            prompt: Full prompt text
+            stage: Metrics label (extraction, profile, intro)
+            options: Per-call generation option overrides
+            timeout: Read timeout in seconds (default LLM_TIMEOUT_SECONDS)
+            retries: Retries after a connection failure or 5xx (default LLM_MAX_RETRIES)
+            on_token: Called with each streamed text chunk
+            cache: Look up and store the response in the response cache
+            **fields: Extra top-level request fields
+
+        Returns:
+            dict: Response fields ("response", "prompt_eval_count", "eval_count", ...)
+
+        Raises:
+            LLMError: If the call fails after all retries
+        """
+        payload = self.build_payload(prompt, options, **fields)
+        cache_key = self.cache_key(payload) if cache and self.cache else None
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                metrics.increment(f"llm.{stage}.cache_hits")
+                metrics.increment("cache.llm_responses.saved_seconds", cached.get("llm_seconds", 0))
+                if on_token is not None:
+                    on_token(cached["response"])
+                return {**cached, "cached": True}
+
+        if on_token is not None:
+            payload["stream"] = True
+        timeout = timeout or LLM_TIMEOUT_SECONDS
+        retries = LLM_MAX_RETRIES if retries is None else retries
+
+        wait_start = time.time()
+        with self._slots:
+            metrics.observe(f"llm.{stage}.queue_wait_seconds", time.time() - wait_start)
+            base_url = self._acquire_endpoint()
+            start_time = time.time()
+            try:
+                result = self._generate_with_retries(base_url, payload, stage, timeout, retries, on_token)
+            finally:
+                self._release_endpoint(base_url)
+
+        if cache_key and result.get("done", True) and result.get("response"):
+            entry = {field: result[field] for field in CACHED_RESPONSE_FIELDS if field in result}
+            entry["llm_seconds"] = round(time.time() - start_time, 3)
+            self.cache.put(cache_key, entry)
+        return result
+
+    def _generate_with_retries(self, base_url: str, payload: Dict[str, Any], stage: str,
+                               timeout: float, retries: int,
+                               on_token: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        start_time = time.time()
+        last_error = None
+        path, body = self.backend.generate_request(payload)
+        for attempt in range(retries + 1):
+            if attempt:
+                metrics.increment(f"llm.{stage}.retries")
+                time.sleep(LLM_RETRY_BACKOFF_SECONDS * attempt)
+            try:
+                response = self.session.post(
+                    f"{base_url}{path}",
+                    json=body,
+                    timeout=(LLM_CONNECT_TIMEOUT_SECONDS, timeout),
+                    stream=on_token is not None
+                )
+            except requests.ConnectionError as e:
+                last_error = f"Connection error: {e}"
+                continue
+            except requests.Timeout:
+                # Generation is deterministic; a timed-out prompt would time out again
+                last_error = f"Timed out after {timeout:.0f}s"
+                break
+
+            if response.status_code >= 500:
+                last_error = f"LLM API error: {response.status_code}"
+                continue
+            if response.status_code != 200:
+                last_error = f"LLM API error: {response.status_code}"
+                break
+
+            if on_token is not None:
+                # Not retried once tokens have been handed out
+                result = self._read_stream(response, stage, start_time, on_token)
+            else:
+                result = self.backend.parse_response(response.json())
+            metrics.increment(f"llm.{stage}.calls")
+            metrics.observe(f"llm.{stage}.latency_seconds", time.time() - start_time)
+            if result.get("load_duration"):
+                metrics.observe(f"llm.{stage}.load_seconds", result["load_duration"] / 1e9)
+            self._record_token_counts(stage, result)
+            self._record_prompt_eval(stage, payload["prompt"], result)
+            return result
+
+        metrics.increment(f"llm.{stage}.errors")
+        raise LLMError(last_error)
+
+    def _read_stream(self, response: requests.Response, stage: str, start_time: float,
+                     on_token: Callable[[str], None]) -> Dict[str, Any]:
+        """Consume a streamed generate response, passing text chunks to on_token"""
+        parts = []
+        final = {}
+        try:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = self.backend.parse_stream_line(line)
+                if chunk is None:
+                    continue
+                if chunk.get("error"):
+                    metrics.increment(f"llm.{stage}.errors")
+                    raise LLMError(f"LLM stream error: {chunk['error']}")
+                text = chunk.get("response", "")
+                if text:
+                    if not parts:
+                        metrics.observe(f"llm.{stage}.first_token_seconds", time.time() - start_time)
+                    parts.append(text)
+                    on_token(text)
+                # Token counts and timings arrive on the last chunk(s)
+                final.update({key: value for key, value in chunk.items() if key != "response"})
+                if chunk.get("done"):
+                    break
+        except requests.RequestException as e:
+            metrics.increment(f"llm.{stage}.errors")
+            raise LLMError(f"LLM stream interrupted: {e}") from e
+        finally:
+            response.close()
+        final["response"] = "".join(parts)
+        return final
+
+    def _record_token_counts(self, stage: str, result: Dict[str, Any]):
+        """Record the prompt and completion token counts the server reported"""
+        if "prompt_eval_count" in result:
+            metrics.observe(f"llm.{stage}.prompt_eval_tokens", result["prompt_eval_count"])
+            metrics.increment("llm.tokens.prompt", result["prompt_eval_count"])
+        if "eval_count" in result:
+            metrics.observe(f"llm.{stage}.completion_tokens", result["eval_count"])
+            metrics.increment("llm.tokens.completion", result["eval_count"])
+            if result.get("eval_duration"):
+                metrics.observe(f"llm.{stage}.tokens_per_second", result["eval_count"] / (result["eval_duration"] / 1e9))
+
+    def _record_prompt_eval(self, stage: str, prompt: str, result: Dict[str, Any]):
+        """
+        Record prompt evaluation time, split by whether Ollama reused a cached prefix.
+
+        prompt_eval_count only counts tokens Ollama actually evaluated, so a
+        count well below the prompt's size means the static prefix came from
+        the KV cache (warm); otherwise the whole prompt was evaluated (cold).
+        """
+        if "prompt_eval_count" not in result or not self.backend.reports_cached_prefix:
+            return
+        evaluated = result["prompt_eval_count"]
+        estimated_tokens = max(1, len(prompt) // CHARS_PER_TOKEN)
+        cache = "warm" if evaluated < estimated_tokens * PREFIX_HIT_RATIO else "cold"
+        metrics.increment(f"llm.{stage}.prefix_cache.{cache}")
+        if result.get("prompt_eval_duration"):
+            metrics.observe(f"llm.{stage}.prompt_eval_seconds.{cache}", result["prompt_eval_duration"] / 1e9)
+
+
+# Process-wide client and response cache shared by all stages
+_response_cache = (
+    DiskLRUCache("llm_responses", LLM_CACHE_DIR, LLM_CACHE_MAX_MB * 1024 * 1024, LLM_CACHE_TTL_HOURS * 3600)
+    if LLM_CACHE_ENABLED else None
+)
+shared_client = LLMClient(endpoints=LLM_ENDPOINTS, cache=_response_cache)
+
+
+def generate(prompt: str, stage: str = "generate", **kwargs) -> Dict[str, Any]:
+    """Generate with the shared client (see LLMClient.generate)"""
+    return shared_client.generate(prompt, stage=stage, **kwargs)
+
+
+def llm_server_reachable() -> bool:
+    """Check that the configured LLM server answers"""
+    return shared_client.ping()
+
+
+def get_llm_cache_stats() -> Optional[Dict[str, Any]]:
+    """Response cache size, hit rate and LLM seconds saved by hits (None when disabled)"""
+    if _response_cache is None:
+        return None
+    return {
+        **_response_cache.stats(),
+        "saved_seconds": round(metrics.get_counter("cache.llm_responses.saved_seconds"), 1)
+    }
+
+
+def clear_llm_cache() -> int:
+    """Drop every cached LLM response. Returns the number of entries removed."""
+    return _response_cache.clear() if _response_cache is not None else 0
+
+
+__all__ = [
+    'LLMClient', 'LLMError', 'DEFAULT_OPTIONS', 'LLM_PARALLEL_SLOTS', 'shared_client', 'generate',
+    'llm_server_reachable', 'get_llm_cache_stats', 'clear_llm_cache'
+]
@@ -0,0 +1,264 @@
+"""
+Offline Mock LLM Server for ConvAi-IntroEval
+
+Speaks the subset of Ollama's API the app uses (/api/generate with and
+without streaming, /api/tags, /api/ps), so the production pipeline -
+prompt assembly, the shared client, JSON parsing, rating validation and
+the evaluation queue - runs end to end without Ollama or a GPU. Use it for
+performance and load runs instead of DISABLE_LLM or test_mode, which skip
+those code paths entirely.
+
+Responses are replayed from recordings. A recording is matched by the
+prompt's SHA-256 first, then by the output schema's required keys (so one
+recorded extraction answers every extraction prompt); without a match the
+response is synthesized from the request's JSON schema. Timing follows a
+simple model: fixed latency, prompt evaluation at --prompt-rate tokens/s,
+generation at --token-rate tokens/s, and at most --parallel requests
+generating at once, like OLLAMA_NUM_PARALLEL.
+
+Record real responses once through a running Ollama:
+    python app/llm/mock_server.py --recordings recordings/ --upstream http://localhost:11434
+
+Replay them offline:
+    python app/llm/mock_server.py --recordings recordings/ --port 11435 --token-rate 25
+    LLM_BASE_URL=http://localhost:11435 python main.py
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+
+CHARS_PER_TOKEN = 4  # Same estimate as the client's prefix-cache accounting
+DEFAULT_PORT = 11435  # Next to Ollama's 11434 so both can run at once
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def schema_keys(output_format: Any) -> Optional[str]:
+    """Identify a response shape by the required top-level keys of its schema"""
+    if isinstance(output_format, dict) and output_format.get("required"):
+        return ",".join(sorted(output_format["required"]))
+    return None
+
+
+def synthesize(schema: Dict[str, Any]) -> Any:
+    """Build a minimal value that satisfies a JSON schema"""
+    kind = schema.get("type")
+    if kind == "object":
+        return {key: synthesize(value) for key, value in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [synthesize(schema.get("items", {})) for _ in range(max(1, schema.get("minItems", 1)))]
+    if kind in ("number", "integer"):
+        return 2
+    if kind == "boolean":
+        return True
+    if schema.get("enum"):
+        return schema["enum"][0]
+    return "Not Mentioned"
+
+
+class RecordingStore:
+    """Recorded responses, indexed by prompt hash and by schema keys"""
+
+    def __init__(self, directory: Optional[Path]):
+        self.directory = directory
+        self._by_prompt: Dict[str, Dict[str, Any]] = {}
+        self._by_schema: Dict[str, List[Dict[str, Any]]] = {}
+        self._cycles: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        if directory and directory.exists():
+            for path in sorted(directory.glob("*.json")):
+                with open(path, "r", encoding="utf-8") as f:
+                    self._index(json.load(f))
+
+    def _index(self, recording: Dict[str, Any]):
+        self._by_prompt[recording["prompt_sha256"]] = recording
+        if recording.get("schema_keys"):
+            self._by_schema.setdefault(recording["schema_keys"], []).append(recording)
+            self._cycles.pop(recording["schema_keys"], None)
+
+    def __len__(self) -> int:
+        return len(self._by_prompt)
+
+    def find(self, prompt: str, output_format: Any) -> Optional[Dict[str, Any]]:
+        """Exact prompt match first, then the next recording with the same schema"""
+        with self._lock:
+            exact = self._by_prompt.get(prompt_hash(prompt))
+            if exact:
+                return exact
+            keys = schema_keys(output_format)
+            if keys not in self._by_schema:
+                return None
+            if keys not in self._cycles:
+                self._cycles[keys] = itertools.cycle(self._by_schema[keys])
+            return next(self._cycles[keys])
+
+    def record(self, prompt: str, output_format: Any, response: str) -> Dict[str, Any]:
+        recording = {
+            "prompt_sha256": prompt_hash(prompt),
+            "schema_keys": schema_keys(output_format),
+            "response": response,
+            "recorded_at": datetime.now().isoformat()
+        }
+        with self._lock:
+            self._index(recording)
+            if self.directory:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                with open(self.directory / f"{recording['prompt_sha256']}.json", "w", encoding="utf-8") as f:
+                    json.dump(recording, f, indent=2, ensure_ascii=False)
+        return recording
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, model: str, store: RecordingStore, latency: float, prompt_rate: float,
+                 token_rate: float, parallel: int, upstream: Optional[str] = None):
+        super().__init__(address, MockRequestHandler)
+        self.model = model
+        self.store = store
+        self.latency = latency
+        self.prompt_rate = prompt_rate
+        self.token_rate = token_rate
+        self.slots = threading.BoundedSemaphore(parallel)
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.digest = "mock-" + hashlib.sha256(f"{model}:{len(store)}".encode()).hexdigest()[:12]
+
+    def resolve(self, request: Dict[str, Any]) -> str:
+        """Response text for a generate request"""
+        prompt, output_format = request.get("prompt", ""), request.get("format")
+        recording = self.store.find(prompt, output_format)
+        if recording:
+            return recording["response"]
+        if self.upstream:
+            upstream_request = {**request, "stream": False}
+            response = requests.post(f"{self.upstream}/api/generate", json=upstream_request, timeout=600)
+            response.raise_for_status()
+            return self.store.record(prompt, output_format, response.json()["response"])["response"]
+        if isinstance(output_format, dict):
+            return json.dumps(synthesize(output_format))
+        return "{}"
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    server: MockLLMServer
+
+    def log_message(self, format, *args):
+        pass  # Keep load runs quiet
+
+    def _send_json(self, data: Dict[str, Any], status: int = 200):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        model_entry = {"name": f"{self.server.model}:latest", "model": f"{self.server.model}:latest",
+                       "digest": self.server.digest}
+        if self.path == "/api/tags":
+            self._send_json({"models": [model_entry]})
+        elif self.path == "/api/ps":
+            self._send_json({"models": [model_entry]})
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        if self.path != "/api/generate":
+            self._send_json({"error": "not found"}, 404)
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not request.get("prompt"):
+            # Load request - the model is always "resident"
+            self._send_json({"model": self.server.model, "response": "", "done": True, "done_reason": "load"})
+            return
+
+        server = self.server
+        start_time = time.time()
+        try:
+            text = server.resolve(request)
+        except requests.RequestException as e:
+            self._send_json({"error": f"upstream failed: {e}"}, 502)
+            return
+
+        prompt_tokens = max(1, len(request["prompt"]) // CHARS_PER_TOKEN)
+        pieces = [text[i:i + CHARS_PER_TOKEN] for i in range(0, len(text), CHARS_PER_TOKEN)]
+        with server.slots:
+            prompt_seconds = server.latency + prompt_tokens / server.prompt_rate
+            time.sleep(prompt_seconds)
+            eval_start = time.time()
+            if request.get("stream", True):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                for piece in pieces:
+                    time.sleep(1 / server.token_rate)
+                    self._write_chunk({"response": piece, "done": False})
+            else:
+                time.sleep(len(pieces) / server.token_rate)
+            eval_seconds = time.time() - eval_start
+
+        final = {
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": int((time.time() - start_time) * 1e9),
+            "load_duration": 0,
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(prompt_seconds * 1e9),
+            "eval_count": len(pieces),
+            "eval_duration": int(eval_seconds * 1e9)
+        }
+        if request.get("stream", True):
+            self._write_chunk({"response": "", **final})
+        else:
+            self._send_json({"model": server.model, "created_at": self._now(), "response": text, **final})
+
+    def _now(self) -> str:
+        return datetime.now(timezone.utc).isoformat()
+
+    def _write_chunk(self, chunk: Dict[str, Any]):
+        line = json.dumps({"model": self.server.model, "created_at": self._now(), **chunk}) + "\n"
+        self.wfile.write(line.encode("utf-8"))
+        self.wfile.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ConvAi-IntroEval offline mock LLM server (Ollama API)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--model", default="mistral", help="Model name reported by /api/tags")
+    parser.add_argument("--recordings", type=Path, help="Directory of recorded responses")
+    parser.add_argument("--upstream", help="Record misses from this Ollama URL instead of synthesizing them")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fixed seconds before prompt evaluation")
+    parser.add_argument("--prompt-rate", type=float, default=800, help="Prompt tokens evaluated per second")
+    parser.add_argument("--token-rate", type=float, default=30, help="Tokens generated per second")
+    parser.add_argument("--parallel", type=int, default=1, help="Requests generating at once (OLLAMA_NUM_PARALLEL)")
+    args = parser.parse_args()
+
+    store = RecordingStore(args.recordings)
+    server = MockLLMServer(
+        (args.host, args.port), args.model, store, args.latency, max(args.prompt_rate, 1),
+        max(args.token_rate, 0.001), max(1, args.parallel), args.upstream
+    )
+    print(f"🧪 Mock LLM server on http://{args.host}:{args.port} "
+          f"({len(store)} recordings, {args.token_rate:g} tokens/s, {args.parallel} slot(s))")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Mock LLM server stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
 # filepath: c:\Users\lokes\Downloads\KAMPYUTER\College Projects\Project ConvAi\Project-ConvAi\ConvAi-IntroEval\app\llm\profile_rater_updated.py
-import requests
 import json
 import datetime
 from pathlib import Path
@@ -7,26 +6,22 @@ from pathlib import Path
 # Import helper functions from .utils
 try:
     from .utils import get_latest_form_file, fix_json_and_rating_calculation, DISABLE_LLM
+    from .llm_client import generate
+    from .schemas import PROFILE_RATING_SCHEMA, response_format
+    from .stream_parser import partial_token_handler
+    from .prompt_builder import PromptBuilder
 except ImportError:  # Fallback for direct execution if needed
     from utils import get_latest_form_file, fix_json_and_rating_calculation, DISABLE_LLM
+    from llm_client import generate
+    from schemas import PROFILE_RATING_SCHEMA, response_format
+    from stream_parser import partial_token_handler
+    from prompt_builder import PromptBuilder
 
 
-def get_profile_rating_prompt(form_data: dict) -> str:
-    """Creates and returns the prompt for evaluating profile rating with strong employability focus"""
-    # Extract the fields from the form data structure
-    extracted_fields = None
-    
-    if "extracted_fields" in form_data and form_data["extracted_fields"]:
-        extracted_fields = form_data["extracted_fields"]
-    elif "data" in form_data and isinstance(form_data["data"], dict):
-        if "extracted_fields" in form_data["data"]:
-            extracted_fields = form_data["data"]["extracted_fields"]
-    elif isinstance(form_data, str):
-        extracted_fields = form_data
-    else:
-        extracted_fields = str(form_data)
-    
-    return f"""You are an expert HR evaluator with extensive experience in candidate assessment and hiring decisions. Your task is to provide an objective, data-driven rating that directly predicts EMPLOYABILITY and likelihood of being hired by companies.
+# Static rubric text. It comes first and never changes so Ollama can reuse the
+# evaluated prefix (KV cache) from the previous profile rating; only the form
+# data after it is evaluated per call.
+PROFILE_RATING_PREFIX = """You are an expert HR evaluator with extensive experience in candidate assessment and hiring decisions. Your task is to provide an objective, data-driven rating that directly predicts EMPLOYABILITY and likelihood of being hired by companies.
 
     ⚡ CRITICAL: This profile rating score directly determines the candidate's employability potential. Higher scores indicate candidates who are most likely to be hired and succeed in professional roles.
 
@@ -100,53 +95,78 @@ def get_profile_rating_prompt(form_data: dict) -> str:
     • 4.0-5.4: DEVELOPING POTENTIAL - Entry-level candidates requiring significant training
     • Below 4.0: LIMITED EMPLOYABILITY - Extensive development needed before industry readiness
 
-    FORM DATA TO EVALUATE:
-    {extracted_fields}
-
     Return your evaluation as a JSON object with this exact structure:
-    {{
+    {
       "profile_rating": X.X,
       "employability_level": "[HIGHLY EMPLOYABLE/GOOD EMPLOYABILITY/MODERATE EMPLOYABILITY/DEVELOPING POTENTIAL/LIMITED EMPLOYABILITY]",
-      "grading_explanation": {{
+      "grading_explanation": {
         "practical_foundation": "X.X/3 – X of 35 fields filled (X% completion). Higher completion indicates better self-awareness and thoroughness.",
         "technical_competency": "X.X/2 – [specific technical skills analysis and industry relevance]",
         "hands_on_experience": "X.X/3 – [detailed assessment of practical experience and project quality]",
         "growth_potential": "X.X/2 – [leadership, initiative, and professional development indicators]"
-      }},
-      "hiring_insights": {{
+      },
+      "hiring_insights": {
         "strongest_assets": "[Top 2-3 strengths that make this candidate attractive to employers]",
         "development_areas": "[Key areas that would improve employability]",
         "industry_readiness": "[Assessment of readiness for professional work]"
-      }},
-      "grading_debug": {{
+      },
+      "grading_debug": {
         "practical_foundation_score": X.X,
         "technical_competency_score": X.X,
         "hands_on_experience_score": X.X,
         "growth_potential_score": X.X,
         "calculated_sum": X.X,
-        "sum_check": {{
+        "sum_check": {
           "profile_expected": 10,
           "profile_reported": X.X
-        }},
+        },
         "notes": "[observations about employability strengths/weaknesses and hiring potential]"
-      }}
-    }}
+      }
+    }
 
     IMPORTANT FINAL CHECKS:
     1. Ensure practical_foundation_score is NEVER greater than 3.0, regardless of the calculation result
     2. Double-check that profile_rating equals all four component scores
     3. Assign appropriate employability_level based on total score
     4. Focus hiring_insights on what employers actually care about
-    5. Respond ONLY with the JSON object, no additional text.
-    """
+"""
 
 
-def evaluate_profile_rating(form_path=None) -> dict:
+def get_profile_rating_prompt(form_data: dict) -> str:
+    """Creates and returns the prompt for evaluating profile rating with strong employability focus"""
+    # Extract the fields from the form data structure
+    extracted_fields = None
+    
+    if "extracted_fields" in form_data and form_data["extracted_fields"]:
+        extracted_fields = form_data["extracted_fields"]
+    elif "data" in form_data and isinstance(form_data["data"], dict):
+        if "extracted_fields" in form_data["data"]:
+            extracted_fields = form_data["data"]["extracted_fields"]
+    elif isinstance(form_data, str):
+        extracted_fields = form_data
+    else:
+        extracted_fields = str(form_data)
+    
+    return (PromptBuilder("profile")
+            .add("rubric", PROFILE_RATING_PREFIX)
+            .add("form_data", f"""
+    FORM DATA TO EVALUATE:
+    {extracted_fields}
+""")
+            .add("closing", """
+    IMPORTANT: Respond ONLY with the JSON object, no additional text.
+    """)
+            .build())
+
+
+def evaluate_profile_rating(form_path=None, on_partial=None) -> dict:
     """
     Evaluates a profile rating based on the form data
     
     Args:
         form_path (str, optional): Path to specific form file. Defaults to None (uses latest).
+        on_partial (callable, optional): Called as on_partial(stage, path, value) for each
+            rubric item completed while the response streams in
     
     Returns:
         dict: Rating results
@@ -167,61 +187,45 @@ def evaluate_profile_rating(form_path=None) -> dict:
                 "message": "LLM call skipped (safe edit mode)"
             }
         
-        # Call the LLM with non-streaming mode for cleaner queue operation
         print("📤 [QUEUE] Sending profile rating request to Mistral API...")
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={
-                "model": "mistral",
-                "prompt": prompt,
-                "stream": False,  # Disable streaming for queue mode
-                "temperature": 0.1,  # Remove randomness for consistent output
-                "top_p": 0.95,        # Set top_p to 1.0 for deterministic sampling
-                "top_k": 40,         # Limit token selection to top 40 tokens
-                "seed": 42,          # Fixed seed for reproducible results
-                "stop": ["\n\n"]     # Stop token for clean output termination
-            },
-            timeout=300  # 5 minutes timeout for LLM API call
+        response_json = generate(
+            prompt, stage="profile", format=response_format(PROFILE_RATING_SCHEMA),
+            on_token=partial_token_handler("profile", on_partial)
         )
         
-        if response.status_code == 200:
-            # Process the complete response
-            print(f"📥 [QUEUE] Received profile rating response from LLM API")
-            
-            response_json = response.json()
-            rating_text = response_json.get('response', '')
-            
-            try:
-                # Use the utility function to parse and fix JSON
-                rating_data = fix_json_and_rating_calculation(
-                    rating_text,
-                    rating_type="profile"
-                )
-
-                if rating_data.get("status") == "error":
-                    print(f"❌ Error processing LLM response for profile rating: {rating_data.get('message')}")
-                    return rating_data
-
-                # Add metadata about the evaluated file
-                rating_data["evaluated_file"] = str(file_path)
-                rating_data["evaluation_timestamp"] = datetime.datetime.now().isoformat()
-                
-                # NOTE: File saving is now handled by the background process in main.py
-                print(f"✅ Profile rating evaluation completed for {file_path}")
-                print("📁 File will be saved by background process with proper organization")
-                
+        # Process the complete response
+        print(f"📥 [QUEUE] Received profile rating response from LLM API")
+        
+        rating_text = response_json.get('response', '')
+        
+        try:
+            # Use the utility function to parse and fix JSON
+            rating_data = fix_json_and_rating_calculation(
+                rating_text,
+                rating_type="profile"
+            )
+
+            if rating_data.get("status") == "error":
+                print(f"❌ Error processing LLM response for profile rating: {rating_data.get('message')}")
                 return rating_data
+
+            # Add metadata about the evaluated file
+            rating_data["evaluated_file"] = str(file_path)
+            rating_data["evaluation_timestamp"] = datetime.datetime.now().isoformat()
+            
+            # NOTE: File saving is now handled by the background process in main.py
+            print(f"✅ Profile rating evaluation completed for {file_path}")
+            print("📁 File will be saved by background process with proper organization")
             
-            except Exception as e:
-                print(f"❌ Unexpected error after attempting to fix JSON in profile_rater: {str(e)}")
-                return {
-                    "status": "error", 
-                    "message": f"Unexpected error processing response: {str(e)}",
-                    "raw_response": rating_text
-                }
-        else:
-            print(f"Error calling LLM: {response.status_code}")
-            return {"status": "error", "message": f"LLM API error: {response.status_code}"}
+            return rating_data
+        
+        except Exception as e:
+            print(f"❌ Unexpected error after attempting to fix JSON in profile_rater: {str(e)}")
+            return {
+                "status": "error", 
+                "message": f"Unexpected error processing response: {str(e)}",
+                "raw_response": rating_text
+            }
     
     except Exception as e:
         print(f"Exception in profile rating evaluation: {str(e)}")
@@ -0,0 +1,169 @@
+"""
+Prompt Assembly with Token Budgets for ConvAi-IntroEval
+
+Prompts are assembled from named sections (rubric, transcript, form data,
+...) so each section's token count is measured and recorded as
+llm.<stage>.prompt_section_tokens.<section>. Transcripts are compacted
+before they are inserted: the [MM:SS - MM:SS] segment markers and the
+"--- Transcription Metadata ---" footer carry nothing the model needs
+(pacing is measured locally by speech_analytics), so they are stripped.
+
+Each stage's prompt must fit its budget: the shared context window
+(LLM_NUM_CTX, sent as num_ctx) minus the tokens reserved for that stage's
+JSON answer. Past the budget the transcript is cut at a word boundary,
+since the rubric text is what makes the answer parseable; a prompt that
+still does not fit is recorded as over budget rather than silently
+truncated by the server.
+
+Token counts use the GPT-2 BPE encoding bundled in Whisper's assets
+(whisper.tokenizer, read from local files - nothing is downloaded on the
+evaluation path). It is close to, not identical to, Mistral's tokenizer,
+which the completion reserve absorbs. Without Whisper the count falls
+back to one token per CHARS_PER_TOKEN characters.
+
+Environment:
+    LLM_PROMPT_BUDGET_<STAGE>   prompt token budget for one stage (e.g.
+                                LLM_PROMPT_BUDGET_INTRO), default LLM_NUM_CTX
+                                minus the stage's completion reserve
+"""
+
+import logging
+import os
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+try:
+    from .llm_client import CHARS_PER_TOKEN, LLM_NUM_CTX
+except ImportError:  # Fallback for direct execution if needed
+    from llm_client import CHARS_PER_TOKEN, LLM_NUM_CTX
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Tokens kept free for each stage's JSON answer
+STAGE_COMPLETION_TOKENS = {
+    "extraction": 1024,
+    "profile": 768,
+    "intro": 768,
+    "fused": 1792
+}
+DEFAULT_COMPLETION_TOKENS = 1024
+TRUNCATION_MARK = " [...]"
+
+TIMESTAMP_MARKER = re.compile(r"\[\d{2,}:\d{2} - \d{2,}:\d{2}\][ \t]*")
+METADATA_FOOTER = "--- Transcription Metadata ---"
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """Whisper's bundled GPT-2 encoding, or None when Whisper is not installed"""
+    try:
+        from whisper.tokenizer import get_encoding
+        return get_encoding("gpt2")
+    except Exception as e:
+        logger.info(f"Whisper tokenizer unavailable, estimating tokens from characters: {e}")
+        return None
+
+
+@lru_cache(maxsize=256)  # Static rubric sections are counted once
+def count_tokens(text: str) -> int:
+    """Approximate number of model tokens in text"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def compact_transcript(transcript_text: str) -> str:
+    """
+    Strip non-semantic markup from a transcript file's text.
+
+    Removes the [MM:SS - MM:SS] segment markers and the metadata footer, and
+    joins the segments into one paragraph.
+    """
+    if not transcript_text:
+        return ""
+    text = transcript_text.split(METADATA_FOOTER, 1)[0]
+    text = TIMESTAMP_MARKER.sub("", text)
+    return " ".join(text.split())
+
+
+def stage_prompt_budget(stage: str) -> int:
+    """Prompt token budget for a stage"""
+    configured = os.environ.get(f"LLM_PROMPT_BUDGET_{stage.upper()}")
+    if configured:
+        return int(configured)
+    return LLM_NUM_CTX - STAGE_COMPLETION_TOKENS.get(stage, DEFAULT_COMPLETION_TOKENS)
+
+
+class PromptBuilder:
+    """
+    Assemble a prompt from named sections within a stage's token budget.
+
+    Usage:
+        prompt = (PromptBuilder("intro")
+                  .add("rubric", INTRO_PREFIX)
+                  .add_transcript(transcript_text)
+                  .add("instructions", CLOSING_TEXT)
+                  .build())
+    """
+
+    def __init__(self, stage: str, budget: Optional[int] = None):
+        self.stage = stage
+        self.budget = budget or stage_prompt_budget(stage)
+        self._sections: List[Tuple[str, str, bool]] = []  # name, text, trimmable
+
+    def add(self, name: str, text: str, trimmable: bool = False) -> "PromptBuilder":
+        """Append a section; trimmable sections are cut first when over budget"""
+        self._sections.append((name, text, trimmable))
+        return self
+
+    def add_transcript(self, transcript_text: str, name: str = "transcript") -> "PromptBuilder":
+        """Append a compacted, trimmable transcript section"""
+        compacted = compact_transcript(transcript_text)
+        saved = count_tokens(transcript_text or "") - count_tokens(compacted)
+        if saved > 0:
+            metrics.observe(f"llm.{self.stage}.compaction_saved_tokens", saved)
+        return self.add(name, compacted, trimmable=True)
+
+    def build(self) -> str:
+        """Join the sections, trimming if needed, and record the token accounting"""
+        counts = [count_tokens(text) for _, text, _ in self._sections]
+        total = sum(counts)
+
+        if total > self.budget:
+            for index, (name, text, trimmable) in enumerate(self._sections):
+                if not trimmable or total <= self.budget:
+                    continue
+                keep = max(0, counts[index] - (total - self.budget))
+                trimmed = self._trim(text, keep)
+                logger.warning(f"{self.stage} prompt over budget ({total} > {self.budget} tokens): "
+                               f"cut {name} from {counts[index]} to {count_tokens(trimmed)} tokens")
+                metrics.increment(f"llm.{self.stage}.prompt_trimmed")
+                self._sections[index] = (name, trimmed, trimmable)
+                total -= counts[index] - count_tokens(trimmed)
+                counts[index] = count_tokens(trimmed)
+            if total > self.budget:
+                logger.warning(f"{self.stage} prompt still over budget: {total} > {self.budget} tokens")
+                metrics.increment(f"llm.{self.stage}.prompt_over_budget")
+
+        for (name, _, _), count in zip(self._sections, counts):
+            metrics.observe(f"llm.{self.stage}.prompt_section_tokens.{name}", count)
+        metrics.observe(f"llm.{self.stage}.prompt_tokens_estimated", total)
+        return "".join(text for _, text, _ in self._sections)
+
+    def _trim(self, text: str, max_tokens: int) -> str:
+        """Cut text to at most max_tokens (including the truncation mark) at a word boundary"""
+        limit = max_tokens - count_tokens(TRUNCATION_MARK)
+        if limit <= 0:
+            return TRUNCATION_MARK.strip()
+        words = text.split(" ")
+        # Start from a proportional estimate, then drop words until it fits
+        keep = min(len(words), max(1, int(len(words) * limit / max(1, count_tokens(text)))))
+        while keep > 0 and count_tokens(" ".join(words[:keep])) > limit:
+            keep = int(keep * 0.9)
+        return " ".join(words[:keep]) + TRUNCATION_MARK
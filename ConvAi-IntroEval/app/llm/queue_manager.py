@@ -10,6 +10,7 @@ Date: June 27, 2025
 """
 
 import json
+import os
 import threading
 import time
 import logging
@@ -17,8 +18,9 @@ from datetime import datetime
 from enum import Enum
 from pathlib import Path
 from queue import Queue, Empty
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 import requests
 
 # Configure logging
@@ -26,15 +28,31 @@ logger = logging.getLogger(__name__)
 
 # Import existing modules
 from .utils import DISABLE_LLM
-from .form_extractor import extract_fields_from_transcript
+from .form_extractor import extract_fields_from_transcript, get_extraction_prompt
+from .fused_evaluator import extract_and_rate_profile, get_fused_prompt
 from .profile_rater_updated import evaluate_profile_rating
 from .intro_rater_updated import evaluate_intro_rating
+from .llm_client import LLM_PARALLEL_SLOTS, shared_client
 
 # Import STT function and file organizer
 import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))
-from stt import transcribe_file
+import stt as _local_stt  # In-process STT; same interface as STTServiceClient
+from stt import (
+    segments_path_for,
+    load_segments,
+    format_transcription,
+    PREVIEW_MODEL_SIZE,
+    STREAM_SEGMENTS
+)
 from file_organizer import organize_path, log_file_operation
+from audio_ingest import ingest_upload
+from stt_service import get_stt_service
+from metrics import metrics
+
+# Evaluation worker throttling
+EVAL_MIN_SAMPLES = 3  # Tasks needed at a concurrency level before comparing it
+EVAL_REPROBE_TASKS = 20  # Tasks at a throttled level before trying one more worker
 
 class PhaseType(Enum):
     STT_PHASE = "stt_phase"
@@ -57,6 +75,12 @@ class ProcessingTask:
     roll_number: str
     file_path: str
     transcript_path: Optional[str] = None
+    segments_path: Optional[str] = None
+    preview_transcript: Optional[str] = None  # Fast low-accuracy transcript shown until STT completes
+    partial_transcript: Optional["IncrementalTranscript"] = None  # Segments received so far (streaming STT)
+    prepared_extraction_prompt: Optional[str] = None  # Built from the streamed segments when STT finishes
+    fused_profile_rating: Optional[Dict[str, Any]] = None  # Profile rating returned with the form (fused mode)
+    llm_events: List[Dict[str, Any]] = None  # Partial LLM results streamed to the student page
     form_path: Optional[str] = None
     profile_rating_path: Optional[str] = None
     intro_rating_path: Optional[str] = None
@@ -70,17 +94,73 @@ class ProcessingTask:
             self.created_at = datetime.now()
         if self.phase_timestamps is None:
             self.phase_timestamps = {}
+        if self.llm_events is None:
+            self.llm_events = []
+
+class IncrementalTranscript:
+    """
+    Accumulates streamed STT segments for a task so the status page can show
+    progress and cheap local analysis before the transcript is final; once
+    the last segment is in, the extraction prompt is built from its text.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._parts: List[str] = []
+        self.segment_count = 0
+        self.word_count = 0
+        self.speech_seconds = 0.0
+        self.last_end = 0.0
+        self.low_confidence_segments = 0
+
+    def add_segment(self, segment: Dict[str, Any]):
+        """Append one decoded segment and update the running statistics"""
+        formatted = format_transcription([segment])
+        if not formatted:
+            return
+        with self._lock:
+            self._parts.append(formatted)
+            self.segment_count += 1
+            self.word_count += len(segment.get("text", "").split())
+            self.speech_seconds += max(0.0, segment.get("end", 0) - segment.get("start", 0))
+            self.last_end = max(self.last_end, segment.get("end", 0))
+            if segment.get("avg_logprob", 0) < -1.0:
+                self.low_confidence_segments += 1
+
+    @property
+    def text(self) -> str:
+        with self._lock:
+            return "\n\n".join(self._parts)
+
+    def summary(self) -> Dict[str, Any]:
+        """Running pre-analysis of the transcript so far"""
+        with self._lock:
+            minutes = self.speech_seconds / 60
+            return {
+                "segments": self.segment_count,
+                "words": self.word_count,
+                "transcribed_until": round(self.last_end, 1),
+                "speech_seconds": round(self.speech_seconds, 1),
+                "words_per_minute": round(self.word_count / minutes, 1) if minutes else None,
+                "low_confidence_segments": self.low_confidence_segments
+            }
 
 class TwoPhaseQueueManager:
     """
     Manages two-phase processing with mutual exclusion:
     Phase 1: STT Queue (sequential processing)
     Phase 2: Evaluation Queue (Mistral pipeline for both form extraction and rating)
+    
+    With streaming STT (STT_STREAM_SEGMENTS=1) a task skips the phase gate:
+    it is evaluated as soon as its last segment is in, while the STT worker
+    moves on to the next file. This deliberately overlaps the LLM with STT;
+    streamed evaluations are counted in _streamed_in_flight, not
+    _evaluation_in_flight, so they never hold back a switch to the STT phase.
     """
     def __init__(self, test_mode: bool = False):
         # Queue management
         self.stt_queue = Queue()
         self.evaluation_queue = Queue()
+        self.preview_queue = Queue()
         self.task_registry: Dict[str, ProcessingTask] = {}
         
         # Phase management
@@ -90,7 +170,8 @@ class TwoPhaseQueueManager:
         
         # Worker threads
         self.stt_worker_thread = None
-        self.evaluation_worker_thread = None
+        self.evaluation_worker_threads: List[threading.Thread] = []
+        self.preview_worker_thread = None
         self.monitor_thread = None
         
         # Test mode configuration
@@ -100,8 +181,50 @@ class TwoPhaseQueueManager:
         self.stt_timeout = 300  # 5 minutes timeout per STT task (was 30s)
         self.evaluation_timeout = 600  # 10 minutes timeout per evaluation (was 60s)
         
-        # Mistral endpoint (single LLM for all tasks)
-        self.mistral_endpoint = "http://localhost:11434/api/generate"
+        # STT batching - group up to this many queued files into one batched Whisper pass (1 = off)
+        self.stt_batch_size = max(1, int(os.environ.get("STT_BATCH_SIZE", "1")))
+        
+        # Preview STT - small model runs on its own thread so it never delays the final pass
+        self.preview_model = PREVIEW_MODEL_SIZE if not test_mode else ""
+        
+        # Streaming STT - hand segments to the task as they are decoded (single-file mode only);
+        # a streamed task is evaluated right away instead of waiting for the evaluation phase
+        self.stream_segments = STREAM_SEGMENTS
+        self.streamed_evaluation_executor = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="streamed-eval")
+            if self.stream_segments and not test_mode else None
+        )
+        
+        # Out-of-process STT service (STT_SERVICE_ADDRESS); None = transcribe in this process
+        self.stt_service = get_stt_service() if not test_mode else None
+        
+        # Profile and intro ratings are independent - run them in parallel LLM slots (1 = sequential)
+        self.rating_concurrency = max(1, int(os.environ.get("LLM_RATING_CONCURRENCY", "2")))
+        
+        # Fused mode - one LLM request returns both the extracted form and the profile rating
+        self.fused_profile = os.environ.get("LLM_FUSED_PROFILE", "0") == "1"
+        
+        # Streamed LLM output - completed form sections and rubric items pushed over SSE
+        self.stream_llm_events = os.environ.get("LLM_STREAM_EVENTS", "1") == "1"
+        self.max_task_events = 500
+        self._events_lock = threading.Lock()
+        
+        # Evaluation workers - one task per worker in the LLM stage at a time
+        self.evaluation_workers = self._resolve_evaluation_workers()
+        # Shared by all workers (and the streamed evaluation thread): sized so each of them
+        # can have rating_concurrency ratings in flight at once
+        rating_tasks = self.evaluation_workers + (1 if self.streamed_evaluation_executor else 0)
+        self.rating_executor = (
+            ThreadPoolExecutor(max_workers=rating_tasks * self.rating_concurrency, thread_name_prefix="rating")
+            if self.rating_concurrency > 1 else None
+        )
+        self.active_evaluation_workers = self.evaluation_workers  # Lowered if latency degrades
+        self.evaluation_latency_limit = float(os.environ.get("EVAL_LATENCY_LIMIT_FACTOR", "2.0"))
+        self._evaluation_in_flight = 0
+        self._streamed_in_flight = 0  # Streamed evaluations running alongside STT (outside the phase gate)
+        self._evaluation_lock = threading.Lock()
+        self._evaluation_levels: Dict[int, Dict[str, float]] = {}  # concurrency -> tasks, seconds
+        self._throttled_task_count = 0
         
         # Initialize processing times tracking
         self._processing_times = []
@@ -118,7 +241,10 @@ class TwoPhaseQueueManager:
         mode_str = "TEST" if test_mode else "PRODUCTION"
         logger.info(f"TwoPhaseQueueManager initialized ({mode_str})")
         if not test_mode and not DISABLE_LLM:
-            logger.info(f"Mistral endpoint: {self.mistral_endpoint}")
+            logger.info(f"LLM backend: {shared_client.backend.name} at {', '.join(shared_client.endpoints)}")
+            logger.info(f"Evaluation workers: {self.evaluation_workers}")
+        if self.stt_service:
+            logger.info(f"Using out-of-process STT service at {self.stt_service.address}")
         elif test_mode:
             logger.debug("Test mode: File processing will be mocked")
             
@@ -171,8 +297,10 @@ class TwoPhaseQueueManager:
         
         self.task_registry[task_id] = task
         
-        # Add to STT queue
+        # Add to STT queue (and the independent preview queue if enabled)
         self.stt_queue.put(task_id)
+        if self.preview_model:
+            self.preview_queue.put(task_id)
         self.stats["total_tasks"] += 1
         
         logger.info(f"Added task {task_id} to STT queue (Queue size: {self.stt_queue.qsize()})")
@@ -213,11 +341,18 @@ class TwoPhaseQueueManager:
                 "system_stats": self.get_system_stats(),
                 # Include file paths for reference
                 "transcript_path": task.transcript_path,
+                "segments_path": task.segments_path,
                 "form_path": task.form_path,
                 "profile_rating_path": task.profile_rating_path,
-                "intro_rating_path": task.intro_rating_path
+                "intro_rating_path": task.intro_rating_path,
+                "preview_transcript": task.preview_transcript
             }
             
+            # Live transcript while streaming STT is still running
+            if task.partial_transcript is not None and task.transcript_path is None:
+                status_response["partial_transcript"] = task.partial_transcript.text
+                status_response["partial_analysis"] = task.partial_transcript.summary()
+            
             # If task is complete, include file contents for immediate display
             if task.status == TaskStatus.COMPLETE:
                 try:
@@ -238,6 +373,40 @@ class TwoPhaseQueueManager:
                 "error_code": "SYSTEM_ERROR"
             }
             
+    def _partial_handler(self, task: ProcessingTask):
+        """on_partial callback that records streamed LLM values as task events"""
+        if not self.stream_llm_events:
+            return None
+        
+        def on_partial(stage: str, path: list, value: Any):
+            with self._events_lock:
+                if len(task.llm_events) >= self.max_task_events:
+                    return
+                task.llm_events.append({
+                    "id": len(task.llm_events) + 1,
+                    "stage": stage,
+                    "path": path,
+                    "value": value
+                })
+        return on_partial
+    
+    def get_task_events(self, task_id: str, since: int = 0) -> List[Dict[str, Any]]:
+        """
+        Get the partial LLM results recorded for a task after event id `since`
+        
+        Args:
+            task_id: Task identifier
+            since: Last event id the client has already seen
+        
+        Returns:
+            list: Events with id, stage, path and value, oldest first
+        """
+        task = self.task_registry.get(task_id)
+        if task is None:
+            return []
+        with self._events_lock:
+            return task.llm_events[since:]
+    
     def _get_queue_position(self, task_id: str) -> Optional[int]:
         """Get position of task in current queue"""
         try:
@@ -364,7 +533,8 @@ class TwoPhaseQueueManager:
             "failed_tasks": self.stats["failed_tasks"],
             "processing_active": self.processing_active,
             "phase_switch_count": self.stats["phase_switch_count"],
-            "average_processing_time": avg_time
+            "average_processing_time": avg_time,
+            "evaluation_workers": self.get_evaluation_throughput()
         }
 
     def start_processing(self):
@@ -380,6 +550,11 @@ class TwoPhaseQueueManager:
         self.monitor_thread = threading.Thread(target=self._phase_monitor, daemon=True)
         self.monitor_thread.start()
         
+        # Start preview worker (independent of the STT/evaluation phases)
+        if self.preview_model and not (self.preview_worker_thread and self.preview_worker_thread.is_alive()):
+            self.preview_worker_thread = threading.Thread(target=self._preview_worker, daemon=True)
+            self.preview_worker_thread.start()
+        
         # Switch to STT phase if we have tasks
         if not self.stt_queue.empty():
             self._switch_to_stt_phase()
@@ -393,8 +568,12 @@ class TwoPhaseQueueManager:
         if self.stt_worker_thread and self.stt_worker_thread.is_alive():
             self.stt_worker_thread.join(timeout=10)
         
-        if self.evaluation_worker_thread and self.evaluation_worker_thread.is_alive():
-            self.evaluation_worker_thread.join(timeout=10)    
+        for worker in self.evaluation_worker_threads:
+            if worker.is_alive():
+                worker.join(timeout=10)
+        
+        if self.preview_worker_thread and self.preview_worker_thread.is_alive():
+            self.preview_worker_thread.join(timeout=10)    
     def _phase_monitor(self):
         """Monitor phases and switch when appropriate"""
         monitor_cycle = 0
@@ -403,7 +582,7 @@ class TwoPhaseQueueManager:
                 with self.phase_lock:
                     # Check worker thread status
                     stt_worker_active = self.stt_worker_thread and self.stt_worker_thread.is_alive()
-                    eval_worker_active = self.evaluation_worker_thread and self.evaluation_worker_thread.is_alive()
+                    eval_worker_active = self._evaluation_workers_alive()
                     
                     # Check queue status
                     stt_queue_has_tasks = not self.stt_queue.empty()
@@ -492,15 +671,10 @@ class TwoPhaseQueueManager:
         self.stats["current_phase_start"] = datetime.now()
         self.stats["phase_switch_count"] += 1
         
-        # Wait for any existing evaluation worker to finish
-        if self.evaluation_worker_thread and self.evaluation_worker_thread.is_alive():
-            # Check if we're trying to join the current thread (avoid "cannot join current thread" error)
-            current_thread = threading.current_thread()
-            if self.evaluation_worker_thread == current_thread:
-                logger.debug("Evaluation worker initiating phase switch - continuing gracefully")
-            else:
-                logger.debug("Waiting for evaluation worker to finish...")
-                self.evaluation_worker_thread.join(timeout=5)
+        # Evaluation workers are not joined here: callers hold phase_lock (and a worker
+        # also _evaluation_lock), which idle workers need before they can exit. The
+        # switch only happens with no task in the LLM stage, so the remaining
+        # workers are idle and stop on their own once they see the new phase.
         
         # Start STT worker (only if not already running)
         if not (self.stt_worker_thread and self.stt_worker_thread.is_alive()):
@@ -510,11 +684,10 @@ class TwoPhaseQueueManager:
     def _switch_to_evaluation_phase(self):
         """Switch to evaluation processing phase and ensure worker thread is running"""
         if self.current_phase == PhaseType.EVALUATION_PHASE:
-            # If already in evaluation phase, just ensure worker is running
-            if not (self.evaluation_worker_thread and self.evaluation_worker_thread.is_alive()) and not self.evaluation_queue.empty():
-                logger.debug("Restarting evaluation worker thread in existing evaluation phase")
-                self.evaluation_worker_thread = threading.Thread(target=self._evaluation_worker, daemon=True)
-                self.evaluation_worker_thread.start()
+            # If already in evaluation phase, just ensure workers are running
+            if not self._evaluation_workers_alive() and not self.evaluation_queue.empty():
+                logger.debug("Restarting evaluation worker threads in existing evaluation phase")
+                self._start_evaluation_workers()
             return
         
         logger.info(f"Switching to Evaluation Phase (Queue: {self.evaluation_queue.qsize()} tasks)")
@@ -532,11 +705,43 @@ class TwoPhaseQueueManager:
                 logger.debug("Waiting for STT worker to finish current task...")
                 self.stt_worker_thread.join(timeout=5)
             
-        # Start evaluation worker (only if not already running)
-        if not (self.evaluation_worker_thread and self.evaluation_worker_thread.is_alive()):
-            self.evaluation_worker_thread = threading.Thread(target=self._evaluation_worker, daemon=True)
-            self.evaluation_worker_thread.start()
-            logger.info("Started new evaluation worker thread")
+        # Start evaluation workers (only those not already running)
+        started = self._start_evaluation_workers()
+        if started:
+            logger.info(f"Started {started} evaluation worker thread(s)")
+
+    def _resolve_evaluation_workers(self) -> int:
+        """
+        Number of evaluation workers: EVAL_WORKERS if set, otherwise as many
+        tasks as the LLM server's parallel slots can serve at once (each task
+        uses up to rating_concurrency slots while both ratings run).
+        """
+        configured = os.environ.get("EVAL_WORKERS")
+        if configured:
+            return max(1, int(configured))
+        if LLM_PARALLEL_SLOTS:
+            return max(1, LLM_PARALLEL_SLOTS // self.rating_concurrency)
+        return 1
+
+    def _evaluation_workers_alive(self) -> bool:
+        """Check whether any evaluation worker thread is running"""
+        return any(worker.is_alive() for worker in self.evaluation_worker_threads)
+
+    def _start_evaluation_workers(self) -> int:
+        """Start evaluation workers up to the configured count; returns how many were started"""
+        self.evaluation_worker_threads = [w for w in self.evaluation_worker_threads if w.is_alive()]
+        running = {worker.worker_index for worker in self.evaluation_worker_threads}
+        started = 0
+        for index in range(self.evaluation_workers):
+            if index in running:
+                continue
+            worker = threading.Thread(target=self._evaluation_worker, args=(index,), daemon=True)
+            worker.worker_index = index
+            worker.start()
+            self.evaluation_worker_threads.append(worker)
+            started += 1
+        return started
+
     def _switch_to_idle(self):
         """Switch to idle state, ready to process new tasks when they arrive"""
         if self.current_phase == PhaseType.IDLE:
@@ -551,8 +756,7 @@ class TwoPhaseQueueManager:
         if self.stt_worker_thread and not self.stt_worker_thread.is_alive():
             self.stt_worker_thread = None
             
-        if self.evaluation_worker_thread and not self.evaluation_worker_thread.is_alive():
-            self.evaluation_worker_thread = None
+        self.evaluation_worker_threads = [w for w in self.evaluation_worker_threads if w.is_alive()]
         
         # Double-check queues one last time to prevent race conditions
         if not self.stt_queue.empty():
@@ -591,6 +795,17 @@ class TwoPhaseQueueManager:
                     logger.warning(f"Task {task_id} not found in registry")
                     continue
                 
+                # Batch mode: drain more queued tasks and transcribe them together
+                if self.stt_batch_size > 1 and not self.test_mode:
+                    batch_ids = [task_id]
+                    while len(batch_ids) < self.stt_batch_size:
+                        try:
+                            batch_ids.append(self.stt_queue.get_nowait())
+                        except Empty:
+                            break
+                    self._process_stt_batch(batch_ids)
+                    continue
+                
                 task = self.task_registry[task_id]
                 logger.info(f"Processing STT for task {task_id} (user: {task.user_id}, roll: {task.roll_number})")
                 
@@ -601,18 +816,7 @@ class TwoPhaseQueueManager:
                 # Process STT - Complete this task regardless of phase changes
                 try:
                     # Wait for file to be available
-                    file_path = Path(task.file_path)
-                    max_wait_time = 10  # seconds
-                    wait_interval = 0.5
-                    total_wait = 0
-                    
-                    while not file_path.exists() and total_wait < max_wait_time:
-                        if total_wait % 2 == 0:  # Log every 2 seconds only
-                            logger.debug(f"Waiting for file: {file_path} (waited {total_wait:.1f}s)")
-                        time.sleep(wait_interval)
-                        total_wait += wait_interval
-                    if not file_path.exists():
-                        raise FileNotFoundError(f"File not found after waiting {max_wait_time}s: {file_path}")
+                    file_path = self._wait_for_file(task.file_path)
                     
                     if self.test_mode:
                         # TEST MODE: Mock STT processing
@@ -635,23 +839,36 @@ class TwoPhaseQueueManager:
                         log_file_operation("CREATE mock transcript", transcript_path, task.roll_number)
                     else:
                         # PRODUCTION MODE: Real STT processing
+                        file_path = self._ingest_upload(task, file_path)
                         logger.info(f"Starting transcription for {task.file_path}")
-                        transcript_content, transcript_path = transcribe_file(
+                        on_segment = None
+                        if self.stream_segments:
+                            task.partial_transcript = IncrementalTranscript()
+                            on_segment = task.partial_transcript.add_segment
+                        transcript_content, transcript_path = (self.stt_service or _local_stt).transcribe_file(
                             file_path, 
                             Path("transcription"),
-                            task.roll_number
+                            task.roll_number,
+                            on_segment=on_segment
                         )
                         
                         task.transcript_path = str(transcript_path)
+                        task.segments_path = str(segments_path_for(transcript_path))
+                        task.preview_transcript = None  # Final transcript replaces the preview
                         log_file_operation("CREATE transcript", transcript_path, task.roll_number)
                     
                     task.status = TaskStatus.STT_COMPLETE
                     task.phase_timestamps["stt_complete"] = datetime.now()
-                    
-                    # Add to evaluation queue
-                    self.evaluation_queue.put(task_id)
                     logger.info(f"STT complete for {task_id}: {transcript_path}")
-                    logger.debug(f"Added {task_id} to evaluation queue (size: {self.evaluation_queue.qsize()})")
+                    
+                    if task.partial_transcript is not None and self.streamed_evaluation_executor:
+                        # Streamed task - evaluate now from the segments, outside the phase gate
+                        self._prepare_extraction_prompt(task)
+                        self.streamed_evaluation_executor.submit(self._evaluate_streamed_task, task_id, task)
+                    else:
+                        # Add to evaluation queue
+                        self.evaluation_queue.put(task_id)
+                        logger.debug(f"Added {task_id} to evaluation queue (size: {self.evaluation_queue.qsize()})")
                     
                     # Mark task as completed in the queue
                     self.stt_queue.task_done()
@@ -685,9 +902,127 @@ class TwoPhaseQueueManager:
                     logger.info("STT worker exited: Recommending switch to idle state")
                     self._switch_to_idle()
 
-    def _evaluation_worker(self):
+    def _wait_for_file(self, file_path: str, max_wait_time: float = 10) -> Path:
+        """Wait for an uploaded file to appear on disk"""
+        file_path = Path(file_path)
+        wait_interval = 0.5
+        total_wait = 0
+        
+        while not file_path.exists() and total_wait < max_wait_time:
+            if total_wait % 2 == 0:  # Log every 2 seconds only
+                logger.debug(f"Waiting for file: {file_path} (waited {total_wait:.1f}s)")
+            time.sleep(wait_interval)
+            total_wait += wait_interval
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found after waiting {max_wait_time}s: {file_path}")
+        return file_path
+
+    def _ingest_upload(self, task: ProcessingTask, file_path: Path) -> Path:
+        """Swap the uploaded video for its extracted 16 kHz mono audio before STT reads it"""
+        stt_input_path = Path(ingest_upload(file_path, task.roll_number))
+        task.file_path = str(stt_input_path)
+        return stt_input_path
+
+    def _process_stt_batch(self, task_ids: List[str]):
+        """Transcribe several queued tasks in one batched Whisper pass"""
+        tasks = []
+        for task_id in task_ids:
+            task = self.task_registry.get(task_id)
+            if task is None:
+                logger.warning(f"Task {task_id} not found in registry")
+                self.stt_queue.task_done()
+                continue
+            
+            task.status = TaskStatus.PROCESSING
+            task.phase_timestamps["stt_start"] = datetime.now()
+            try:
+                file_path = self._ingest_upload(task, self._wait_for_file(task.file_path))
+                tasks.append((task_id, task, file_path))
+            except Exception as e:
+                self._fail_stt_task(task_id, task, e)
+        
+        if not tasks:
+            return
+        
+        logger.info(f"Processing batched STT for {len(tasks)} tasks")
+        try:
+            results = (self.stt_service or _local_stt).transcribe_batch([
+                (file_path, Path("transcription"), task.roll_number) for _, task, file_path in tasks
+            ])
+        except Exception as e:
+            results = [e] * len(tasks)
+        
+        for (task_id, task, _), result in zip(tasks, results):
+            if isinstance(result, Exception):
+                self._fail_stt_task(task_id, task, result)
+                continue
+            
+            _, transcript_path = result
+            task.transcript_path = str(transcript_path)
+            task.segments_path = str(segments_path_for(transcript_path))
+            task.preview_transcript = None  # Final transcript replaces the preview
+            log_file_operation("CREATE transcript", transcript_path, task.roll_number)
+            task.status = TaskStatus.STT_COMPLETE
+            task.phase_timestamps["stt_complete"] = datetime.now()
+            self.evaluation_queue.put(task_id)
+            self.stt_queue.task_done()
+            logger.info(f"STT complete for {task_id}: {transcript_path}")
+
+    def _prepare_extraction_prompt(self, task: ProcessingTask):
+        """Build the form extraction prompt from the streamed segments instead of re-reading the transcript file"""
+        try:
+            build_prompt = get_fused_prompt if self.fused_profile else get_extraction_prompt
+            text = task.partial_transcript.text
+            task.prepared_extraction_prompt = build_prompt(text) if text else None
+        except Exception as e:
+            logger.warning(f"Could not prepare extraction prompt for {task.user_id}: {e}")
+            task.prepared_extraction_prompt = None
+
+    def _preview_worker(self):
+        """Produce quick preview transcripts with a small model while tasks wait for the final pass"""
+        logger.info(f"Preview worker started (model: {self.preview_model})")
+        
+        while self.processing_active:
+            try:
+                task_id = self.preview_queue.get(timeout=1)
+            except Empty:
+                continue
+            
+            try:
+                task = self.task_registry.get(task_id)
+                # Skip tasks whose final transcript is already done (or that failed)
+                if task is None or task.transcript_path or task.status not in (TaskStatus.PENDING, TaskStatus.PROCESSING):
+                    continue
+                
+                file_path = self._wait_for_file(task.file_path)
+                preview = (self.stt_service or _local_stt).transcribe_preview(file_path, self.preview_model)
+                
+                # The final pass may have finished while the preview was running
+                if task.transcript_path is None:
+                    task.preview_transcript = preview
+                    task.phase_timestamps["preview_complete"] = datetime.now()
+                    logger.info(f"Preview transcript ready for {task_id}")
+            except Exception as e:
+                logger.warning(f"Preview transcription failed for {task_id}: {e}")
+            finally:
+                self.preview_queue.task_done()
+        
+        logger.info("Preview worker stopped")
+
+    def _fail_stt_task(self, task_id: str, task: ProcessingTask, error: Exception):
+        """Mark a task as failed during the STT phase"""
+        logger.error(f"STT failed for {task_id}: {error}")
+        task.status = TaskStatus.FAILED
+        task.error_message = f"STT processing failed: {error}"
+        self.stats["failed_tasks"] += 1
+        try:
+            self.stt_queue.task_done()
+        except Exception:
+            pass
+
+    def _evaluation_worker(self, worker_index: int = 0):
         """Worker for evaluation phase - processes with Mistral pipeline"""
-        logger.info("Evaluation worker started")
+        logger.info(f"Evaluation worker {worker_index} started")
         
         # Continue processing while active AND either still in EVALUATION phase OR has queued tasks
         while self.processing_active:
@@ -697,6 +1032,11 @@ class TwoPhaseQueueManager:
                     logger.debug(f"Evaluation worker: Phase changed to {self.current_phase.value}, stopping worker")
                     break
                 
+                # Stand by while throttled below this worker's index
+                if worker_index >= self.active_evaluation_workers:
+                    time.sleep(1)
+                    continue
+                
                 # Get task from evaluation queue
                 try:
                     task_id = self.evaluation_queue.get(timeout=5)
@@ -705,8 +1045,9 @@ class TwoPhaseQueueManager:
                     if self.evaluation_queue.empty() and not self.stt_queue.empty():
                         # Suggest phase transition if STT queue has tasks
                         logger.debug("Evaluation worker: Suggesting phase transition to STT")
-                        with self.phase_lock:
-                            if self.current_phase == PhaseType.EVALUATION_PHASE:
+                        with self.phase_lock, self._evaluation_lock:
+                            # Only switch once no other worker still has a task in the LLM stage
+                            if self.current_phase == PhaseType.EVALUATION_PHASE and self._evaluation_in_flight == 0:
                                 self._switch_to_stt_phase()
                         break
                     continue
@@ -718,21 +1059,15 @@ class TwoPhaseQueueManager:
                 task = self.task_registry[task_id]
                 logger.info(f"Processing evaluation for task {task_id} (user: {task.user_id}, roll: {task.roll_number})")
                 
-                task.phase_timestamps["evaluation_start"] = datetime.now()
-                
-                # Step 1: Form extraction with Mistral
-                self._process_form_extraction(task)
-                
-                if task.status == TaskStatus.FAILED:
-                    # Mark task as completed in the queue even on failure
-                    try:
+                with self._evaluation_lock:
+                    if self.current_phase != PhaseType.EVALUATION_PHASE:
+                        # Another worker switched phases while this one was dequeuing
+                        self.evaluation_queue.put(task_id)
                         self.evaluation_queue.task_done()
-                    except Exception:
-                        pass
-                    continue
-                
-                # Step 2: Rating generation with Mistral
-                self._process_rating_generation(task)
+                        break
+                    self._evaluation_in_flight += 1
+                    concurrency = self._evaluation_in_flight
+                self._evaluate_task(task, concurrency)
                 
                 # Mark task as completed in the queue
                 try:
@@ -748,10 +1083,10 @@ class TwoPhaseQueueManager:
                 logger.error(f"Error in evaluation worker: {e}")
                 time.sleep(1)
         
-        logger.info("Evaluation worker stopped")
+        logger.info(f"Evaluation worker {worker_index} stopped")
         
         # After worker stops, check if we need to transition to idle or STT phase
-        if self.current_phase == PhaseType.EVALUATION_PHASE:
+        if self.current_phase == PhaseType.EVALUATION_PHASE and self._evaluation_in_flight == 0:
             with self.phase_lock:
                 if self.evaluation_queue.empty() and not self.stt_queue.empty():
                     logger.info("Evaluation worker exited: Recommending switch to STT phase")
@@ -760,6 +1095,119 @@ class TwoPhaseQueueManager:
                     logger.info("Evaluation worker exited: Recommending switch to idle state")
                     self._switch_to_idle()
 
+    def _evaluate_task(self, task: ProcessingTask, concurrency: int):
+        """Run form extraction and rating for a task already counted in _evaluation_in_flight"""
+        evaluation_start = time.time()
+        try:
+            self._run_evaluation(task)
+        finally:
+            with self._evaluation_lock:
+                self._evaluation_in_flight -= 1
+        
+        if task.status != TaskStatus.FAILED:
+            self._record_evaluation_latency(concurrency, time.time() - evaluation_start)
+
+    def _run_evaluation(self, task: ProcessingTask):
+        """Form extraction followed by rating generation"""
+        task.phase_timestamps["evaluation_start"] = datetime.now()
+        
+        # Step 1: Form extraction with Mistral
+        self._process_form_extraction(task)
+        
+        # Step 2: Rating generation with Mistral
+        if task.status != TaskStatus.FAILED:
+            self._process_rating_generation(task)
+
+    def _evaluate_streamed_task(self, task_id: str, task: ProcessingTask):
+        """
+        Evaluate a streamed task as soon as its last segment is in, regardless of the current phase.
+
+        This runs alongside STT on purpose, so it is tracked in _streamed_in_flight
+        and kept out of the evaluation worker latency levels used for throttling.
+        """
+        logger.info(f"Processing streamed evaluation for task {task_id} (user: {task.user_id}, roll: {task.roll_number})")
+        with self._evaluation_lock:
+            self._streamed_in_flight += 1
+        evaluation_start = time.time()
+        try:
+            self._run_evaluation(task)
+            if task.status != TaskStatus.FAILED:
+                metrics.observe("evaluation.streamed_latency_seconds", time.time() - evaluation_start)
+        except Exception as e:
+            logger.error(f"Streamed evaluation failed for {task_id}: {e}")
+            task.status = TaskStatus.FAILED
+            task.error_message = f"Evaluation failed: {e}"
+            self.stats["failed_tasks"] += 1
+        finally:
+            with self._evaluation_lock:
+                self._streamed_in_flight -= 1
+
+    def _record_evaluation_latency(self, concurrency: int, seconds: float):
+        """
+        Record per-task evaluation latency at the concurrency it ran with and
+        throttle the worker count if latency degrades past the limit.
+
+        Parallel slots share the GPU, so per-task latency rises with
+        concurrency; extra workers only pay off while throughput still
+        improves and latency stays within evaluation_latency_limit x the
+        single-worker latency.
+        """
+        with self._evaluation_lock:
+            level = self._evaluation_levels.setdefault(concurrency, {"tasks": 0, "seconds": 0.0})
+            level["tasks"] += 1
+            level["seconds"] += seconds
+            metrics.observe(f"evaluation.latency_seconds.c{concurrency}", seconds)
+            
+            if self.active_evaluation_workers < self.evaluation_workers:
+                # Re-probe the next worker count after a while at the reduced level
+                self._throttled_task_count += 1
+                if self._throttled_task_count >= EVAL_REPROBE_TASKS:
+                    self._throttled_task_count = 0
+                    self._evaluation_levels.pop(self.active_evaluation_workers + 1, None)
+                    self.active_evaluation_workers += 1
+                    logger.info(f"Re-probing {self.active_evaluation_workers} evaluation workers")
+                return
+            
+            if concurrency < 2 or level["tasks"] < EVAL_MIN_SAMPLES:
+                return
+            lower = self._evaluation_levels.get(concurrency - 1)
+            baseline = self._evaluation_levels.get(1)
+            if not lower or lower["tasks"] < EVAL_MIN_SAMPLES:
+                return
+            
+            mean_latency = level["seconds"] / level["tasks"]
+            lower_latency = lower["seconds"] / lower["tasks"]
+            no_throughput_gain = concurrency / mean_latency <= (concurrency - 1) / lower_latency
+            latency_collapsed = (
+                baseline is not None and baseline["tasks"] >= EVAL_MIN_SAMPLES
+                and mean_latency > self.evaluation_latency_limit * baseline["seconds"] / baseline["tasks"]
+            )
+            if no_throughput_gain or latency_collapsed:
+                self.active_evaluation_workers = concurrency - 1
+                self._throttled_task_count = 0
+                metrics.increment("evaluation.worker_throttles")
+                reason = "no throughput gain" if no_throughput_gain else "latency limit exceeded"
+                logger.warning(f"Reducing evaluation workers to {self.active_evaluation_workers} ({reason} at {concurrency})")
+
+    def get_evaluation_throughput(self) -> Dict[str, Any]:
+        """Per-task latency and throughput measured at each evaluation concurrency"""
+        with self._evaluation_lock:
+            levels = {}
+            for concurrency, level in sorted(self._evaluation_levels.items()):
+                mean_latency = level["seconds"] / level["tasks"]
+                levels[str(concurrency)] = {
+                    "tasks": level["tasks"],
+                    "mean_latency_seconds": round(mean_latency, 1),
+                    "tasks_per_minute": round(concurrency * 60 / mean_latency, 2) if mean_latency else None
+                }
+            return {
+                "configured": self.evaluation_workers,
+                "active": self.active_evaluation_workers,
+                "in_flight": self._evaluation_in_flight,
+                "streamed_in_flight": self._streamed_in_flight,
+                "by_concurrency": levels
+            }
+
     def _process_form_extraction(self, task: ProcessingTask):
         """Process form extraction for a task"""
         try:
@@ -795,12 +1243,26 @@ class TwoPhaseQueueManager:
                 
             elif not DISABLE_LLM and task.transcript_path:
                 # PRODUCTION MODE: Real form extraction
-                # Read transcript content
-                with open(task.transcript_path, 'r', encoding='utf-8') as f:
-                    transcript_content = f.read()
+                if task.prepared_extraction_prompt:
+                    # Prompt was built from the streamed segments - no re-read needed
+                    transcript_content = None
+                else:
+                    # Read transcript content
+                    with open(task.transcript_path, 'r', encoding='utf-8') as f:
+                        transcript_content = f.read()
                 
                 # Extract fields using Mistral
-                form_result = extract_fields_from_transcript(transcript_content, task.roll_number)
+                extract = extract_and_rate_profile if self.fused_profile else extract_fields_from_transcript
+                form_result = extract(
+                    transcript_content, task.roll_number, prompt=task.prepared_extraction_prompt,
+                    on_partial=self._partial_handler(task)
+                )
+                task.prepared_extraction_prompt = None
+                
+                # Fused mode: keep the profile rating unless it failed validation (then rated separately)
+                fused_rating = (form_result or {}).pop("profile_rating", None)
+                if fused_rating and fused_rating.get("status") != "error":
+                    task.fused_profile_rating = fused_rating
                 
                 if form_result and form_result.get('status') == 'saved':
                     task.form_path = form_result.get('file', '')
@@ -873,11 +1335,26 @@ class TwoPhaseQueueManager:
                 # Save mock ratings
                 self._save_ratings(task, mock_profile_rating, mock_intro_rating)
             elif not DISABLE_LLM and task.form_path and task.transcript_path:
-                # Generate profile rating using Mistral
-                profile_rating = evaluate_profile_rating(task.form_path)
-                
-                # Generate intro rating using Mistral
-                intro_rating = evaluate_intro_rating(task.transcript_path)
+                rating_start = time.time()
+                on_partial = self._partial_handler(task)
+                if task.fused_profile_rating:
+                    # Profile was rated together with the form extraction
+                    profile_rating = task.fused_profile_rating
+                    task.fused_profile_rating = None
+                    intro_rating = evaluate_intro_rating(task.transcript_path, on_partial)
+                elif self.rating_executor:
+                    # Generate both ratings concurrently; the task waits for the slower one
+                    profile_future = self.rating_executor.submit(evaluate_profile_rating, task.form_path, on_partial)
+                    intro_future = self.rating_executor.submit(evaluate_intro_rating, task.transcript_path, on_partial)
+                    profile_rating = profile_future.result()
+                    intro_rating = intro_future.result()
+                else:
+                    # Generate profile rating using Mistral
+                    profile_rating = evaluate_profile_rating(task.form_path, on_partial)
+                    
+                    # Generate intro rating using Mistral
+                    intro_rating = evaluate_intro_rating(task.transcript_path, on_partial)
+                metrics.observe("llm.rating.wall_seconds", time.time() - rating_start)
                 
                 # Save ratings
                 self._save_ratings(task, profile_rating, intro_rating)
@@ -952,6 +1429,7 @@ class TwoPhaseQueueManager:
                     "created_at": task.created_at.isoformat(),
                     "file_path": task.file_path,
                     "transcript_path": task.transcript_path,
+                    "segments_path": task.segments_path,
                     "form_path": task.form_path,
                     "profile_rating_path": task.profile_rating_path,
                     "intro_rating_path": task.intro_rating_path,
@@ -978,6 +1456,12 @@ class TwoPhaseQueueManager:
                 with open(task.transcript_path, 'r', encoding='utf-8') as f:
                     result["transcript_content"] = f.read()
             
+            # Load structured segments (timings and confidence) if written
+            if task.segments_path:
+                segments = load_segments(task.segments_path)
+                if segments is not None:
+                    result["transcript_segments"] = segments
+            
             # Load form data
             if task.form_path and Path(task.form_path).exists():
                 with open(task.form_path, 'r', encoding='utf-8') as f:
@@ -1019,6 +1503,7 @@ class TwoPhaseQueueManager:
             "roll_number": task.roll_number,
             "file_path": task.file_path,
             "transcript_path": task.transcript_path,
+            "segments_path": task.segments_path,
             "form_path": task.form_path,
             "profile_rating_path": task.profile_rating_path,
             "intro_rating_path": task.intro_rating_path,
@@ -0,0 +1,217 @@
+"""
+JSON Schemas for Structured LLM Output
+
+Each LLM stage passes its schema as Ollama's "format" field, so Mistral's
+decoding is constrained to a valid JSON object with the expected keys.
+The responses then parse with a plain json.loads and the repair path in
+utils.preprocess_llm_json_response only runs as a fallback.
+
+Environment:
+    LLM_STRUCTURED_OUTPUT=schema|json|off
+        schema - constrain output to the stage's JSON schema (default; Ollama >= 0.5)
+        json   - only constrain output to valid JSON (older Ollama versions)
+        off    - unconstrained text, as before
+"""
+
+import os
+
+LLM_STRUCTURED_OUTPUT = os.environ.get("LLM_STRUCTURED_OUTPUT", "schema").lower()
+
+
+def _text_fields(*names: str) -> dict:
+    """Object schema whose properties are all required strings"""
+    return {
+        "type": "object",
+        "properties": {name: {"type": "string"} for name in names},
+        "required": list(names)
+    }
+
+
+def _numbers(*names: str) -> dict:
+    return {name: {"type": "number"} for name in names}
+
+
+# Form sections as (key, title, [(field key, what to extract), ...]). The
+# extraction prompt (form_extractor.EXTRACTION_INSTRUCTIONS) and
+# EXTRACTION_SCHEMA are both generated from this list, so the key names the
+# model is constrained to are the ones it is told about. The profile rubric's
+# completeness formula keeps its own field count (35) and categories.
+EXTRACTION_SECTIONS = [
+    ("personal_details", "Personal Details", [
+        ("name", "Name (full name as mentioned)"),
+        ("age", "Age (exact number only - if mentioned, but not required for evaluation)"),
+        ("languages_known", "Languages known (list all mentioned languages with proficiency levels if stated)"),
+        ("hometown", "Hometown/Origin (where they're from - city, state, or region)")
+    ]),
+    ("academic_focus", "Academic Focus", [
+        ("degree_program", "Current degree program (B.Tech, B.E., M.Tech, etc.)"),
+        ("year_of_study", "Year of study (1st year, 2nd year, 3rd year, 4th year, final year)"),
+        ("major", "Major/Specialization (Computer Science, Mechanical, Electronics, etc.)"),
+        ("college", "College/University (full institution name)"),
+        ("cgpa", "CGPA (exact value with scale, e.g., \"8.5/10\" - only if mentioned proudly)"),
+        ("academic_projects", "Academic projects (course projects, final year projects, semester projects)")
+    ]),
+    ("practical_experience", "Practical Experience", [
+        ("internships", "Internships (summer internships, industry exposure, company names, duration)"),
+        ("workshops_and_certifications",
+         "Workshops and certifications (specific workshops attended, certifications earned)"),
+        ("college_competitions",
+         "College competitions (hackathons, coding competitions, technical events participated)"),
+        ("research_projects", "Research projects (projects with professors, research work, publications)"),
+        ("applied_learning",
+         "Applied learning experiences (practical implementations, real-world applications)")
+    ]),
+    ("skills_development", "Skills Development", [
+        ("programming_languages", "Programming languages (all languages mentioned with proficiency if stated)"),
+        ("tools_and_technologies", "Tools & technologies (frameworks, software, platforms explored)"),
+        ("technical_skills", "Technical skills (domain-specific technical capabilities)"),
+        ("soft_skills",
+         "Soft skills (communication, teamwork, leadership skills developed through group projects)"),
+        ("leadership_roles", "Leadership roles (positions in college clubs, events organized, team leadership)")
+    ]),
+    ("personal_context_and_motivation", "Personal Context & Motivation", [
+        ("interests_and_hobbies", "Interests and hobbies (personal interests, recreational activities)"),
+        ("career_aspirations", "Career aspirations (what they want to become, future goals in their field)"),
+        ("field_of_interest", "Field of interest (specific areas within their domain they're passionate about)"),
+        ("motivation", "What motivates them (driving factors, inspiration, passion areas)"),
+        ("initiative_in_learning",
+         "Initiative in learning (self-learning efforts, extra-curricular technical activities)")
+    ]),
+    ("current_projects", "Current Projects & Work (if any)", [
+        ("current_projects", "Current projects (ongoing academic or personal projects)"),
+        ("project_name", "Project name (exact project title)"),
+        ("technologies_used", "Technology/tools used (list all technologies mentioned)"),
+        ("problem_statement", "Problem statement (concise description of the problem addressed)"),
+        ("solution_implemented", "Solution implemented (specific approach or methodology used)"),
+        ("role", "Your role (specific responsibilities in team projects)")
+    ]),
+    ("work_experience", "Work Experience (if any)", [
+        ("company_name", "Company name (full organization name - internships or part-time work)"),
+        ("role", "Role (exact position title)"),
+        ("duration", "Duration (time period or months worked)"),
+        ("skills_gained", "Skills gained (specific skills acquired during this experience)"),
+        ("key_responsibilities", "Key responsibilities (main duties and learning outcomes)")
+    ]),
+    ("achievements_and_extracurricular", "Achievements & Extra-curricular Activities", [
+        ("academic_achievements", "Academic achievements (scholarships, academic awards, honors)"),
+        ("technical_achievements", "Technical achievements (competition wins, project recognitions)"),
+        ("extracurricular_activities",
+         "Extra-curricular activities (clubs, societies, volunteering, organizing events)"),
+        ("relevant_hobbies", "Relevant hobbies (activities that complement their academic/career interests)")
+    ]),
+    ("career_goals", "Career Goals & Preferences", [
+        ("target_role", "Target role/field (specific job roles or career paths they're interested in)"),
+        ("short_term_goals", "Short-term goals (immediate career objectives post-graduation)"),
+        ("long_term_aspirations", "Long-term aspirations (career vision, where they see themselves)"),
+        ("professional_interests",
+         "Professional interests (specific domains or technologies they want to work with)")
+    ])
+]
+
+EXTRACTION_FIELD_COUNT = sum(len(fields) for _, _, fields in EXTRACTION_SECTIONS)
+
+# Form extraction - one object per section, "Not Mentioned" for anything the student did not say
+EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        key: _text_fields(*(field for field, _ in fields)) for key, _, fields in EXTRACTION_SECTIONS
+    },
+    "required": [key for key, _, _ in EXTRACTION_SECTIONS]
+}
+
+PROFILE_RATING_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "profile_rating": {"type": "number"},
+        "employability_level": {
+            "type": "string",
+            "enum": [
+                "HIGHLY EMPLOYABLE", "GOOD EMPLOYABILITY", "MODERATE EMPLOYABILITY",
+                "DEVELOPING POTENTIAL", "LIMITED EMPLOYABILITY"
+            ]
+        },
+        "grading_explanation": _text_fields(
+            "practical_foundation", "technical_competency", "hands_on_experience", "growth_potential"
+        ),
+        "hiring_insights": _text_fields("strongest_assets", "development_areas", "industry_readiness"),
+        "grading_debug": {
+            "type": "object",
+            "properties": {
+                **_numbers(
+                    "practical_foundation_score", "technical_competency_score",
+                    "hands_on_experience_score", "growth_potential_score", "calculated_sum"
+                ),
+                "sum_check": {
+                    "type": "object",
+                    "properties": _numbers("profile_expected", "profile_reported"),
+                    "required": ["profile_expected", "profile_reported"]
+                },
+                "notes": {"type": "string"}
+            },
+            "required": [
+                "practical_foundation_score", "technical_competency_score",
+                "hands_on_experience_score", "growth_potential_score",
+                "calculated_sum", "sum_check", "notes"
+            ]
+        }
+    },
+    "required": [
+        "profile_rating", "employability_level", "grading_explanation", "hiring_insights", "grading_debug"
+    ]
+}
+
+INTRO_RATING_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "intro_rating": {"type": "number"},
+        "grading_explanation": _text_fields(
+            "grammar_and_clarity", "structure", "info_coverage", "relevance_to_role"
+        ),
+        "insights": {"type": "array", "items": {"type": "string"}, "minItems": 2, "maxItems": 3},
+        "feedback": {"type": "array", "items": {"type": "string"}, "minItems": 2, "maxItems": 3},
+        "grading_debug": {
+            "type": "object",
+            "properties": {
+                **_numbers(
+                    "grammar_clarity_score", "structure_score", "info_coverage_score",
+                    "relevance_score", "calculated_sum"
+                ),
+                "sum_check": {
+                    "type": "object",
+                    "properties": _numbers("intro_expected", "intro_reported"),
+                    "required": ["intro_expected", "intro_reported"]
+                },
+                "notes": {"type": "string"}
+            },
+            "required": [
+                "grammar_clarity_score", "structure_score", "info_coverage_score",
+                "relevance_score", "calculated_sum", "sum_check", "notes"
+            ]
+        }
+    },
+    "required": ["intro_rating", "grading_explanation", "insights", "feedback", "grading_debug"]
+}
+
+# Fused mode - form extraction and profile rating from one request
+FUSED_PROFILE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "extracted_fields": EXTRACTION_SCHEMA,
+        "profile_rating": PROFILE_RATING_SCHEMA
+    },
+    "required": ["extracted_fields", "profile_rating"]
+}
+
+
+def response_format(schema: dict):
+    """
+    Value for Ollama's "format" field according to LLM_STRUCTURED_OUTPUT.
+
+    Returns:
+        The schema, "json", or None (unconstrained)
+    """
+    if LLM_STRUCTURED_OUTPUT == "schema":
+        return schema
+    if LLM_STRUCTURED_OUTPUT == "json":
+        return "json"
+    return None
@@ -0,0 +1,134 @@
+"""
+Incremental JSON Parser for Streamed LLM Output
+
+Ollama streams a response a few characters at a time. The parser below
+consumes those chunks and reports every value whose closing character has
+arrived, such as an extracted form section or a single rubric score, long
+before the whole JSON object is complete.
+
+Paths are tuples of object keys and array indexes from the root, e.g.
+("grading_explanation", "structure") or ("insights", 0).
+"""
+import json
+import logging
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE = " \t\r\n"
+
+
+class _Frame:
+    """One open object or array"""
+    __slots__ = ("kind", "path", "key", "index", "expect_key")
+
+    def __init__(self, kind: str, path: Tuple):
+        self.kind = kind
+        self.path = path
+        self.key = None
+        self.index = 0
+        self.expect_key = kind == "object"
+
+    def child_path(self) -> Tuple:
+        return self.path + ((self.key,) if self.kind == "object" else (self.index,))
+
+
+class IncrementalJSONParser:
+    """
+    Feed JSON text chunk by chunk; on_value(path, value) is called for every
+    completed value with 1 <= len(path) <= max_depth.
+    """
+
+    def __init__(self, on_value: Callable[[Tuple, Any], None], max_depth: int = 2):
+        self.on_value = on_value
+        self.max_depth = max_depth
+        self._joined = ""
+        self._stack: List[_Frame] = []
+        self._starts: List[int] = []  # Start offset of each open container
+        self._in_string = False
+        self._escape = False
+        self._token_start: Optional[int] = None  # Open string or scalar
+        self._failed = False
+
+    def feed(self, chunk: str):
+        """Consume the next chunk of streamed text"""
+        if self._failed or not chunk:
+            return
+        offset = len(self._joined)
+        self._joined += chunk
+        try:
+            for i in range(offset, len(self._joined)):
+                self._step(i, self._joined[i])
+        except Exception as e:
+            # Never let a malformed stream break the generation itself
+            logger.debug(f"Incremental JSON parsing stopped: {e}")
+            self._failed = True
+
+    def _emit(self, path: Tuple, start: int, end: int):
+        if 1 <= len(path) <= self.max_depth:
+            self.on_value(path, json.loads(self._joined[start:end]))
+
+    def _step(self, i: int, char: str):
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                self._end_string(i)
+            return
+
+        if self._token_start is not None and (char in WHITESPACE or char in ",}]"):
+            self._end_scalar(i)
+
+        if char == '"':
+            self._in_string = True
+            self._token_start = i
+        elif char in "{[":
+            path = self._stack[-1].child_path() if self._stack else ()
+            self._stack.append(_Frame("object" if char == "{" else "array", path))
+            self._starts.append(i)
+        elif char in "}]":
+            if not self._stack:
+                return
+            frame = self._stack.pop()
+            start = self._starts.pop()
+            self._emit(frame.path, start, i + 1)
+        elif char == ",":
+            if self._stack:
+                frame = self._stack[-1]
+                if frame.kind == "object":
+                    frame.expect_key = True
+                else:
+                    frame.index += 1
+        elif char not in WHITESPACE and char != ":" and self._token_start is None:
+            self._token_start = i  # number, true, false or null
+
+    def _end_string(self, i: int):
+        start, self._token_start = self._token_start, None
+        if not self._stack:
+            return
+        frame = self._stack[-1]
+        if frame.kind == "object" and frame.expect_key:
+            frame.key = json.loads(self._joined[start:i + 1])
+            frame.expect_key = False
+        else:
+            self._emit(frame.child_path(), start, i + 1)
+
+    def _end_scalar(self, i: int):
+        start, self._token_start = self._token_start, None
+        if self._stack:
+            self._emit(self._stack[-1].child_path(), start, i)
+
+
+def partial_token_handler(stage: str, on_partial: Optional[Callable[[str, list, Any], None]],
+                          max_depth: int = 2) -> Optional[Callable[[str], None]]:
+    """
+    Build an on_token callback that reports completed JSON values as
+    on_partial(stage, path, value), or None when nobody is listening.
+    """
+    if on_partial is None:
+        return None
+    parser = IncrementalJSONParser(lambda path, value: on_partial(stage, list(path), value), max_depth)
+    return parser.feed
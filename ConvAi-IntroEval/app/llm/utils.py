@@ -8,15 +8,19 @@ This module provides essential utilities for the ConvAi introduction evaluation
 - File saving operations for evaluation results
 
 Key Functions:
+- parse_llm_json(): Parses a (schema-constrained) LLM response, repairing it only as a fallback
 - preprocess_llm_json_response(): Cleans and extracts JSON from Mistral LLM responses
 - get_latest_form_file(): Loads student form data from filled_forms directory
 - get_latest_transcript_file(): Loads interview transcripts from transcription directory
 - fix_json_and_rating_calculation(): Validates and corrects rating scores
 - save_rating_to_file(): Saves evaluation results to JSON files
+- preload_mistral(): Loads Mistral into every LLM server's memory ahead of the first request
+- get_resident_llm_models(): Lists the models the LLM server currently holds in memory
 
 Note: This module is optimized for Mistral LLM and ConvAi's file organization system.
 """
 import json
+import os
 import re
 from pathlib import Path
 import sys
@@ -24,9 +28,101 @@ import sys
 # Add parent directory to path to import file_organizer
 sys.path.append(str(Path(__file__).parent.parent.parent))
 from file_organizer import glob_with_roll_number
+from metrics import metrics
+try:
+    from .backends import get_backend
+except ImportError:  # Fallback for direct execution if needed
+    from backends import get_backend
 
 DISABLE_LLM = False # ✅ Set to False to enable LLM calls
 
+# LLM server and model settings (server type: LLM_BACKEND, see backends.py)
+LLM_BASE_URL = os.environ.get("LLM_BASE_URL", "http://localhost:11434").rstrip("/")
+MISTRAL_MODEL = os.environ.get("LLM_MODEL", "mistral")
+MISTRAL_KEEP_ALIVE = "30m"  # Keep Mistral resident between queue bursts
+
+def _llm_endpoints() -> list:
+    """Base URLs of every LLM server the shared client spreads requests over (LLM_ENDPOINTS)"""
+    try:
+        from .llm_client import shared_client  # Imported lazily; llm_client imports this module
+    except ImportError:  # Fallback for direct execution if needed
+        from llm_client import shared_client
+    return shared_client.endpoints
+
+def preload_mistral(keep_alive: str = MISTRAL_KEEP_ALIVE) -> bool:
+    """
+    Load Mistral into every LLM server's memory without generating any tokens.
+    
+    Args:
+        keep_alive (str): How long the server should keep the model resident (Ollama only)
+        
+    Returns:
+        bool: True if the model was loaded on every endpoint
+    """
+    loaded = True
+    for base_url in _llm_endpoints():
+        try:
+            loaded = get_backend().preload(base_url, MISTRAL_MODEL, keep_alive) and loaded
+        except Exception as e:
+            print(f"⚠️ Could not preload {MISTRAL_MODEL} on {base_url}: {e}")
+            loaded = False
+    return loaded
+
+def get_resident_llm_models(base_url: str = None) -> list:
+    """
+    List the models an LLM server currently holds in memory.
+    
+    Args:
+        base_url (str, optional): Server to ask; defaults to the first LLM endpoint
+    
+    Returns:
+        list: Model names (e.g. "mistral:latest"), empty if the server is unreachable
+    """
+    try:
+        return get_backend().resident_models(base_url or _llm_endpoints()[0], MISTRAL_MODEL)
+    except Exception:
+        return []
+
+def is_mistral_resident() -> bool:
+    """Check whether Mistral is loaded in every LLM server's memory"""
+    return all(
+        any(name.split(":")[0] == MISTRAL_MODEL for name in get_resident_llm_models(base_url))
+        for base_url in _llm_endpoints()
+    )
+
+def parse_llm_json(response_text, stage="llm"):
+    """
+    Parse a JSON object from an LLM response.
+    
+    Responses generated with a JSON schema (see schemas.py) parse directly; the
+    preprocess_llm_json_response repair path only runs when they do not, and
+    both outcomes are counted as llm.<stage>.json.direct / .repaired.
+    
+    Args:
+        response_text (str): Raw response text from Mistral LLM
+        stage (str): Metrics label (extraction, profile, intro)
+        
+    Returns:
+        dict: Parsed JSON object
+        
+    Raises:
+        json.JSONDecodeError: If the response cannot be repaired either
+    """
+    try:
+        data = json.loads(response_text)
+        if isinstance(data, dict):
+            metrics.increment(f"llm.{stage}.json.direct")
+            return data
+    except (json.JSONDecodeError, TypeError):
+        pass
+    
+    metrics.increment(f"llm.{stage}.json.repaired")
+    try:
+        return json.loads(preprocess_llm_json_response(response_text))
+    except json.JSONDecodeError:
+        metrics.increment(f"llm.{stage}.json.failed")
+        raise
+
 def preprocess_llm_json_response(response_text):
     """
     Preprocessing for Mistral LLM JSON responses
@@ -318,7 +414,6 @@ def fix_json_and_rating_calculation(rating_text, rating_type="profile", enhance_
         dict: Processed and validated rating data
     """
     print(f"[🔄] Validating and fixing {rating_type} rating JSON and calculation")
-    processed_text = preprocess_llm_json_response(rating_text)
     
     def extract_numeric_score(score_str):
         """Extract numeric value from strings like '2.8/3.0' or '7.20/10'"""
@@ -334,7 +429,7 @@ def fix_json_and_rating_calculation(rating_text, rating_type="profile", enhance_
             return float(score_str)
     
     try:
-        rating_data = json.loads(processed_text)
+        rating_data = parse_llm_json(rating_text, rating_type)
           # Clean rating values that might be in format like "2.61/10"
         if "profile_rating" in rating_data:
             profile_rating_str = str(rating_data["profile_rating"])
@@ -0,0 +1,215 @@
+"""
+Audio Ingest Module for ConvAi-IntroEval
+
+Extracts the audio track of an uploaded recording when the STT worker picks
+it up and re-encodes it as compact 16 kHz mono Opus (or FLAC) under audio/<roll>/.
+STT then reads the small audio file instead of decoding the whole video
+container, and the original video can be dropped under a retention policy.
+
+Environment:
+    AUDIO_INGEST=0                 disable ingest (STT reads the upload directly)
+    AUDIO_INGEST_FORMAT=opus|flac  output codec (default opus)
+    VIDEO_RETENTION=keep|drop|<days>
+        keep  - leave uploads untouched (default)
+        drop  - delete the upload once its audio has been extracted
+        <N>   - delete uploads older than N days whose audio exists
+                (checked at startup, then every VIDEO_PRUNE_INTERVAL_SECONDS)
+    VIDEO_PRUNE_INTERVAL_SECONDS   seconds between age-based prunes (default 3600)
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from file_organizer import log_file_operation
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)  # Only log warnings and errors to reduce I/O
+
+# Constants
+AUDIO_DIR = Path(__file__).parent / "audio"
+VIDEOS_DIR = Path(__file__).parent / "videos"
+AUDIO_INGEST_ENABLED = os.environ.get("AUDIO_INGEST", "1") != "0"
+AUDIO_FORMAT = os.environ.get("AUDIO_INGEST_FORMAT", "opus").lower()
+VIDEO_RETENTION = os.environ.get("VIDEO_RETENTION", "keep").lower()
+SAMPLE_RATE = 16000  # Whisper's native rate; nothing above it is used
+OPUS_BITRATE = "32k"  # Transparent for speech at 16 kHz mono
+FFMPEG_TIMEOUT_SECONDS = 300
+VIDEO_PRUNE_INTERVAL_SECONDS = int(os.environ.get("VIDEO_PRUNE_INTERVAL_SECONDS", "3600"))
+
+# ffmpeg codec arguments per output format. bitexact keeps the output
+# byte-identical for identical input (no random Ogg serials), so the
+# content-addressed transcript cache still hits on re-uploads.
+CODEC_ARGS = {
+    "opus": ["-c:a", "libopus", "-b:a", OPUS_BITRATE, "-application", "voip"],
+    "flac": ["-c:a", "flac", "-sample_fmt", "s16"]
+}
+
+
+def audio_path_for(video_path: Path, audio_format: str = AUDIO_FORMAT) -> Path:
+    """
+    Return where the extracted audio of an upload is stored: audio/ mirrors the
+    per-roll layout of videos/ (videos/<roll>/x.webm -> audio/<roll>/x.opus)
+    """
+    video_path = Path(video_path)
+    return AUDIO_DIR / video_path.parent.name / f"{video_path.stem}.{audio_format}"
+
+
+def extract_audio(video_path: Path, roll_number: Optional[str] = None, audio_format: str = AUDIO_FORMAT) -> Path:
+    """
+    Extract the audio track to 16 kHz mono Opus/FLAC with ffmpeg.
+
+    Args:
+        video_path: Uploaded recording (videos/<roll>/...)
+        roll_number: Student roll number (for file operation logging)
+        audio_format: "opus" or "flac"
+
+    Returns:
+        Path to the extracted audio file
+
+    Raises:
+        ValueError: If the format is unsupported
+        RuntimeError: If ffmpeg is missing or fails
+    """
+    if audio_format not in CODEC_ARGS:
+        raise ValueError(f"Unsupported audio ingest format: {audio_format}")
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg not found on PATH")
+
+    video_path = Path(video_path)
+    audio_path = audio_path_for(video_path, audio_format)
+    audio_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = audio_path.with_name(f".{audio_path.name}.tmp")
+
+    cmd = [
+        "ffmpeg", "-nostdin", "-y", "-loglevel", "error",
+        "-i", str(video_path),
+        "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        *CODEC_ARGS[audio_format],
+        "-fflags", "+bitexact", "-flags:a", "+bitexact",
+        "-f", "ogg" if audio_format == "opus" else "flac",
+        str(tmp_path)
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=FFMPEG_TIMEOUT_SECONDS)
+    except subprocess.TimeoutExpired as e:
+        tmp_path.unlink(missing_ok=True)
+        raise RuntimeError(f"ffmpeg timed out after {FFMPEG_TIMEOUT_SECONDS}s") from e
+
+    if result.returncode != 0 or not tmp_path.exists():
+        tmp_path.unlink(missing_ok=True)
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.decode(errors='ignore').strip()[-500:]}")
+
+    os.replace(tmp_path, audio_path)
+    return audio_path
+
+
+def apply_video_retention(video_path: Path, roll_number: Optional[str] = None,
+                          policy: str = VIDEO_RETENTION) -> bool:
+    """
+    Delete an upload whose audio has been extracted, if the policy says so.
+
+    Returns:
+        True if the video was deleted
+    """
+    video_path = Path(video_path)
+    if policy == "drop" and video_path.exists():
+        video_path.unlink()
+        log_file_operation("DELETE video (retention: drop)", video_path, roll_number)
+        return True
+    return False
+
+
+def prune_old_videos(videos_dir: Path, max_age_days: float, audio_format: str = AUDIO_FORMAT) -> int:
+    """
+    Delete uploads older than max_age_days whose extracted audio exists.
+
+    Returns:
+        Number of videos deleted
+    """
+    cutoff = time.time() - max_age_days * 86400
+    deleted = 0
+    for video_path in Path(videos_dir).rglob("*"):
+        if not video_path.is_file() or video_path.stat().st_mtime > cutoff:
+            continue
+        if not audio_path_for(video_path, audio_format).exists():
+            continue  # Never delete a recording we have no audio copy of
+        try:
+            video_path.unlink()
+            deleted += 1
+        except OSError as e:
+            logger.warning(f"Could not delete old video {video_path}: {e}")
+    if deleted:
+        logger.info(f"Retention: deleted {deleted} videos older than {max_age_days} days")
+    return deleted
+
+
+def start_video_pruner(policy: str = VIDEO_RETENTION,
+                       interval_seconds: int = VIDEO_PRUNE_INTERVAL_SECONDS) -> Optional[threading.Thread]:
+    """
+    Run prune_old_videos now and then every interval_seconds in a daemon thread.
+
+    Only the age-based policy (<days>) needs pruning; walking videos/ on every
+    upload would make each submission pay for the whole tree.
+
+    Returns:
+        The pruning thread, or None if the policy is not age-based
+    """
+    if not policy.replace(".", "", 1).isdigit():
+        return None
+    max_age_days = float(policy)
+
+    def prune_forever():
+        while True:
+            try:
+                prune_old_videos(VIDEOS_DIR, max_age_days)
+            except Exception as e:
+                logger.warning(f"Video retention pass failed: {e}")
+            time.sleep(interval_seconds)
+
+    thread = threading.Thread(target=prune_forever, name="video-pruner", daemon=True)
+    thread.start()
+    return thread
+
+
+def ingest_upload(video_path: Path, roll_number: Optional[str] = None) -> Path:
+    """
+    Prepare an uploaded recording for STT.
+
+    Extracts compact audio and applies the video retention policy. Any
+    failure falls back to the original upload so a submission is never lost.
+
+    Returns:
+        Path STT should read (extracted audio, or the upload itself)
+    """
+    video_path = Path(video_path)
+    if not AUDIO_INGEST_ENABLED:
+        return video_path
+
+    start_time = time.time()
+    try:
+        audio_path = extract_audio(video_path, roll_number)
+    except Exception as e:
+        logger.warning(f"Audio ingest failed for {video_path.name}, using the upload directly: {e}")
+        metrics.increment("ingest.failures")
+        return video_path
+
+    video_bytes = video_path.stat().st_size
+    audio_bytes = audio_path.stat().st_size
+    metrics.observe("ingest.seconds", time.time() - start_time)
+    metrics.increment("ingest.files")
+    metrics.increment("ingest.bytes_saved", max(0, video_bytes - audio_bytes))
+    log_file_operation("CREATE audio", audio_path, roll_number)
+
+    apply_video_retention(video_path, roll_number)
+    return audio_path
+
+
+__all__ = ['ingest_upload', 'extract_audio', 'apply_video_retention', 'prune_old_videos', 'start_video_pruner',
+           'audio_path_for']
@@ -0,0 +1,193 @@
+"""
+Size-Bounded Disk Cache for ConvAi-IntroEval
+
+Content-addressed JSON cache stored on local disk with least-recently-used
+eviction. Entries are addressed by a hex digest that the caller derives from
+the inputs that determine the result (audio hash + STT settings, prompt hash
++ model options, ...).
+
+Recency is tracked through file modification times so the LRU order
+survives restarts. An optional TTL additionally expires entries by age;
+the write time is stored inside the entry because the modification time
+is refreshed on every read. Entries written without it get their file
+time stored on first read.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)  # Only log warnings and errors to reduce I/O
+
+
+class DiskLRUCache:
+    """Thread-safe on-disk JSON cache with a total size limit"""
+
+    def __init__(self, name: str, cache_dir: Path, max_bytes: int, ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            name: Short cache name used for metric keys (e.g. "transcripts")
+            cache_dir: Directory that holds the cache entries
+            max_bytes: Total size budget; least recently used entries are evicted above it
+            ttl_seconds: Maximum entry age; None or 0 keeps entries until evicted
+        """
+        self.name = name
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds or None
+        self._lock = threading.Lock()
+        self._current_bytes = None  # Computed lazily on first use
+
+    def _entry_path(self, key: str) -> Path:
+        """Shard entries by key prefix to keep directories small"""
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _metric(self, suffix: str) -> str:
+        return f"cache.{self.name}.{suffix}"
+
+    def _ensure_size_known(self) -> None:
+        """Scan the cache directory once to learn its current size"""
+        if self._current_bytes is not None:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._current_bytes = sum(f.stat().st_size for f in self.cache_dir.glob("*/*.json"))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up an entry and mark it as recently used.
+
+        Returns:
+            The cached dict, or None on a miss
+        """
+        path = self._entry_path(key)
+        with self._lock:
+            self._ensure_size_known()
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    value = json.load(f)
+                stored_at = value.pop("_stored_at", None)
+                if self.ttl_seconds:
+                    if stored_at is None:
+                        # Entries written before a TTL was configured age from their file time;
+                        # pin it into the entry now, before reads start refreshing the mtime
+                        stored_at = path.stat().st_mtime
+                        self._write(path, json.dumps({**value, "_stored_at": stored_at}, ensure_ascii=False).encode("utf-8"))
+                    if time.time() - stored_at > self.ttl_seconds:
+                        self._remove(path)
+                        metrics.increment(self._metric("expired"))
+                        metrics.increment(self._metric("misses"))
+                        return None
+                os.utime(path, None)  # Refresh recency for LRU ordering
+            except FileNotFoundError:
+                metrics.increment(self._metric("misses"))
+                return None
+            except (json.JSONDecodeError, OSError) as e:
+                logger.warning(f"Dropping unreadable cache entry {path.name}: {e}")
+                self._remove(path)
+                metrics.increment(self._metric("misses"))
+                return None
+
+        metrics.increment(self._metric("hits"))
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store an entry, evicting least recently used entries if over budget"""
+        path = self._entry_path(key)
+        if self.ttl_seconds:
+            value = {**value, "_stored_at": time.time()}
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        if len(data) > self.max_bytes:
+            logger.warning(f"Cache entry for {self.name} too large to store ({len(data)} bytes)")
+            return
+
+        with self._lock:
+            self._ensure_size_known()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._write(path, data)
+            metrics.increment(self._metric("writes"))
+            self._evict_if_needed()
+
+    def invalidate(self, key: str) -> bool:
+        """Remove a single entry. Returns True if it existed."""
+        path = self._entry_path(key)
+        with self._lock:
+            self._ensure_size_known()
+            if not path.exists():
+                return False
+            self._remove(path)
+            return True
+
+    def clear(self) -> int:
+        """Remove every entry. Returns the number of entries removed."""
+        with self._lock:
+            self._ensure_size_known()
+            entries = list(self.cache_dir.glob("*/*.json"))
+            for path in entries:
+                self._remove(path)
+            return len(entries)
+
+    def _write(self, path: Path, data: bytes) -> None:
+        """Atomically replace an entry file and update the size accounting (lock held)"""
+        if path.exists():
+            self._current_bytes -= path.stat().st_size
+
+        # Write atomically so readers never see a partial entry
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        self._current_bytes += len(data)
+
+    def _remove(self, path: Path) -> None:
+        """Delete an entry file and update the size accounting (lock held)"""
+        try:
+            size = path.stat().st_size
+            path.unlink()
+            if self._current_bytes is not None:
+                self._current_bytes = max(0, self._current_bytes - size)
+        except FileNotFoundError:
+            pass
+
+    def _evict_if_needed(self) -> None:
+        """Evict least recently used entries until under budget (lock held)"""
+        if self._current_bytes <= self.max_bytes:
+            return
+
+        entries = sorted(self.cache_dir.glob("*/*.json"), key=lambda p: p.stat().st_mtime)
+        for path in entries:
+            if self._current_bytes <= self.max_bytes:
+                break
+            self._remove(path)
+            metrics.increment(self._metric("evictions"))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size, budget and hit-rate information for this cache"""
+        with self._lock:
+            self._ensure_size_known()
+            entry_count = sum(1 for _ in self.cache_dir.glob("*/*.json"))
+            current_bytes = self._current_bytes
+
+        hits = metrics.get_counter(self._metric("hits"))
+        misses = metrics.get_counter(self._metric("misses"))
+        lookups = hits + misses
+        return {
+            "name": self.name,
+            "entries": entry_count,
+            "size_mb": round(current_bytes / (1024 * 1024), 2),
+            "max_size_mb": round(self.max_bytes / (1024 * 1024), 2),
+            "hits": int(hits),
+            "misses": int(misses),
+            "evictions": int(metrics.get_counter(self._metric("evictions"))),
+            "expired": int(metrics.get_counter(self._metric("expired"))),
+            "ttl_seconds": self.ttl_seconds,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "checked_at": time.time()
+        }
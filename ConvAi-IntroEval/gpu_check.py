@@ -2,11 +2,28 @@
 """
 GPU Detection and PyTorch CUDA Verification Script
 This script checks if GPU is available and properly configured for STT processing.
+
+With --profile it also benchmarks a reference clip across Whisper model sizes,
+torch thread counts, FP16 on/off and beam sizes, and writes the tuned
+TranscriptionConfig profile that stt.py loads at startup:
+
+    python gpu_check.py --profile --clip videos/<roll>/<file>.webm --target-rtf 0.5
 """
 
+import argparse
+import itertools
+import os
+import time
 import torch
 import sys
 import platform
+from pathlib import Path
+
+# Whisper sizes from lowest to highest transcription quality
+MODEL_QUALITY_ORDER = ["tiny", "base", "small", "medium", "turbo", "large"]
+DEFAULT_PROFILE_MODELS = ["base", "small", "turbo"]
+DEFAULT_BEAM_SIZES = [1, 5]
+DEFAULT_TARGET_RTF = 0.5  # Transcribe at least twice as fast as real time
 
 def check_gpu_availability():
     """Comprehensive GPU availability check"""
@@ -122,12 +139,179 @@ def recommend_fixes():
         print("   ✅ GPU is properly configured!")
         print("   🚀 Your STT processing should use GPU acceleration")
         
+def find_reference_clip():
+    """Use the first uploaded recording as the reference clip if none was given"""
+    videos_dir = Path(__file__).parent / "videos"
+    for pattern in ("*/*.webm", "*.webm", "*/*.wav", "*/*.mp3"):
+        clips = sorted(videos_dir.glob(pattern))
+        if clips:
+            return clips[0]
+    return None
+
+def default_thread_counts():
+    """Thread counts worth trying on this machine (CPU only)"""
+    cpu_count = os.cpu_count() or 1
+    counts = {1, max(1, cpu_count // 2), cpu_count}
+    if cpu_count >= 4:
+        counts.add(4)
+    return sorted(counts)
+
+def benchmark_configurations(clip_path, model_sizes, thread_counts, beam_sizes, fp16_options):
+    """
+    Time transcription of the reference clip for every configuration combination.
+    
+    Returns:
+        list: One dict per configuration with its wall time and real-time factor
+    """
+    import whisper
+    
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    audio = whisper.load_audio(str(clip_path))
+    audio_seconds = len(audio) / whisper.audio.SAMPLE_RATE
+    print(f"   Reference clip: {clip_path} ({audio_seconds:.1f}s of audio)")
+    
+    results = []
+    for model_size in model_sizes:
+        print(f"\n   Loading Whisper '{model_size}' on {device}...")
+        try:
+            model = whisper.load_model(model_size, device=device)
+        except Exception as e:
+            print(f"   ❌ Could not load '{model_size}': {e}")
+            continue
+        
+        # Warm-up pass so kernel selection and allocation are not timed
+        with torch.no_grad():
+            model.transcribe(audio[:whisper.audio.SAMPLE_RATE * 5], language="en", verbose=None)
+        
+        for num_threads, fp16, beam_size in itertools.product(thread_counts, fp16_options, beam_sizes):
+            torch.set_num_threads(num_threads)
+            start_time = time.time()
+            try:
+                with torch.no_grad():
+                    model.transcribe(
+                        audio,
+                        language="en",
+                        task="transcribe",
+                        temperature=0.0,
+                        beam_size=beam_size if beam_size > 1 else None,
+                        best_of=1,
+                        fp16=fp16,
+                        verbose=None
+                    )
+            except Exception as e:
+                print(f"   ❌ {model_size} threads={num_threads} fp16={fp16} beam={beam_size}: {e}")
+                continue
+            elapsed = time.time() - start_time
+            rtf = elapsed / audio_seconds if audio_seconds else float("inf")
+            
+            results.append({
+                "model_size": model_size,
+                "num_threads": num_threads,
+                "fp16": fp16,
+                "beam_size": beam_size,
+                "seconds": round(elapsed, 2),
+                "rtf": round(rtf, 3)
+            })
+            print(f"   ⏱️  {model_size:<7} threads={num_threads:<3} fp16={str(fp16):<5} beam={beam_size}: "
+                  f"{elapsed:6.2f}s (RTF {rtf:.3f})")
+        
+        del model
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    
+    return results
+
+def select_configuration(results, target_rtf):
+    """
+    Pick the profile: the highest-quality model size that can meet the target
+    real-time factor, using its fastest thread/FP16/beam combination.
+    Falls back to the overall fastest configuration if nothing meets the target.
+    """
+    candidates = [r for r in results if r["rtf"] <= target_rtf]
+    if not candidates:
+        print(f"   ⚠️  No configuration meets RTF {target_rtf}; using the fastest one")
+        return min(results, key=lambda r: r["rtf"])
+    
+    def quality(result):
+        size = result["model_size"]
+        return MODEL_QUALITY_ORDER.index(size) if size in MODEL_QUALITY_ORDER else -1
+    
+    best_quality = max(quality(r) for r in candidates)
+    return min((r for r in candidates if quality(r) == best_quality), key=lambda r: r["rtf"])
+
+def profile_configurations(clip_path, model_sizes, thread_counts, beam_sizes, target_rtf, output_path=None):
+    """Benchmark the current machine and write the tuned TranscriptionConfig profile"""
+    print(f"\n📈 STT CONFIGURATION PROFILER (target RTF ≤ {target_rtf}):")
+    
+    # FP16 only runs on CUDA; Whisper falls back to FP32 on CPU anyway
+    fp16_options = [True, False] if torch.cuda.is_available() else [False]
+    if torch.cuda.is_available():
+        thread_counts = [torch.get_num_threads()]  # CPU threads barely matter for GPU decoding
+    
+    results = benchmark_configurations(clip_path, model_sizes, thread_counts, beam_sizes, fp16_options)
+    if not results:
+        print("   ❌ No configuration could be benchmarked")
+        return None
+    
+    best = select_configuration(results, target_rtf)
+    
+    from stt import TranscriptionConfig, save_tuned_config, STT_PROFILE_PATH
+    config = TranscriptionConfig(
+        model_size=best["model_size"],
+        beam_size=best["beam_size"],
+        fp16=best["fp16"],
+        num_threads=best["num_threads"]
+    )
+    output_path = Path(output_path) if output_path else STT_PROFILE_PATH
+    save_tuned_config(
+        config,
+        output_path,
+        target_rtf=target_rtf,
+        reference_clip=str(clip_path),
+        selected=best,
+        results=results,
+        created_at=time.strftime("%Y-%m-%dT%H:%M:%S")
+    )
+    
+    print(f"\n   ✅ Selected: {best['model_size']} threads={best['num_threads']} "
+          f"fp16={best['fp16']} beam={best['beam_size']} (RTF {best['rtf']})")
+    print(f"   ✅ Profile written to {output_path} (loaded by stt.py at startup)")
+    return config
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="GPU check and STT configuration profiler")
+    parser.add_argument("--profile", action="store_true", help="Benchmark STT settings and write a tuned profile")
+    parser.add_argument("--clip", help="Reference audio/video clip (defaults to the first upload in videos/)")
+    parser.add_argument("--models", nargs="+", default=DEFAULT_PROFILE_MODELS, help="Whisper model sizes to try")
+    parser.add_argument("--threads", nargs="+", type=int, help="torch CPU thread counts to try")
+    parser.add_argument("--beams", nargs="+", type=int, default=DEFAULT_BEAM_SIZES, help="Beam sizes to try")
+    parser.add_argument("--target-rtf", type=float, default=DEFAULT_TARGET_RTF,
+                        help="Maximum acceptable processing seconds per audio second")
+    parser.add_argument("--output", help="Profile path (defaults to STT_PROFILE_PATH / stt_profile.json)")
+    return parser.parse_args()
+
 def main():
     """Main function to run all checks"""
+    args = parse_args()
+    
     check_gpu_availability()
     test_whisper_gpu()
     recommend_fixes()
     
+    if args.profile:
+        clip_path = Path(args.clip) if args.clip else find_reference_clip()
+        if clip_path is None or not clip_path.exists():
+            print("\n❌ No reference clip found - pass one with --clip")
+        else:
+            profile_configurations(
+                clip_path,
+                args.models,
+                args.threads or default_thread_counts(),
+                args.beams,
+                args.target_rtf,
+                args.output
+            )
+    
     print("\n" + "=" * 60)
     print("🏁 GPU CHECK COMPLETE")
     print("=" * 60)
@@ -16,6 +16,8 @@ import asyncio
 import json
 import os
 import shutil
+import threading
+import time
 import traceback
 from datetime import datetime
 from pathlib import Path
@@ -47,7 +49,7 @@ from datetime import datetime, timedelta
 from models import User, Teacher, TeacherStudentMap, SessionLocal, PasswordResetToken #database models
 
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, FileResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
 # Import teacher routes
@@ -95,7 +97,18 @@ def sanitize_classname(raw_class: str) -> str:
     return f"{dept}{sem}{sec}"
 
 # Import project modules
-from stt import transcribe_file, SUPPORTED_EXTENSIONS
+from stt import (
+    transcribe_file,
+    SUPPORTED_EXTENSIONS,
+    preload_model,
+    is_model_loaded,
+    get_loaded_models,
+    get_model_report,
+    get_transcript_cache_stats
+)
+from stt_service import get_stt_service
+from audio_ingest import start_video_pruner
+from metrics import metrics
 from auth import get_current_user
 from file_organizer import (
     get_user_directory,
@@ -119,14 +132,18 @@ from app.llm.utils import (
     get_latest_form_file,
     get_latest_transcript_file,
     save_rating_to_file,
+    preload_mistral,
+    is_mistral_resident,
     DISABLE_LLM
 )
+from app.llm.llm_client import get_llm_cache_stats, llm_server_reachable
 # ==================== CONFIGURATION ====================
 
 # Application settings
 APP_HOST = "localhost"
 APP_PORT = 8000
 DEBUG_MODE = True  # Consistent debug mode setting
+SSE_POLL_SECONDS = 0.25  # How often /queue/events checks for new partial LLM results
 
 
 # Directory paths
@@ -186,6 +203,37 @@ queue_manager = None
 # Initialize queue manager only once
 _queue_manager_initialized = False
 
+# Out-of-process STT service (None = Whisper runs inside this process)
+stt_service = get_stt_service()
+
+# Background model warm-up state (reported by /ready)
+_model_warmup = {
+    "whisper": {"status": "pending", "error": None, "seconds": None},
+    "mistral": {"status": "pending", "error": None, "seconds": None}
+}
+
+def _warm_up_models():
+    """Load Whisper and Mistral in the background so the first task starts warm."""
+    whisper_loader = stt_service.preload_model if stt_service else preload_model
+    for name, loader in (("whisper", whisper_loader), ("mistral", preload_mistral)):
+        if name == "mistral" and DISABLE_LLM:
+            _model_warmup[name]["status"] = "skipped"
+            continue
+        
+        _model_warmup[name]["status"] = "loading"
+        start_time = time.time()
+        try:
+            result = loader()
+            _model_warmup[name]["status"] = "failed" if result is False else "loaded"
+        except Exception as e:
+            _model_warmup[name]["status"] = "failed"
+            _model_warmup[name]["error"] = str(e)
+            log_error(f"❌ {name} warm-up failed", e)
+        _model_warmup[name]["seconds"] = round(time.time() - start_time, 2)
+    
+    log_info(f"Model warm-up complete: whisper={_model_warmup['whisper']['status']}, "
+             f"mistral={_model_warmup['mistral']['status']}")
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize queue manager on startup."""
@@ -202,6 +250,12 @@ async def startup_event():
     else:
         log_info("ℹ️ Two-Phase Queue Manager already initialized, skipping")
     
+    # Warm Whisper and Mistral without blocking startup
+    threading.Thread(target=_warm_up_models, name="model-warmup", daemon=True).start()
+    
+    # Age-based video retention runs now and then on a timer, not per upload
+    start_video_pruner()
+    
     # Additional startup checks
     log_info(f"📁 Base directory: {BASE_DIR}")
     log_info(f"🎥 Videos directory: {VIDEOS_DIR}")
@@ -210,17 +264,12 @@ async def startup_event():
     log_info(f"⭐ Ratings directory: {RATINGS_DIR}")
     log_info(f"🧠 LLM disabled: {DISABLE_LLM}")
     
-    # Check if Ollama is running (if LLM is enabled)
+    # Check if the LLM server is running (if LLM is enabled)
     if not DISABLE_LLM:
-        try:
-            import requests
-            response = requests.get("http://localhost:11434/api/tags", timeout=5)
-            if response.status_code == 200:
-                log_info("✅ Ollama server is running and accessible")
-            else:
-                log_info("⚠️ Ollama server may not be running properly")
-        except Exception as e:
-            log_info(f"⚠️ Could not connect to Ollama server: {e}")
+        if await asyncio.to_thread(llm_server_reachable):
+            log_info("✅ LLM server is running and accessible")
+        else:
+            log_info("⚠️ Could not connect to the LLM server")
 
 @app.on_event("shutdown") 
 async def shutdown_event():
@@ -349,6 +398,56 @@ async def health_check():
         "version": "2.0.0",        "llm_disabled": DISABLE_LLM
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness endpoint for load balancers.
+    Returns 200 only when Whisper (and Mistral, unless LLM is disabled) are resident in memory.
+    """
+    if stt_service:
+        # Whisper lives in the service process; the web process holds no models
+        whisper_loaded = await asyncio.to_thread(stt_service.is_model_loaded)
+        whisper_models = await asyncio.to_thread(stt_service.get_loaded_models)
+    else:
+        whisper_loaded = is_model_loaded()
+        whisper_models = get_loaded_models()
+    mistral_loaded = True if DISABLE_LLM else await asyncio.to_thread(is_mistral_resident)
+    ready = whisper_loaded and mistral_loaded
+    
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "timestamp": datetime.now().isoformat(),
+            "models": {
+                "whisper": {
+                    "resident": whisper_loaded,
+                    "loaded": whisper_models,
+                    "service": str(stt_service.address) if stt_service else None,
+                    **_model_warmup["whisper"]
+                },
+                "mistral": {"resident": mistral_loaded, **_model_warmup["mistral"]}
+            }
+        }
+    )
+
+@app.get("/metrics")
+async def get_metrics():
+    """Performance metrics for the STT and LLM stages (counters, gauges, timings)."""
+    return JSONResponse(content={
+        "timestamp": datetime.now().isoformat(),
+        "transcript_cache": get_transcript_cache_stats(),
+        "llm_cache": get_llm_cache_stats(),
+        **metrics.snapshot()
+    })
+
+@app.get("/stt/models")
+async def get_stt_models():
+    """Resident Whisper models with memory footprint and real-time factor per precision (fp32/fp16/int8)."""
+    if stt_service:
+        return JSONResponse(content=await asyncio.to_thread(stt_service.get_model_report))
+    return JSONResponse(content=get_model_report())
+
 # ==================== FIELD EXTRACTION STATUS ====================
 
 @app.get("/extract-fields-status")
@@ -787,7 +886,9 @@ async def submit_to_queue(
             f.write(file_content)
         
         log_info(f"💾 File saved successfully: {file_path}")
-        log_file_operation("SAVE video", file_path, roll_number)        # Submit to queue for processing
+        log_file_operation("SAVE video", file_path, roll_number)
+        
+        # Submit to queue for processing (the STT worker extracts the audio track)
         task_id = queue_manager.submit_task(
             user_id=user_id,
             roll_number=roll_number or f"user_{user_id}_{timestamp}",
@@ -917,6 +1018,54 @@ async def get_task_status(task_id: str, current_user: Optional[Union[User, Teach
         log_error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Failed to get task status: {str(e)}")
 
+@app.get("/queue/events/{task_id}")
+async def stream_task_events(task_id: str, request: Request, current_user: Optional[Union[User, Teacher]] = Depends(get_current_user)):
+    """
+    Server-Sent Events stream of a task's partial LLM results.
+
+    Each completed form section or rubric item is sent as a "partial" event
+    while Mistral is still generating; "status" events follow the task status
+    and a final "done" event is sent once the task completes or fails.
+    Reconnecting clients resume after the Last-Event-ID header.
+    """
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    task = queue_manager.task_registry.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if task.user_id != current_user.username:
+        raise HTTPException(status_code=403, detail="Access denied to this task")
+
+    try:
+        since = int(request.headers.get("last-event-id", "0"))
+    except ValueError:
+        since = 0
+
+    async def event_stream():
+        last_id = since
+        last_status = None
+        while True:
+            if await request.is_disconnected():
+                break
+            for event in queue_manager.get_task_events(task_id, last_id):
+                last_id = event["id"]
+                data = json.dumps({k: event[k] for k in ("stage", "path", "value")}, default=str)
+                yield f"id: {last_id}\nevent: partial\ndata: {data}\n\n"
+            status = task.status.value
+            if status != last_status:
+                last_status = status
+                yield f"event: status\ndata: {json.dumps({'status': status})}\n\n"
+            if status in ("complete", "failed"):
+                yield f"event: done\ndata: {json.dumps({'status': status})}\n\n"
+                break
+            await asyncio.sleep(SSE_POLL_SECONDS)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # No proxy buffering
+    )
+
 @app.get("/queue/stats")
 async def get_queue_stats():
     """Get current queue statistics and system status."""
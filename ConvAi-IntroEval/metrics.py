@@ -0,0 +1,119 @@
+"""
+Lightweight Performance Metrics Registry for ConvAi-IntroEval
+
+Collects counters, gauges and timing summaries from the STT and LLM stages
+in-process so they can be exposed through the /metrics endpoint without an
+external monitoring dependency.
+
+Naming convention: dotted names grouped by stage, e.g.
+    stt.cache.hits, llm.extraction.latency_seconds
+"""
+
+import threading
+from collections import defaultdict, deque
+from typing import Any, Dict, Optional
+
+# Number of recent observations kept per timing for percentile estimates
+DEFAULT_WINDOW = 200
+
+
+class MetricsRegistry:
+    """Thread-safe registry of counters, gauges and timing observations"""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self._lock = threading.Lock()
+        self._window = window
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, Any] = {}
+        self._observations: Dict[str, Dict[str, Any]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Increase a counter"""
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: Any) -> None:
+        """Set a gauge to its latest value"""
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record one observation (duration, size, ratio...) for a summary"""
+        with self._lock:
+            summary = self._observations.get(name)
+            if summary is None:
+                summary = {
+                    "count": 0,
+                    "total": 0.0,
+                    "min": value,
+                    "max": value,
+                    "recent": deque(maxlen=self._window)
+                }
+                self._observations[name] = summary
+
+            summary["count"] += 1
+            summary["total"] += value
+            summary["min"] = min(summary["min"], value)
+            summary["max"] = max(summary["max"], value)
+            summary["recent"].append(value)
+
+    def get_counter(self, name: str) -> float:
+        """Return the current value of a counter (0 if never incremented)"""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def ratio(self, numerator: str, denominator: str) -> Optional[float]:
+        """Return counter[numerator] / counter[denominator], or None when undefined"""
+        with self._lock:
+            total = self._counters.get(denominator, 0)
+            if not total:
+                return None
+            return round(self._counters.get(numerator, 0) / total, 4)
+
+    def snapshot(self, prefix: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Return a JSON-serializable copy of all metrics.
+
+        Args:
+            prefix: Only include metrics whose name starts with this prefix
+
+        Returns:
+            dict with "counters", "gauges" and "timings" sections
+        """
+        def wanted(name: str) -> bool:
+            return prefix is None or name.startswith(prefix)
+
+        with self._lock:
+            timings = {}
+            for name, summary in self._observations.items():
+                if not wanted(name):
+                    continue
+                recent = sorted(summary["recent"])
+                timings[name] = {
+                    "count": summary["count"],
+                    "mean": round(summary["total"] / summary["count"], 4),
+                    "min": round(summary["min"], 4),
+                    "max": round(summary["max"], 4),
+                    "last": round(summary["recent"][-1], 4),
+                    "p50": round(recent[len(recent) // 2], 4),
+                    "p95": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 4)
+                }
+
+            return {
+                "counters": {k: v for k, v in self._counters.items() if wanted(k)},
+                "gauges": {k: v for k, v in self._gauges.items() if wanted(k)},
+                "timings": timings
+            }
+
+    def reset(self) -> None:
+        """Clear all metrics"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._observations.clear()
+
+
+# Global registry shared by all modules
+metrics = MetricsRegistry()
+
+__all__ = ['MetricsRegistry', 'metrics']
@@ -0,0 +1,193 @@
+"""
+Speech Analytics Module for ConvAi-IntroEval
+
+Computes delivery metrics (speaking rate, pauses, filler words) locally from
+Whisper segment timestamps, so the intro rating no longer asks the LLM to
+guess pacing from plain text.
+
+All timing math is vectorized with NumPy over the segment (or, when Whisper
+produced them, word) timestamps from the structured segments sidecar.
+"""
+
+import logging
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)  # Only log warnings and errors to reduce overhead
+
+# Constants
+PAUSE_MIN_SECONDS = 0.5  # Gaps shorter than this are normal articulation, not pauses
+LONG_PAUSE_SECONDS = 2.0
+MIN_SPEECH_SPAN_SECONDS = 1.0  # Rates over shorter spans are noise, not pacing
+FILLER_PATTERN = re.compile(
+    r"\b(um+|uh+|uhm+|erm*|ah+|hmm+|you know|i mean|kind of|sort of|basically)\b",
+    re.IGNORECASE
+)
+
+# Typical interview pacing bands (words per minute)
+SLOW_WPM = 110
+FAST_WPM = 170
+
+
+def _timing_arrays(segments: List[Dict[str, Any]]):
+    """
+    Return (starts, ends, word_counts, source) using word timestamps when every
+    segment has them (finer pause detection) and segment timestamps otherwise.
+    """
+    if segments and all(segment.get("words") for segment in segments):
+        words = [word for segment in segments for word in segment["words"]]
+        starts = np.fromiter((w.get("start", 0) for w in words), dtype=np.float64, count=len(words))
+        ends = np.fromiter((w.get("end", 0) for w in words), dtype=np.float64, count=len(words))
+        return starts, ends, np.ones(len(words), dtype=np.int64), "words"
+
+    starts = np.fromiter((s.get("start", 0) for s in segments), dtype=np.float64, count=len(segments))
+    ends = np.fromiter((s.get("end", 0) for s in segments), dtype=np.float64, count=len(segments))
+    word_counts = np.fromiter((len(s.get("text", "").split()) for s in segments), dtype=np.int64, count=len(segments))
+    return starts, ends, word_counts, "segments"
+
+
+def compute_speech_metrics(
+    segments: List[Dict[str, Any]],
+    audio_duration: Optional[float] = None,
+    decode_mode: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Compute speaking rate, pause and filler metrics from timestamped segments.
+
+    Rates are None when less than MIN_SPEECH_SPAN_SECONDS of speech was timed.
+    Batched decodes hold one segment per audio window rather than real Whisper
+    segment boundaries, so their pause and rate metrics are None as well.
+
+    Args:
+        segments: Segments with start, end and text (and optional words)
+        audio_duration: Total recording length; defaults to the end of the last segment
+        decode_mode: Decode mode recorded in the segments sidecar ("full", "streamed", "batched")
+
+    Returns:
+        dict of delivery metrics (empty dict if there is no speech)
+    """
+    segments = [s for s in segments if s.get("text", "").strip()]
+    if not segments:
+        return {}
+
+    starts, ends, word_counts, timing_source = _timing_arrays(segments)
+    order = np.argsort(starts)
+    starts, ends, word_counts = starts[order], ends[order], word_counts[order]
+
+    total_words = int(word_counts.sum())
+    duration = float(audio_duration or ends[-1])
+    speech_span = float(ends[-1] - starts[0])
+
+    text = " ".join(s.get("text", "") for s in segments)
+    fillers = [match.lower() for match in FILLER_PATTERN.findall(text)]
+    filler_counts = {word: fillers.count(word) for word in sorted(set(fillers))}
+
+    metrics = {
+        "duration_seconds": round(duration, 1),
+        "total_words": total_words,
+        "words_per_minute": None,
+        "articulation_rate_wpm": None,
+        "pause_count": None,
+        "long_pause_count": None,
+        "pause_ratio": None,
+        "longest_pause_seconds": None,
+        "leading_silence_seconds": None,
+        "filler_count": len(fillers),
+        "fillers_per_minute": None,
+        "filler_words": filler_counts,
+        "segment_wpm": [],
+        "segment_wpm_std": None,
+        "timing_source": timing_source
+    }
+    if decode_mode == "batched":
+        metrics["timing_source"] = "windows"
+        return metrics
+
+    # Gaps between consecutive units; overlaps count as zero
+    gaps = np.clip(starts[1:] - ends[:-1], 0, None)
+    pauses = gaps[gaps >= PAUSE_MIN_SECONDS]
+    pause_seconds = float(pauses.sum())
+
+    # Per-segment speaking rate always uses segment granularity
+    seg_starts = np.array([s.get("start", 0) for s in segments], dtype=np.float64)
+    seg_ends = np.array([s.get("end", 0) for s in segments], dtype=np.float64)
+    seg_words = np.array([len(s.get("text", "").split()) for s in segments], dtype=np.float64)
+    seg_durations = seg_ends - seg_starts
+    valid = seg_durations >= MIN_SPEECH_SPAN_SECONDS
+    segment_wpm = np.zeros(len(segments))
+    segment_wpm[valid] = seg_words[valid] / seg_durations[valid] * 60
+
+    metrics.update({
+        "pause_count": int(len(pauses)),
+        "long_pause_count": int((pauses >= LONG_PAUSE_SECONDS).sum()),
+        "longest_pause_seconds": round(float(pauses.max()), 2) if len(pauses) else 0.0,
+        "leading_silence_seconds": round(float(starts[0]), 2),
+        "segment_wpm": [round(float(rate), 1) for rate in segment_wpm],
+        "segment_wpm_std": round(float(segment_wpm[valid].std()), 1) if valid.any() else None
+    })
+    if speech_span < MIN_SPEECH_SPAN_SECONDS:
+        return metrics
+
+    speaking_seconds = speech_span - pause_seconds
+    metrics.update({
+        "words_per_minute": round(total_words / speech_span * 60, 1),
+        "articulation_rate_wpm": (
+            round(total_words / speaking_seconds * 60, 1) if speaking_seconds >= MIN_SPEECH_SPAN_SECONDS else None
+        ),
+        "pause_ratio": round(pause_seconds / speech_span, 3),
+        "fillers_per_minute": round(len(fillers) / speech_span * 60, 2)
+    })
+    return metrics
+
+
+def describe_pacing(metrics: Dict[str, Any]) -> str:
+    """One-line fluency/pacing description derived from the measured metrics"""
+    if metrics and metrics.get("timing_source") == "windows":
+        return "Fluency: Pacing not measured (batched transcript has no segment timings)"
+    if not metrics or metrics.get("words_per_minute") is None:
+        return "Fluency: Not enough speech to measure pacing"
+
+    wpm = metrics["words_per_minute"]
+    if wpm < SLOW_WPM:
+        pace = "slow-paced"
+    elif wpm > FAST_WPM:
+        pace = "fast-paced"
+    else:
+        pace = "well-paced"
+
+    details = [f"{wpm:.0f} words/min"]
+    if metrics.get("pause_ratio") is not None:
+        details.append(f"{metrics['pause_ratio'] * 100:.0f}% of the time in pauses")
+    if metrics.get("long_pause_count"):
+        details.append(f"{metrics['long_pause_count']} long pause(s), longest {metrics['longest_pause_seconds']:.1f}s")
+    if metrics.get("filler_count"):
+        details.append(f"{metrics['filler_count']} filler word(s)")
+    return f"Fluency: {pace.capitalize()} delivery ({', '.join(details)})"
+
+
+def analyze_transcript(transcript_path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Compute speech metrics for a transcript from its structured segments sidecar.
+
+    Returns:
+        Metrics dict, or None if the transcript has no segments sidecar
+    """
+    from stt import load_segments  # Imported lazily; stt pulls in Whisper and torch
+
+    data = load_segments(transcript_path)
+    if not data:
+        return None
+    try:
+        return compute_speech_metrics(
+            data.get("segments", []), data.get("audio_duration"), data.get("decode_mode")
+        )
+    except Exception as e:
+        logger.warning(f"Speech analytics failed for {transcript_path}: {e}")
+        return None
+
+
+__all__ = ['compute_speech_metrics', 'describe_pacing', 'analyze_transcript']
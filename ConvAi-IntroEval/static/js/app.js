@@ -610,6 +610,27 @@ document.addEventListener('DOMContentLoaded', function() {
                     </div>
                 `;
             }
+
+            // Add measured delivery metrics (computed from audio timing, not by the LLM)
+            if (!isProfileRating && data.speech_metrics && data.speech_metrics.words_per_minute) {
+                const sm = data.speech_metrics;
+                html += `
+                    <div class="rating-card" style="margin-top: 24px;">
+                        <div class="rating-header">
+                            <h4 class="rating-title">
+                                <i class="fas fa-stopwatch me-2"></i>Delivery Metrics
+                            </h4>
+                        </div>
+                        <div class="rating-details">
+                            <ul class="list-group list-group-flush">
+                                <li class="list-group-item" style="background: var(--background-primary); border-color: var(--border-color); color: var(--text-secondary);">Speaking rate: ${sm.words_per_minute} words/min</li>
+                                <li class="list-group-item" style="background: var(--background-primary); border-color: var(--border-color); color: var(--text-secondary);">Time in pauses: ${Math.round(sm.pause_ratio * 100)}% (longest ${sm.longest_pause_seconds}s)</li>
+                                <li class="list-group-item" style="background: var(--background-primary); border-color: var(--border-color); color: var(--text-secondary);">Filler words: ${sm.filler_count}</li>
+                            </ul>
+                        </div>
+                    </div>
+                `;
+            }
               // Add specific feedback section for intro ratings
             if (!isProfileRating && data.feedback && Array.isArray(data.feedback) && data.feedback.length > 0) {
                 html += `
@@ -1562,6 +1583,9 @@ document.addEventListener('DOMContentLoaded', function() {
     function startTaskStatusPolling(taskId) {
         console.log(`Starting task status polling for task: ${taskId}`);
         
+        // Partial LLM results arrive over SSE; polling still drives the status steps
+        startTaskEventStream(taskId);
+        
         if (taskStatusInterval) {
             clearInterval(taskStatusInterval);
         }
@@ -1634,6 +1658,96 @@ document.addEventListener('DOMContentLoaded', function() {
             }
         }, 4800000); // 80 minutes
     }
+    // Stream partial LLM results (form sections, rubric items) while Mistral is generating
+    function startTaskEventStream(taskId) {
+        if (typeof EventSource === 'undefined') return;
+        
+        const eventSource = new EventSource(`/queue/events/${taskId}`, { withCredentials: true });
+        appState.eventSources.push(eventSource);
+        
+        eventSource.addEventListener('partial', function(event) {
+            try {
+                showPartialResult(JSON.parse(event.data));
+            } catch (error) {
+                console.warn('Could not parse partial result:', error);
+            }
+        });
+        
+        eventSource.addEventListener('done', function() {
+            eventSource.close();
+        });
+        
+        eventSource.onerror = function() {
+            // The browser reconnects on its own (resuming via Last-Event-ID) unless the stream was closed
+            if (eventSource.readyState === EventSource.CLOSED) {
+                console.log('Task event stream closed');
+            }
+        };
+    }
+    
+    // Append one live item to a result container until the final result replaces it
+    function appendLiveItem(container, label, value) {
+        const item = document.createElement('div');
+        item.className = 'field-item live-item';
+        const labelElement = document.createElement('div');
+        labelElement.className = 'field-label';
+        labelElement.textContent = label;
+        const valueElement = document.createElement('div');
+        valueElement.className = 'field-value';
+        valueElement.textContent = value;
+        item.appendChild(labelElement);
+        item.appendChild(valueElement);
+        container.appendChild(item);
+        resultsSection.classList.remove('d-none');
+    }
+    
+    function formatLiveLabel(key) {
+        return String(key).replace(/_/g, ' ').replace(/\b\w/g, l => l.toUpperCase());
+    }
+    
+    function showPartialResult(partial) {
+        let stage = partial.stage;
+        let path = partial.path || [];
+        const value = partial.value;
+        
+        // Fused mode nests both results one level deeper
+        if (stage === 'fused') {
+            if (path[0] === 'extracted_fields') {
+                stage = 'extraction';
+            } else if (path[0] === 'profile_rating') {
+                stage = 'profile';
+            } else {
+                return;
+            }
+            path = path.slice(1);
+        }
+        
+        if (stage === 'extraction') {
+            // One completed form section
+            if (appState.extractedFields || path.length !== 1 || !value || typeof value !== 'object') return;
+            const mentioned = Object.entries(value)
+                .filter(([, v]) => v && v !== 'Not Mentioned')
+                .map(([k, v]) => `${formatLiveLabel(k)}: ${v}`);
+            if (mentioned.length) {
+                appendLiveItem(extractedFieldsContent, formatLiveLabel(path[0]), mentioned.join('\n'));
+            }
+            return;
+        }
+        
+        const container = stage === 'profile' ? profileRatingContent : introRatingContent;
+        const finalRating = stage === 'profile' ? appState.profileRating : appState.introRating;
+        if (finalRating || !container || path.length === 0 || path[0] === 'grading_debug') return;
+        if (value === null || typeof value === 'object') return;  // Sections are shown item by item
+        
+        if (path.length === 1) {
+            appendLiveItem(container, formatLiveLabel(path[0]), value);
+        } else if (typeof path[1] === 'number') {
+            appendLiveItem(container, `${formatLiveLabel(path[0])} ${path[1] + 1}`, value);
+        } else {
+            appendLiveItem(container, formatLiveLabel(path[1]), value);
+        }
+    }
+    
       function handleTaskStatusUpdate(status) {
         const taskStatus = status.status;
         const queuePosition = status.queue_position || status.users_ahead;
@@ -1651,6 +1765,13 @@ document.addEventListener('DOMContentLoaded', function() {
             statusElement.textContent = taskStatus;
         }
         
+        // Show the live (streamed) or quick preview transcript until the final transcript replaces it
+        if (status.partial_transcript && !appState.transcriptText) {
+            transcriptContent.textContent = `[Live - transcription in progress]\n\n${status.partial_transcript}`;
+        } else if (status.preview_transcript && !appState.transcriptText) {
+            transcriptContent.textContent = `[Preview - final transcript in progress]\n\n${status.preview_transcript}`;
+        }
+
         // Add safeguard for completed tasks
         if (taskStatus === 'complete') {
             console.log('👉 Task is complete, ensuring UI updates...');
@@ -16,23 +16,93 @@ import os
 import gc
 import torch
 import logging
-from typing import Optional, Tuple, List, Dict, Any
-from dataclasses import dataclass
+from typing import Optional, Tuple, List, Dict, Any, Callable, Iterator
+from dataclasses import dataclass, replace
 from contextlib import contextmanager
 import weakref
 import time
+import hashlib
+import json
+from collections import deque
+
+try:
+    import psutil  # Optional: more accurate memory readings than /proc parsing
+except ImportError:
+    psutil = None
+
+from disk_cache import DiskLRUCache
+from metrics import metrics
 
 # Configure optimized logging for STT operations
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)  # Only log warnings and errors to reduce overhead
 
 # Constants
-SUPPORTED_EXTENSIONS = [".mp3", ".mp4", ".wav", ".m4a", ".webm", ".flac", ".ogg", ".aac"]
+SUPPORTED_EXTENSIONS = [".mp3", ".mp4", ".wav", ".m4a", ".webm", ".flac", ".ogg", ".aac", ".opus"]
 DEFAULT_MODEL_SIZE = "turbo"
 MAX_CACHED_MODELS = 2  # Limit model cache to prevent memory explosion
 MAX_FILE_SIZE_MB = 500  # Maximum file size limit
 MAX_DURATION_SECONDS = 3600  # 1 hour max duration
 
+# Memory-pressure eviction (0 = derive from the machine: half of RAM / 90% of VRAM)
+STT_RSS_BUDGET_MB = int(os.environ.get("STT_RSS_BUDGET_MB", "0"))
+STT_CUDA_BUDGET_MB = int(os.environ.get("STT_CUDA_BUDGET_MB", "0"))
+STT_MIN_AVAILABLE_MB = int(os.environ.get("STT_MIN_AVAILABLE_MB", "1024"))  # Leave room for Ollama and the OS
+EVICTION_HISTORY_SIZE = 50
+
+# Approximate parameter counts (millions) used to predict a model's footprint before loading it
+WHISPER_PARAMS_MILLIONS = {
+    "tiny": 39, "tiny.en": 39, "base": 74, "base.en": 74, "small": 244, "small.en": 244,
+    "medium": 769, "medium.en": 769, "turbo": 809, "large": 1550, "large-v1": 1550,
+    "large-v2": 1550, "large-v3": 1550, "large-v3-turbo": 809
+}
+
+# Transcript cache (content-addressed by audio hash + STT settings)
+TRANSCRIPT_CACHE_DIR = Path(__file__).parent / "cache" / "transcripts"
+TRANSCRIPT_CACHE_MAX_MB = int(os.environ.get("STT_CACHE_MAX_MB", "256"))
+TRANSCRIPT_CACHE_ENABLED = os.environ.get("STT_CACHE_ENABLED", "1") != "0"
+
+# Structured segment sidecar written next to every .txt transcript
+SEGMENTS_SUFFIX = ".segments.json"
+SEGMENTS_FORMAT_VERSION = 1
+
+# Batched decoding (several queued files share one forward pass)
+BATCH_MEMORY_BUDGET_MB = int(os.environ.get("STT_BATCH_MEMORY_MB", "2048"))
+WINDOW_SECONDS = 30  # Whisper decodes fixed 30-second windows
+
+# Decode guardrails (defaults match Whisper's transcribe(); the optional token budget bounds worst-case latency)
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+COMPRESSION_RATIO_THRESHOLD = 2.4  # Above this a segment is almost always a repetition loop
+REPETITION_MIN_REPEATS = 3  # A phrase repeated this many times in a row is a loop
+REPETITION_MAX_WORDS = 12  # Longest phrase checked for repetition
+# Off by default: fast speakers exceed 6 tokens/s, and a cut window loses real words
+MAX_TOKENS_PER_SECOND = float(os.environ.get("STT_MAX_TOKENS_PER_SECOND", "0"))  # 0 disables the budget
+CONDITION_ON_PREVIOUS_TEXT = os.environ.get("STT_CONDITION_ON_PREVIOUS_TEXT", "1") != "0"
+MAX_WINDOW_TOKENS = 224  # Whisper's own per-window limit (n_text_ctx // 2)
+
+# Adaptive decoding: greedy first, then beam search only for low-confidence segments
+ADAPTIVE_BEAM_SIZE = int(os.environ.get("STT_ADAPTIVE_BEAM_SIZE", "0"))  # 0 disables re-decoding
+REDECODE_LOGPROB_THRESHOLD = float(os.environ.get("STT_REDECODE_LOGPROB_THRESHOLD", "-0.7"))
+
+# Streaming transcription: decode in chunks and hand each segment over as soon as it exists
+STREAM_SEGMENTS = os.environ.get("STT_STREAM_SEGMENTS", "0") == "1"
+STREAM_CHUNK_SECONDS = 60
+STREAM_BOUNDARY_SEARCH_SECONDS = 2.0  # Cut chunks at the quietest point near the boundary
+STREAM_PROMPT_CHARS = 200  # Tail of the previous chunk used as the next chunk's prompt
+
+# Optional fast preview pass published before the authoritative transcript ("" disables)
+PREVIEW_MODEL_SIZE = os.environ.get("STT_PREVIEW_MODEL", "")
+
+# CPU int8 dynamic quantization of the Whisper linear layers
+QUANTIZE_INT8 = os.environ.get("STT_QUANTIZE_INT8", "0") == "1"
+QUANTIZED_MODEL_DIR = Path(__file__).parent / "cache" / "models"
+
+# Tuned configuration written by `python gpu_check.py --profile`
+STT_PROFILE_PATH = Path(os.environ.get("STT_PROFILE_PATH", str(Path(__file__).parent / "stt_profile.json")))
+# Only the settings the profiler benchmarks; everything else keeps its current default
+TUNED_FIELDS = ("model_size", "beam_size", "fp16", "num_threads")
+
 @dataclass
 class TranscriptionConfig:
     """Configuration for transcription parameters"""
@@ -42,6 +112,332 @@ class TranscriptionConfig:
     beam_size: int = 1
     best_of: int = 1
     verbose: bool = False
+    use_cache: bool = True
+    quantize_int8: bool = QUANTIZE_INT8  # CPU only; ignored on CUDA
+    fp16: Optional[bool] = None  # None = FP16 on GPU, FP32 on CPU
+    num_threads: Optional[int] = None  # torch CPU threads; None = torch default
+    compression_ratio_threshold: Optional[float] = COMPRESSION_RATIO_THRESHOLD
+    no_speech_threshold: Optional[float] = NO_SPEECH_THRESHOLD
+    logprob_threshold: Optional[float] = LOGPROB_THRESHOLD
+    max_tokens_per_second: Optional[float] = MAX_TOKENS_PER_SECOND or None
+    condition_on_previous_text: bool = CONDITION_ON_PREVIOUS_TEXT
+    adaptive_beam_size: int = ADAPTIVE_BEAM_SIZE  # Beam used to re-decode low-confidence segments
+    redecode_logprob_threshold: float = REDECODE_LOGPROB_THRESHOLD
+
+def load_tuned_config(profile_path: Path = STT_PROFILE_PATH) -> Optional[TranscriptionConfig]:
+    """
+    Load the TranscriptionConfig chosen by the hardware profiler (gpu_check.py --profile).
+    
+    Only TUNED_FIELDS are taken from the profile and applied on top of
+    TranscriptionConfig(), so defaults changed after the profile was written
+    (thresholds, guardrails, env settings) still take effect.
+    
+    Returns:
+        The tuned config, or None if there is no usable profile for this machine
+    """
+    if not profile_path.exists():
+        return None
+    
+    try:
+        with open(profile_path, "r", encoding="utf-8") as f:
+            profile = json.load(f)
+        
+        # A profile tuned on a GPU box is meaningless on a CPU-only one (and vice versa)
+        profile_device = profile.get("device")
+        current_device = "cuda" if torch.cuda.is_available() else "cpu"
+        if profile_device and profile_device != current_device:
+            logger.warning(f"Ignoring STT profile tuned for {profile_device} (running on {current_device})")
+            return None
+        
+        values = {k: v for k, v in profile.get("config", {}).items() if k in TUNED_FIELDS}
+        return replace(TranscriptionConfig(), **values)
+    except Exception as e:
+        logger.warning(f"Could not load STT profile {profile_path}: {e}")
+        return None
+
+def save_tuned_config(config: TranscriptionConfig, profile_path: Path = STT_PROFILE_PATH, **details: Any) -> None:
+    """Write the tuned fields of a TranscriptionConfig (plus benchmark details) for load_tuned_config"""
+    profile = {
+        "device": "cuda" if torch.cuda.is_available() else "cpu",
+        "config": {name: getattr(config, name) for name in TUNED_FIELDS},
+        **details
+    }
+    with open(profile_path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+
+# Default configuration: the tuned profile if one exists, otherwise the built-in defaults
+_default_config = load_tuned_config() or TranscriptionConfig()
+
+def get_default_config() -> TranscriptionConfig:
+    """Return a copy of the default transcription configuration"""
+    return replace(_default_config)
+
+def _use_fp16(config: TranscriptionConfig, model: Any) -> bool:
+    """FP16 only runs on CUDA; follow the config when set, otherwise use it whenever on GPU"""
+    on_gpu = model.device.type == "cuda"
+    return on_gpu if config.fp16 is None else (config.fp16 and on_gpu)
+
+def _apply_thread_setting(config: TranscriptionConfig) -> None:
+    """Apply the configured torch CPU thread count (process-wide)"""
+    if config.num_threads and torch.get_num_threads() != config.num_threads:
+        torch.set_num_threads(config.num_threads)
+
+def window_token_budget(config: TranscriptionConfig) -> Optional[int]:
+    """Maximum tokens decoded per 30-second window (Whisper's sample_len), or None for no budget"""
+    if not config.max_tokens_per_second:
+        return None
+    return max(1, min(MAX_WINDOW_TOKENS, int(config.max_tokens_per_second * WINDOW_SECONDS)))
+
+def trim_repetition(text: str, min_repeats: int = REPETITION_MIN_REPEATS,
+                    max_words: int = REPETITION_MAX_WORDS) -> str:
+    """
+    Collapse phrases repeated min_repeats or more times in a row to a single occurrence.
+    
+    Whisper's repetition loops emit the same word or phrase over and over; the
+    text before and after the loop is usually correct, so only the repeats go.
+    Comparison ignores case and surrounding punctuation.
+    """
+    words = text.split()
+    normalized = [word.strip(".,!?;:\"'").lower() for word in words]
+    kept = []
+    i = 0
+    while i < len(words):
+        for size in range(1, min(max_words, len(words) - i) + 1):
+            unit = normalized[i:i + size]
+            repeats = 1
+            while normalized[i + repeats * size:i + (repeats + 1) * size] == unit:
+                repeats += 1
+            if repeats >= min_repeats:
+                kept.extend(words[i:i + size])
+                i += repeats * size
+                break
+        else:
+            kept.append(words[i])
+            i += 1
+    return " ".join(kept)
+
+def apply_guardrails(segments: List[Dict[str, Any]], config: TranscriptionConfig) -> List[Dict[str, Any]]:
+    """
+    Apply the decode guardrails to segments and count every firing.
+    
+    - compression ratio above the threshold: repetition loop; the repeated
+      phrase is collapsed to one occurrence (trim_repetition) and the rest of
+      the segment is kept
+    - no-speech probability above the threshold with low confidence: silence
+      hallucination, dropped
+    - window that used up its whole token budget: kept but counted, since the
+      text is truncated rather than wrong
+    
+    Returns:
+        The segments that passed, with repetition loops trimmed
+    """
+    budget = window_token_budget(config)
+    if budget:
+        # transcribe() splits a window into several segments; sum tokens per window
+        tokens_per_window: Dict[Any, int] = {}
+        for segment in segments:
+            window = segment.get("seek", segment.get("start"))
+            tokens_per_window[window] = tokens_per_window.get(window, 0) + len(segment.get("tokens", []))
+        truncated = sum(1 for count in tokens_per_window.values() if count >= budget)
+        if truncated:
+            metrics.increment("stt.guardrail.token_budget", truncated)
+    
+    metrics.increment("stt.segments_checked", len(segments))
+    kept = []
+    for segment in segments:
+        compression_ratio = segment.get("compression_ratio")
+        if (config.compression_ratio_threshold is not None and compression_ratio is not None
+                and compression_ratio > config.compression_ratio_threshold):
+            metrics.increment("stt.guardrail.compression_ratio")
+            text = segment.get("text", "")
+            trimmed = trim_repetition(text)
+            if not trimmed:
+                continue
+            if trimmed != text.strip():
+                # Word timings no longer line up with the shortened text
+                segment = {key: value for key, value in segment.items() if key != "words"}
+                segment["text"] = text[:len(text) - len(text.lstrip())] + trimmed
+                metrics.increment("stt.guardrail.repetition_trimmed")
+        
+        no_speech_prob = segment.get("no_speech_prob")
+        avg_logprob = segment.get("avg_logprob")
+        if (config.no_speech_threshold is not None and no_speech_prob is not None
+                and no_speech_prob > config.no_speech_threshold
+                and (config.logprob_threshold is None or avg_logprob is None
+                     or avg_logprob < config.logprob_threshold)):
+            metrics.increment("stt.guardrail.no_speech")
+            continue
+        
+        kept.append(segment)
+    
+    if len(kept) < len(segments):
+        logger.warning(f"Guardrails dropped {len(segments) - len(kept)} of {len(segments)} segments")
+    return kept
+
+def redecode_low_confidence(
+    model: Any,
+    audio: Any,
+    segments: List[Dict[str, Any]],
+    config: TranscriptionConfig,
+    fp16: bool
+) -> List[Dict[str, Any]]:
+    """
+    Re-decode segments whose avg_logprob is below the threshold with beam search.
+    
+    The greedy pass handles the bulk of the audio; only the uncertain stretches
+    pay for beam search. All selected segments are decoded together in one
+    batched call, and a beam result only replaces the greedy text when it is
+    more confident and does not trip the compression-ratio guardrail.
+    
+    Args:
+        model: Loaded Whisper model
+        audio: 16 kHz mono float32 audio the segments came from
+        segments: Segments from the greedy pass (updated in place)
+        config: Transcription configuration
+        fp16: Whether to decode in FP16
+    
+    Returns:
+        The segments, with low-confidence ones replaced where beam search did better
+    """
+    if config.adaptive_beam_size <= 1 or config.beam_size > 1 or not segments:
+        return segments
+    
+    candidates = [
+        segment for segment in segments
+        if segment.get("avg_logprob") is not None
+        and segment["avg_logprob"] < config.redecode_logprob_threshold
+    ]
+    metrics.increment("stt.adaptive.segments_total", len(segments))
+    if not candidates:
+        return segments
+    
+    sample_rate = whisper.audio.SAMPLE_RATE
+    mels = []
+    for segment in candidates:
+        chunk = audio[int(segment["start"] * sample_rate):int(segment["end"] * sample_rate)]
+        mels.append(whisper.log_mel_spectrogram(whisper.pad_or_trim(chunk), model.dims.n_mels))
+    
+    options = whisper.DecodingOptions(
+        task="transcribe",
+        language=config.language,
+        beam_size=config.adaptive_beam_size,
+        fp16=fp16,
+        sample_len=window_token_budget(config),
+        without_timestamps=True
+    )
+    try:
+        with torch.no_grad():
+            decoded = whisper.decode(model, torch.stack(mels).to(model.device), options)
+    except Exception as e:
+        logger.warning(f"Beam re-decoding failed, keeping greedy output: {e}")
+        return segments
+    
+    improved = 0
+    for segment, result in zip(candidates, decoded):
+        if result.avg_logprob <= segment["avg_logprob"]:
+            continue
+        if (config.compression_ratio_threshold is not None
+                and result.compression_ratio > config.compression_ratio_threshold):
+            continue
+        segment.update({
+            "text": result.text,
+            "tokens": result.tokens,
+            "avg_logprob": result.avg_logprob,
+            "compression_ratio": result.compression_ratio,
+            "redecoded": True
+        })
+        segment.pop("words", None)  # Word timings belonged to the greedy text
+        improved += 1
+    
+    metrics.increment("stt.adaptive.segments_redecoded", len(candidates))
+    metrics.increment("stt.adaptive.segments_improved", improved)
+    logger.info(f"Re-decoded {len(candidates)}/{len(segments)} low-confidence segments "
+                f"with beam {config.adaptive_beam_size} ({improved} improved)")
+    return segments
+
+def precision_label(config: TranscriptionConfig, device: str) -> str:
+    """Label the numeric precision a model runs at (for metrics)"""
+    if config.quantize_int8 and device == "cpu":
+        return "int8"
+    if device == "cuda" and config.fp16 is not False:
+        return "fp16"
+    return "fp32"
+
+def model_footprint_mb(model: Any) -> float:
+    """Size of the model's weights and buffers, including packed quantized weights"""
+    def tensor_bytes(value: Any) -> int:
+        if isinstance(value, torch.Tensor):
+            return value.element_size() * value.nelement()
+        if isinstance(value, (tuple, list)):
+            return sum(tensor_bytes(item) for item in value)
+        return 0
+    
+    return round(sum(tensor_bytes(v) for v in model.state_dict().values()) / (1024 * 1024), 1)
+
+def _read_proc_kb(path: str, key: str) -> Optional[int]:
+    """Read a "Key:   123 kB" value from a /proc file"""
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                if line.startswith(key + ":"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def process_rss_mb() -> Optional[float]:
+    """Resident memory of this process in MB (psutil if installed, otherwise /proc)"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    rss_kb = _read_proc_kb("/proc/self/status", "VmRSS")
+    return rss_kb / 1024 if rss_kb is not None else None
+
+def system_memory_mb() -> Tuple[Optional[float], Optional[float]]:
+    """Return (total, available) system memory in MB, or None where unknown"""
+    if psutil is not None:
+        memory = psutil.virtual_memory()
+        return memory.total / (1024 * 1024), memory.available / (1024 * 1024)
+    total_kb = _read_proc_kb("/proc/meminfo", "MemTotal")
+    available_kb = _read_proc_kb("/proc/meminfo", "MemAvailable")
+    return (
+        total_kb / 1024 if total_kb is not None else None,
+        available_kb / 1024 if available_kb is not None else None
+    )
+
+def cuda_memory_mb() -> Tuple[float, Optional[float]]:
+    """Return (reserved by this process, device total) CUDA memory in MB"""
+    if not torch.cuda.is_available():
+        return 0.0, None
+    device = torch.cuda.current_device()
+    return (
+        torch.cuda.memory_reserved(device) / (1024 * 1024),
+        torch.cuda.get_device_properties(device).total_memory / (1024 * 1024)
+    )
+
+def estimate_model_mb(config: TranscriptionConfig, device: str) -> float:
+    """Predict a model's resident size before loading it (weights are kept in FP32; int8 ~ 1/3)"""
+    params_millions = WHISPER_PARAMS_MILLIONS.get(config.model_size, 809)
+    bytes_per_param = 1.4 if (config.quantize_int8 and device == "cpu") else 4
+    return params_millions * bytes_per_param
+
+def _quantize_linear_layers(model: Any) -> Any:
+    """
+    Apply int8 dynamic quantization to the Linear layers of a Whisper model.
+    
+    Whisper's Linear subclass only adds dtype casting, and quantize_dynamic
+    matches exact module types, so each one is first swapped for a plain
+    nn.Linear that shares its weight and bias.
+    """
+    model.eval()
+    for parent in list(model.modules()):
+        for name, child in list(parent.named_children()):
+            if isinstance(child, torch.nn.Linear) and type(child) is not torch.nn.Linear:
+                linear = torch.nn.Linear(child.in_features, child.out_features,
+                                         bias=child.bias is not None, device="meta")
+                linear.weight = child.weight
+                linear.bias = child.bias
+                setattr(parent, name, linear)
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
 
 class ModelManager:
     """Thread-safe model manager with proper resource management"""
@@ -50,9 +446,13 @@ class ModelManager:
         self._models: Dict[str, Any] = {}
         self._model_locks: Dict[str, threading.Lock] = {}
         self._access_times: Dict[str, float] = {}
+        self._in_use: Dict[str, int] = {}  # Transcriptions currently running on each model
+        self._model_info: Dict[str, Dict[str, Any]] = {}
         self._max_models = max_models
         self._global_lock = threading.RLock()
         self._device = self._detect_device()
+        self._eviction_history = deque(maxlen=EVICTION_HISTORY_SIZE)
+        self._rss_budget_mb, self._cuda_budget_mb = self._resolve_budgets()
         
     def _detect_device(self) -> str:
         """Detect and validate the best available device"""
@@ -66,18 +466,76 @@ class ModelManager:
                 return "cpu"
         return "cpu"
     
-    def _cleanup_old_models(self) -> None:
-        """Remove least recently used models when cache is full"""
-        if len(self._models) < self._max_models:
-            return
-            
-        # Find least recently used model
-        lru_key = min(self._access_times.keys(), key=lambda k: self._access_times[k])
+    def _resolve_budgets(self) -> Tuple[Optional[float], Optional[float]]:
+        """Configured RSS/CUDA budgets, or defaults derived from this machine"""
+        rss_budget = STT_RSS_BUDGET_MB or None
+        if rss_budget is None:
+            total_mb, _ = system_memory_mb()
+            rss_budget = total_mb * 0.5 if total_mb else None
+        
+        cuda_budget = STT_CUDA_BUDGET_MB or None
+        if cuda_budget is None and self._device == "cuda":
+            _, cuda_total = cuda_memory_mb()
+            cuda_budget = cuda_total * 0.9 if cuda_total else None
+        return rss_budget, cuda_budget
+    
+    def _memory_pressure(self, incoming_mb: float) -> Optional[str]:
+        """
+        Return the reason loading incoming_mb more would exceed a budget, or None.
+        On CUDA the weights live in VRAM, so the CUDA budget is checked instead of RSS.
+        """
+        if self._device == "cuda":
+            reserved_mb, _ = cuda_memory_mb()
+            if self._cuda_budget_mb and reserved_mb + incoming_mb > self._cuda_budget_mb:
+                return "cuda_budget"
+        else:
+            rss_mb = process_rss_mb()
+            if self._rss_budget_mb and rss_mb is not None and rss_mb + incoming_mb > self._rss_budget_mb:
+                return "rss_budget"
+            _, available_mb = system_memory_mb()
+            if available_mb is not None and available_mb - incoming_mb < STT_MIN_AVAILABLE_MB:
+                return "system_available"
+        return None
+    
+    def _is_evictable(self, cache_key: str) -> bool:
+        """A model can go only when no transcription is using it and nobody holds its lock"""
+        lock = self._model_locks.get(cache_key)
+        return not self._in_use.get(cache_key) and not (lock is not None and lock.locked())
+    
+    def _cleanup_old_models(self, incoming_mb: float = 0.0) -> None:
+        """
+        Evict least recently used models until there is room for one more model:
+        below the model count limit and, with incoming_mb more loaded, within the
+        RSS / CUDA memory budgets.
+        
+        One pass over the idle models in LRU order; memory is re-measured after
+        each eviction's gc.collect(). Freed pages the allocator keeps do not
+        lower RSS, so looping until the budget is met could empty the cache
+        without gaining anything.
+        """
+        candidates = sorted(
+            (key for key in self._models if self._is_evictable(key)),
+            key=lambda k: self._access_times.get(k, 0)
+        )
+        for cache_key in candidates:
+            if len(self._models) >= self._max_models:
+                reason = "count"
+            else:
+                reason = self._memory_pressure(incoming_mb)
+                if reason is None:
+                    return
+            self._evict(cache_key, reason)
         
-        logger.info(f"Removing LRU model: {lru_key}")
-        model = self._models.pop(lru_key, None)
-        self._model_locks.pop(lru_key, None)
-        self._access_times.pop(lru_key, None)
+        if len(self._models) >= self._max_models or self._memory_pressure(incoming_mb):
+            logger.warning(f"Loading a {incoming_mb:.0f}MB model exceeds the STT model limit or memory budget; "
+                           f"{len(self._models)} cached model(s) are in use or were already evicted this pass")
+    
+    def _evict(self, cache_key: str, reason: str) -> None:
+        """Drop one model from the cache and record why (its lock stays; another thread may hold it next)"""
+        logger.info(f"Removing LRU model: {cache_key} ({reason})")
+        model = self._models.pop(cache_key, None)
+        self._access_times.pop(cache_key, None)
+        info = self._model_info.pop(cache_key, {})
         
         # Cleanup model resources
         if model is not None:
@@ -85,25 +543,102 @@ class ModelManager:
             if self._device == "cuda":
                 torch.cuda.empty_cache()
             gc.collect()
+        
+        rss_mb = process_rss_mb()
+        reserved_mb, _ = cuda_memory_mb()
+        self._eviction_history.append({
+            "model": cache_key,
+            "reason": reason,
+            "footprint_mb": info.get("footprint_mb"),
+            "rss_mb_after": round(rss_mb, 1) if rss_mb is not None else None,
+            "cuda_reserved_mb_after": round(reserved_mb, 1),
+            "evicted_at": time.time()
+        })
+        metrics.increment(f"stt.model.evictions.{reason}")
+    
+    def _use_int8(self, config: TranscriptionConfig) -> bool:
+        """Dynamic quantization only helps (and only works) for CPU inference"""
+        return config.quantize_int8 and self._device == "cpu"
+    
+    def _cache_key(self, config: TranscriptionConfig) -> str:
+        suffix = "_int8" if self._use_int8(config) else ""
+        return f"{config.model_size}_{self._device}{suffix}"
+    
+    def _load_quantized_model(self, model_size: str) -> Any:
+        """
+        Load an int8 dynamically quantized Whisper model, reusing the weights
+        cached on disk by a previous startup when available.
+        
+        Only the quantized state_dict and the model dimensions are cached, and
+        they are read with weights_only=True: no pickled code runs at load. A
+        cache hit builds an untrained skeleton from the dimensions, quantizes
+        it and loads the cached weights into it, so the fp32 checkpoint is not
+        read. The file name carries the whisper and torch versions, since both
+        shape the module tree and the packed weight format.
+        """
+        torch_version = torch.__version__.split("+")[0]
+        cache_path = QUANTIZED_MODEL_DIR / (
+            f"whisper_{model_size}_int8_whisper{whisper.__version__}_torch{torch_version}.pt"
+        )
+        
+        if cache_path.exists():
+            try:
+                logger.info(f"Loading cached int8 weights from {cache_path}")
+                cached = torch.load(cache_path, map_location="cpu", weights_only=True)
+                model = whisper.model.Whisper(whisper.model.ModelDimensions(**cached["dims"]))
+                model = _quantize_linear_layers(model)
+                model.load_state_dict(cached["model_state_dict"])
+                if model_size in whisper._ALIGNMENT_HEADS:
+                    model.set_alignment_heads(whisper._ALIGNMENT_HEADS[model_size])
+                return model
+            except Exception as e:
+                logger.warning(f"Cached int8 weights unreadable, re-quantizing: {e}")
+        
+        model = _quantize_linear_layers(whisper.load_model(model_size, device="cpu"))
+        
+        try:
+            QUANTIZED_MODEL_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(".tmp")
+            torch.save({"dims": vars(model.dims), "model_state_dict": model.state_dict()}, tmp_path)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"Could not cache int8 weights to disk: {e}")
+        
+        return model
+    
+    @contextmanager
+    def use_model(self, config: TranscriptionConfig) -> Iterator[Any]:
+        """Yield the model for config, protected from eviction until the block exits"""
+        cache_key = self._cache_key(config)
+        with self._global_lock:
+            self._in_use[cache_key] = self._in_use.get(cache_key, 0) + 1
+        try:
+            yield self.get_model(config)
+        finally:
+            with self._global_lock:
+                remaining = self._in_use.get(cache_key, 0) - 1
+                if remaining > 0:
+                    self._in_use[cache_key] = remaining
+                else:
+                    self._in_use.pop(cache_key, None)
     
     def get_model(self, config: TranscriptionConfig) -> Any:
         """Get or create a model instance with proper caching"""
-        cache_key = f"{config.model_size}_{self._device}"
+        cache_key = self._cache_key(config)
         
         with self._global_lock:
             # Create device lock if needed
-            if cache_key not in self._model_locks:
-                self._model_locks[cache_key] = threading.Lock()
+            model_lock = self._model_locks.setdefault(cache_key, threading.Lock())
         
         # Use model-specific lock for thread safety
-        with self._model_locks[cache_key]:
+        with model_lock:
             if cache_key in self._models:
                 self._access_times[cache_key] = time.time()
                 return self._models[cache_key]
             
-            # Cleanup old models if cache is full
+            # Make room: count limit and memory budgets
             with self._global_lock:
-                self._cleanup_old_models()
+                self._cleanup_old_models(estimate_model_mb(config, self._device))
             
             # Load new model
             logger.info(f"Loading Whisper model '{config.model_size}' on {self._device}")
@@ -114,12 +649,23 @@ class ModelManager:
                     # Use default GPU (0) but make it configurable
                     torch.cuda.set_device(int(os.environ.get('CUDA_DEVICE', '0')))
                 
-                model = whisper.load_model(config.model_size, device=self._device)
+                load_start = time.time()
+                if self._use_int8(config):
+                    model = self._load_quantized_model(config.model_size)
+                else:
+                    model = whisper.load_model(config.model_size, device=self._device)
                 model.eval()  # Set to evaluation mode
                 
                 # Cache the model
                 self._models[cache_key] = model
                 self._access_times[cache_key] = time.time()
+                self._model_info[cache_key] = {
+                    "model_size": config.model_size,
+                    "device": self._device,
+                    "precision": precision_label(config, self._device),
+                    "footprint_mb": model_footprint_mb(model),
+                    "load_seconds": round(time.time() - load_start, 2)
+                }
                 
                 logger.info(f"Model '{config.model_size}' loaded successfully on {self._device}")
                 return model
@@ -135,6 +681,41 @@ class ModelManager:
                 
                 raise RuntimeError(f"Model loading failed: {e}") from e
     
+    def is_loaded(self, config: TranscriptionConfig) -> bool:
+        """Check whether the model for this configuration is resident in the cache"""
+        return self._cache_key(config) in self._models
+    
+    def loaded_models(self) -> List[str]:
+        """Return the cache keys of all resident models"""
+        with self._global_lock:
+            return list(self._models.keys())
+    
+    def get_model_info(self) -> Dict[str, Dict[str, Any]]:
+        """Return footprint and load details for every resident model"""
+        with self._global_lock:
+            return {key: dict(info) for key, info in self._model_info.items()}
+    
+    def get_memory_status(self) -> Dict[str, Any]:
+        """Current memory readings against the budgets, plus recent evictions"""
+        rss_mb = process_rss_mb()
+        total_mb, available_mb = system_memory_mb()
+        reserved_mb, cuda_total_mb = cuda_memory_mb()
+        with self._global_lock:
+            history = list(self._eviction_history)
+        return {
+            "device": self._device,
+            "max_models": self._max_models,
+            "rss_mb": round(rss_mb, 1) if rss_mb is not None else None,
+            "rss_budget_mb": round(self._rss_budget_mb, 1) if self._rss_budget_mb else None,
+            "system_total_mb": round(total_mb, 1) if total_mb is not None else None,
+            "system_available_mb": round(available_mb, 1) if available_mb is not None else None,
+            "min_available_mb": STT_MIN_AVAILABLE_MB,
+            "cuda_reserved_mb": round(reserved_mb, 1),
+            "cuda_total_mb": round(cuda_total_mb, 1) if cuda_total_mb else None,
+            "cuda_budget_mb": round(self._cuda_budget_mb, 1) if self._cuda_budget_mb else None,
+            "evictions": history
+        }
+    
     def cleanup(self) -> None:
         """Cleanup all cached models"""
         with self._global_lock:
@@ -143,6 +724,7 @@ class ModelManager:
             self._models.clear()
             self._model_locks.clear()
             self._access_times.clear()
+            self._model_info.clear()
             
             if torch.cuda.is_available():
                 torch.cuda.empty_cache()
@@ -151,6 +733,105 @@ class ModelManager:
 # Global model manager instance
 _model_manager = ModelManager()
 
+# Global transcript cache instance
+_transcript_cache = DiskLRUCache("transcripts", TRANSCRIPT_CACHE_DIR, TRANSCRIPT_CACHE_MAX_MB * 1024 * 1024)
+
+def preload_model(config: Optional[TranscriptionConfig] = None) -> None:
+    """
+    Load the Whisper model ahead of the first task so it does not pay the load cost.
+    
+    Args:
+        config: Transcription configuration (defaults to the standard config)
+    """
+    config = config or get_default_config()
+    start_time = time.time()
+    _model_manager.get_model(config)
+    logger.info(f"Preloaded Whisper model '{config.model_size}' in {time.time() - start_time:.2f}s")
+
+def is_model_loaded(config: Optional[TranscriptionConfig] = None) -> bool:
+    """Check whether the Whisper model for the given config is already loaded"""
+    return _model_manager.is_loaded(config or get_default_config())
+
+def get_loaded_models() -> List[str]:
+    """List the Whisper models currently resident in the model cache"""
+    return _model_manager.loaded_models()
+
+def fingerprint_audio(file_path: Path) -> str:
+    """Return the SHA-256 digest of the audio file contents"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def transcript_cache_key(audio_hash: str, config: TranscriptionConfig, decode_mode: str = "full") -> str:
+    """
+    Build the cache key from the audio hash and every setting that changes the transcript.
+    
+    decode_mode is "full" (whole-file transcribe), "streamed" (~60 s chunks) or
+    "batched" (independent 30 s windows); each cuts and conditions the audio
+    differently, so their transcripts are cached separately.
+    """
+    key_fields = {
+        "audio": audio_hash,
+        "decode_mode": decode_mode,
+        "model_size": config.model_size,
+        "language": config.language,
+        "temperature": config.temperature,
+        "beam_size": config.beam_size,
+        "best_of": config.best_of,
+        "compression_ratio_threshold": config.compression_ratio_threshold,
+        "no_speech_threshold": config.no_speech_threshold,
+        "logprob_threshold": config.logprob_threshold,
+        "max_tokens_per_second": config.max_tokens_per_second,
+        "condition_on_previous_text": config.condition_on_previous_text
+    }
+    if config.adaptive_beam_size > 1:
+        key_fields["adaptive_beam_size"] = config.adaptive_beam_size
+        key_fields["redecode_logprob_threshold"] = config.redecode_logprob_threshold
+    if config.quantize_int8:
+        key_fields["quantize_int8"] = True
+    return hashlib.sha256(json.dumps(key_fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+def get_model_report() -> Dict[str, Any]:
+    """
+    Report resident models with their memory footprint, memory readings against the
+    eviction budgets with the eviction history, measured real-time factor
+    (processing seconds per second of audio; lower is faster) per model and precision,
+    how often each decode guardrail fired out of the segments checked, and the
+    fraction of segments re-decoded with beam search in adaptive mode.
+    """
+    timings = metrics.snapshot(prefix="stt.rtf.")["timings"]
+    guardrails = metrics.snapshot(prefix="stt.guardrail.")["counters"]
+    return {
+        "models": _model_manager.get_model_info(),
+        "memory": _model_manager.get_memory_status(),
+        "real_time_factor": {name[len("stt.rtf."):]: summary for name, summary in timings.items()},
+        "guardrails": {name[len("stt.guardrail."):]: int(count) for name, count in guardrails.items()},
+        "segments_checked": int(metrics.get_counter("stt.segments_checked")),
+        "adaptive_beam": {
+            "segments_total": int(metrics.get_counter("stt.adaptive.segments_total")),
+            "segments_redecoded": int(metrics.get_counter("stt.adaptive.segments_redecoded")),
+            "segments_improved": int(metrics.get_counter("stt.adaptive.segments_improved")),
+            "redecoded_fraction": metrics.ratio("stt.adaptive.segments_redecoded", "stt.adaptive.segments_total")
+        }
+    }
+
+def _record_real_time_factor(config: TranscriptionConfig, processing_seconds: float, audio_seconds: float) -> None:
+    """Record processing time relative to audio length for this model/precision"""
+    if audio_seconds <= 0:
+        return
+    label = f"{config.model_size}_{precision_label(config, _model_manager._device)}"
+    metrics.observe(f"stt.rtf.{label}", processing_seconds / audio_seconds)
+
+def get_transcript_cache_stats() -> Dict[str, Any]:
+    """Return transcript cache size and hit-rate statistics"""
+    return _transcript_cache.stats()
+
+def clear_transcript_cache() -> int:
+    """Remove all cached transcripts. Returns the number of entries removed."""
+    return _transcript_cache.clear()
+
 def validate_audio_file(file_path: Path) -> None:
     """Validate audio file before processing"""
     if not file_path.exists():
@@ -195,6 +876,69 @@ def format_transcription(segments: List[Dict[str, Any]]) -> str:
     
     return "\n\n".join(formatted_parts)
 
+def segments_path_for(transcript_path: Path) -> Path:
+    """Return the structured segments sidecar path for a transcript file"""
+    transcript_path = Path(transcript_path)
+    if transcript_path.name.endswith(SEGMENTS_SUFFIX):
+        return transcript_path
+    return transcript_path.with_suffix(SEGMENTS_SUFFIX)
+
+def compact_segments(segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Reduce Whisper segments to the fields downstream consumers use.
+    
+    Token ids, seek offsets and decoding temperature are dropped; timings and
+    confidence values are kept (rounded), plus word timings when present.
+    """
+    compact = []
+    for segment in segments:
+        text = segment.get("text", "").strip()
+        if not text:
+            continue
+        entry = {
+            "start": round(float(segment.get("start", 0)), 2),
+            "end": round(float(segment.get("end", 0)), 2),
+            "text": text
+        }
+        for key in ("avg_logprob", "no_speech_prob", "compression_ratio"):
+            if segment.get(key) is not None:
+                entry[key] = round(float(segment[key]), 4)
+        if segment.get("redecoded"):
+            entry["redecoded"] = True
+        if segment.get("words"):
+            entry["words"] = [
+                {
+                    "word": word.get("word", ""),
+                    "start": round(float(word.get("start", 0)), 2),
+                    "end": round(float(word.get("end", 0)), 2),
+                    "probability": round(float(word.get("probability", 0)), 4)
+                }
+                for word in segment["words"]
+            ]
+        compact.append(entry)
+    return compact
+
+def load_segments(transcript_path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Load the structured segments written alongside a transcript.
+    
+    Args:
+        transcript_path: Path to the .txt transcript (or to the sidecar itself)
+    
+    Returns:
+        dict with "segments", "language", "audio_duration", "model" and file
+        metadata, or None if the transcript has no sidecar
+    """
+    sidecar = segments_path_for(transcript_path)
+    if not sidecar.exists():
+        return None
+    try:
+        with open(sidecar, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        logger.warning(f"Could not read segments sidecar {sidecar}: {e}")
+        return None
+
 @contextmanager
 def transcription_context():
     """Context manager for transcription operations with proper cleanup"""
@@ -204,11 +948,97 @@ def transcription_context():
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
 
+def _prepare_output_file(
+    file_path: Path,
+    output_dir: Path,
+    roll_number: Optional[str],
+    config: TranscriptionConfig
+) -> Tuple[Path, Path]:
+    """Validate the input file and resolve (creating directories) the transcript output path"""
+    # Validate inputs
+    file_path = Path(file_path) if isinstance(file_path, str) else file_path
+    validate_audio_file(file_path)
+    
+    # Create output directory
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Determine output directory (with roll number if provided)
+    if roll_number:
+        user_output_dir = output_dir / str(roll_number)
+        user_output_dir.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Using user directory for roll {roll_number}: {user_output_dir}")
+    else:
+        user_output_dir = output_dir
+    
+    # Log file validation warning if needed
+    if "videos" not in str(file_path).lower() and "audio" not in str(file_path).lower():
+        logger.warning(f"File not in expected 'videos' or 'audio' directory: {file_path}")
+    
+    return file_path, user_output_dir / f"{file_path.stem}_transcription_{config.model_size}.txt"
+
+def _lookup_cached_transcript(
+    file_path: Path,
+    output_file: Path,
+    config: TranscriptionConfig,
+    decode_mode: str = "full"
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Check the transcript cache and, on a hit, write the cached transcript to output_file.
+    
+    Returns:
+        tuple: (cache_key or None if caching is off, cached transcript text or None on a miss)
+    """
+    if not (TRANSCRIPT_CACHE_ENABLED and config.use_cache):
+        return None, None
+    
+    start_time = time.time()
+    cache_key = transcript_cache_key(fingerprint_audio(file_path), config, decode_mode)
+    cached = _transcript_cache.get(cache_key)
+    if cached is None:
+        return cache_key, None
+    
+    _write_transcription_file(
+        output_file, cached["formatted_text"], file_path, config,
+        time.time() - start_time, cached.get("segment_count", 0), cache_hit=True
+    )
+    if cached.get("segments") is not None:
+        _write_segments_file(
+            output_file, cached["segments"], file_path, config,
+            cached.get("audio_duration"), cached.get("language"), decode_mode
+        )
+    metrics.increment("cache.transcripts.saved_seconds", cached.get("transcribe_seconds", 0))
+    logger.info(f"Transcript cache hit for {file_path.name}: {output_file}")
+    return cache_key, cached["formatted_text"]
+
+def _store_cached_transcript(
+    cache_key: Optional[str],
+    formatted_text: str,
+    segments: List[Dict[str, Any]],
+    config: TranscriptionConfig,
+    duration: float,
+    audio_duration: Optional[float] = None,
+    language: Optional[str] = None
+) -> None:
+    """Save a freshly decoded transcript and its compact segments in the cache"""
+    if cache_key is None:
+        return
+    _transcript_cache.put(cache_key, {
+        "formatted_text": formatted_text,
+        "segment_count": len(segments),
+        "segments": segments,
+        "audio_duration": audio_duration,
+        "language": language,
+        "model_size": config.model_size,
+        "transcribe_seconds": round(duration, 3)
+    })
+
 def transcribe_file(
     file_path: Path, 
     output_dir: Path, 
     roll_number: Optional[str] = None,
-    config: Optional[TranscriptionConfig] = None
+    config: Optional[TranscriptionConfig] = None,
+    on_segment: Optional[Callable[[Dict[str, Any]], None]] = None
 ) -> Tuple[str, Path]:
     """
     Transcribe audio/video file using Whisper with improved error handling and performance.
@@ -218,6 +1048,8 @@ def transcribe_file(
         output_dir: Directory to save transcription
         roll_number: Optional roll number for user-specific subdirectory
         config: Transcription configuration
+        on_segment: Optional callback receiving each segment as soon as it is decoded.
+                    Switches to chunked decoding (see stream_transcription).
     
     Returns:
         tuple: (transcription_text, output_file_path)
@@ -228,70 +1060,61 @@ def transcribe_file(
         RuntimeError: If transcription fails
     """
     if config is None:
-        config = TranscriptionConfig()
-    
-    # Validate inputs
-    file_path = Path(file_path) if isinstance(file_path, str) else file_path
-    validate_audio_file(file_path)
-    
-    # Create output directory
-    output_dir.mkdir(parents=True, exist_ok=True)
+        config = get_default_config()
     
-    # Determine output directory (with roll number if provided)
-    if roll_number:
-        user_output_dir = output_dir / str(roll_number)
-        user_output_dir.mkdir(parents=True, exist_ok=True)
-        logger.info(f"Using user directory for roll {roll_number}: {user_output_dir}")
-    else:
-        user_output_dir = output_dir
+    file_path, output_file = _prepare_output_file(file_path, output_dir, roll_number, config)
     
-    # Log file validation warning if needed
-    if "videos" not in str(file_path).lower():
-        logger.warning(f"File not in expected 'videos' directory: {file_path}")
+    # Serve repeated audio straight from the transcript cache
+    decode_mode = "streamed" if on_segment is not None else "full"
+    cache_key, cached_text = _lookup_cached_transcript(file_path, output_file, config, decode_mode)
+    if cached_text is not None:
+        if on_segment is not None:
+            for segment in (load_segments(output_file) or {}).get("segments", []):
+                _notify_segment(on_segment, segment)
+        return cached_text, output_file
     
-    # Get model instance
-    model = _model_manager.get_model(config)
+    _apply_thread_setting(config)
     
-    with transcription_context():
+    # The model stays protected from eviction until the transcript is written
+    with _model_manager.use_model(config) as model, transcription_context():
         try:
             logger.info(f"Starting transcription: {file_path.name}")
             start_time = time.time()
             
             # Perform transcription with memory-efficient settings
-            with torch.no_grad():
-                result = model.transcribe(
-                    str(file_path),
-                    verbose=config.verbose,
-                    language=config.language,
-                    task="transcribe",
-                    temperature=config.temperature,
-                    beam_size=config.beam_size,
-                    best_of=config.best_of,
-                    fp16=torch.cuda.is_available(),  # Use FP16 on GPU for better performance
-                )
+            fp16 = _use_fp16(config, model)
+            audio = whisper.load_audio(str(file_path))  # Decoded once; reused for beam re-decoding
+            if on_segment is None:
+                with torch.no_grad():
+                    result = model.transcribe(audio, **_transcribe_options(config, fp16))
+                language = result.get("language", config.language)
+                segments = apply_guardrails(result.get("segments", []), config)
+                segments = redecode_low_confidence(model, audio, segments, config, fp16)
+            else:
+                # Hand each segment to the caller as soon as its chunk is decoded
+                language = config.language
+                segments = []
+                for segment in _stream_segments(model, audio, config, fp16):
+                    segments.append(segment)
+                    _notify_segment(on_segment, segment)
             
             # Process and format results
-            segments = result.get("segments", [])
             if not segments:
                 logger.warning("No speech detected in audio file")
                 formatted_text = "[No speech detected]"
             else:
                 formatted_text = format_transcription(segments)
             
-            # Save transcription
-            output_file = user_output_dir / f"{file_path.stem}_transcription_{config.model_size}.txt"
+            # Save transcription and the structured segments sidecar
+            duration = time.time() - start_time
+            audio_duration = len(audio) / whisper.audio.SAMPLE_RATE
+            structured = compact_segments(segments)
+            _write_transcription_file(output_file, formatted_text, file_path, config, duration, len(segments))
+            _write_segments_file(output_file, structured, file_path, config, audio_duration, language, decode_mode)
+            metrics.observe("stt.transcribe_seconds", duration)
+            _record_real_time_factor(config, duration, audio_duration)
             
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(formatted_text)
-                
-                # Add metadata
-                duration = time.time() - start_time
-                metadata = f"\n\n--- Transcription Metadata ---\n"
-                metadata += f"File: {file_path.name}\n"
-                metadata += f"Model: {config.model_size}\n"
-                metadata += f"Duration: {duration:.2f}s\n"
-                metadata += f"Segments: {len(segments)}\n"
-                f.write(metadata)
+            _store_cached_transcript(cache_key, formatted_text, structured, config, duration, audio_duration, language)
             
             location_info = f" (roll: {roll_number})" if roll_number else " (general)"
             logger.info(f"Transcription completed{location_info} in {duration:.2f}s: {output_file}")
@@ -302,6 +1125,381 @@ def transcribe_file(
             logger.error(f"Transcription failed for {file_path}: {e}")
             raise RuntimeError(f"STT processing failed for {file_path.name}: {e}") from e
 
+def _transcribe_options(config: TranscriptionConfig, fp16: bool) -> Dict[str, Any]:
+    """Keyword arguments for model.transcribe() derived from the config"""
+    options = {
+        "verbose": config.verbose,
+        "language": config.language,
+        "task": "transcribe",
+        "temperature": config.temperature,
+        "beam_size": config.beam_size,
+        "best_of": config.best_of,
+        "fp16": fp16,  # Use FP16 on GPU for better performance
+        "compression_ratio_threshold": config.compression_ratio_threshold,
+        "logprob_threshold": config.logprob_threshold,
+        "no_speech_threshold": config.no_speech_threshold,
+        "condition_on_previous_text": config.condition_on_previous_text
+    }
+    budget = window_token_budget(config)
+    if budget:
+        options["sample_len"] = budget  # Bounds decoding time per window
+    return options
+
+def _quiet_boundary(audio: Any, target: int, search_seconds: float = STREAM_BOUNDARY_SEARCH_SECONDS) -> int:
+    """Return the sample index of the quietest 20 ms frame within search_seconds before target"""
+    sample_rate = whisper.audio.SAMPLE_RATE
+    start = max(0, target - int(search_seconds * sample_rate))
+    region = audio[start:target]
+    frame = sample_rate // 50
+    if len(region) < frame * 2:
+        return target
+    frames = region[:len(region) // frame * frame].reshape(-1, frame)
+    energy = (frames ** 2).mean(axis=1)
+    return start + int(energy.argmin()) * frame + frame // 2
+
+def _stream_segments(model: Any, audio: Any, config: TranscriptionConfig, fp16: bool) -> Iterator[Dict[str, Any]]:
+    """
+    Decode audio chunk by chunk and yield finished segments with absolute timings.
+    
+    Chunks are ~STREAM_CHUNK_SECONDS long and cut at the quietest point near the
+    boundary so words are not split; the tail of the previous chunk's text is
+    passed as the prompt to keep context across chunks.
+    """
+    sample_rate = whisper.audio.SAMPLE_RATE
+    chunk_samples = STREAM_CHUNK_SECONDS * sample_rate
+    options = _transcribe_options(config, fp16)
+    previous_text = ""
+    offset = 0
+    
+    while offset < len(audio):
+        end = len(audio)
+        if end - offset > chunk_samples + sample_rate * STREAM_BOUNDARY_SEARCH_SECONDS:
+            end = _quiet_boundary(audio, offset + chunk_samples)
+        chunk = audio[offset:end]
+        
+        prompt = previous_text[-STREAM_PROMPT_CHARS:] if config.condition_on_previous_text else None
+        with torch.no_grad():
+            result = model.transcribe(chunk, initial_prompt=prompt or None, **options)
+        
+        segments = apply_guardrails(result.get("segments", []), config)
+        segments = redecode_low_confidence(model, chunk, segments, config, fp16)
+        
+        offset_seconds = offset / sample_rate
+        for segment in segments:
+            segment["start"] = segment.get("start", 0) + offset_seconds
+            segment["end"] = segment.get("end", 0) + offset_seconds
+            for word in segment.get("words", []):
+                word["start"] = word.get("start", 0) + offset_seconds
+                word["end"] = word.get("end", 0) + offset_seconds
+            previous_text += segment.get("text", "")
+            yield segment
+        
+        metrics.increment("stt.stream.chunks")
+        offset = end
+
+def _notify_segment(on_segment: Callable[[Dict[str, Any]], None], segment: Dict[str, Any]) -> None:
+    """Deliver a segment to the caller's callback; a failing consumer must not abort STT"""
+    try:
+        on_segment(segment)
+    except Exception as e:
+        logger.warning(f"Segment callback failed: {e}")
+
+def stream_transcription(
+    file_path: Path,
+    config: Optional[TranscriptionConfig] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield transcription segments of a file as they are decoded.
+    
+    Unlike transcribe_file this writes nothing and bypasses the transcript cache;
+    use transcribe_file(on_segment=...) to stream and persist in one pass.
+    
+    Args:
+        file_path: Path to the audio/video file
+        config: Transcription configuration
+    
+    Yields:
+        Whisper segment dicts (start, end, text, avg_logprob, ...) in order
+    """
+    if config is None:
+        config = get_default_config()
+    file_path = Path(file_path)
+    validate_audio_file(file_path)
+    
+    _apply_thread_setting(config)
+    audio = whisper.load_audio(str(file_path))
+    with _model_manager.use_model(config) as model, transcription_context():
+        yield from _stream_segments(model, audio, config, _use_fp16(config, model))
+
+def transcribe_preview(file_path: Path, model_size: str = PREVIEW_MODEL_SIZE or "tiny") -> str:
+    """
+    Quick low-accuracy transcript for showing progress while the final pass waits.
+    
+    Greedy, no cache, no files written: the result is only published through
+    the task status and is replaced by the authoritative transcript.
+    
+    Args:
+        file_path: Path to the audio/video file
+        model_size: Small Whisper model to use (tiny/base)
+    
+    Returns:
+        Formatted preview transcript text
+    """
+    file_path = Path(file_path)
+    validate_audio_file(file_path)
+    
+    config = replace(
+        get_default_config(),
+        model_size=model_size,
+        beam_size=1,
+        best_of=1,
+        adaptive_beam_size=0,
+        use_cache=False
+    )
+    with _model_manager.use_model(config) as model, transcription_context():
+        start_time = time.time()
+        with torch.no_grad():
+            result = model.transcribe(
+                str(file_path),
+                verbose=False,
+                language=config.language,
+                task="transcribe",
+                temperature=0.0,
+                fp16=_use_fp16(config, model),
+                compression_ratio_threshold=config.compression_ratio_threshold,
+                logprob_threshold=config.logprob_threshold,
+                no_speech_threshold=config.no_speech_threshold,
+                condition_on_previous_text=False  # Cheaper and avoids loops on the small models
+            )
+    
+    segments = apply_guardrails(result.get("segments", []), config)
+    metrics.observe("stt.preview_seconds", time.time() - start_time)
+    return format_transcription(segments) if segments else "[No speech detected]"
+
+def _estimate_window_memory_mb(model: Any, fp16: bool) -> float:
+    """
+    Rough activation + KV-cache footprint of decoding one 30-second window.
+    Used to size batches against BATCH_MEMORY_BUDGET_MB.
+    """
+    dims = model.dims
+    encoder_elements = dims.n_audio_ctx * dims.n_audio_state * 4  # Residual stream + MLP expansion
+    attention_elements = dims.n_audio_head * dims.n_audio_ctx * dims.n_audio_ctx  # Peak self-attention scores
+    kv_elements = 2 * dims.n_text_layer * (dims.n_audio_ctx + dims.n_text_ctx) * dims.n_text_state
+    mel_elements = dims.n_mels * dims.n_audio_ctx * 2
+    bytes_per_element = 2 if fp16 else 4
+    return (encoder_elements + attention_elements + kv_elements + mel_elements) * bytes_per_element / (1024 * 1024)
+
+def transcribe_batch(
+    items: List[Tuple[Path, Path, Optional[str]]],
+    config: Optional[TranscriptionConfig] = None,
+    memory_budget_mb: int = BATCH_MEMORY_BUDGET_MB
+) -> List[Any]:
+    """
+    Transcribe several files together by batching their 30-second windows.
+    
+    Windows from all files are stacked into batches that fit the memory budget
+    and decoded in one forward pass per batch, then demultiplexed back into one
+    transcript per file. Each window is decoded independently (no conditioning
+    on the previous window), trading a little cross-window context for throughput.
+    Windows end at the quietest point in the last STREAM_BOUNDARY_SEARCH_SECONDS
+    before the 30-second limit so words are not cut in half. Each file's
+    recorded transcription time is its own audio decoding plus its share of the
+    windows in every batch, not the wall time of the whole batch.
+    
+    Args:
+        items: List of (file_path, output_dir, roll_number) tuples
+        config: Transcription configuration shared by all files
+        memory_budget_mb: Memory budget that bounds the number of windows per batch
+    
+    Returns:
+        list: One entry per item, either (transcription_text, output_file_path)
+              or the Exception raised for that file
+    """
+    if config is None:
+        config = get_default_config()
+    
+    results: List[Any] = [None] * len(items)
+    pending = []  # (item_index, file_path, output_file, cache_key)
+    
+    for index, (file_path, output_dir, roll_number) in enumerate(items):
+        try:
+            file_path, output_file = _prepare_output_file(file_path, output_dir, roll_number, config)
+            cache_key, cached_text = _lookup_cached_transcript(file_path, output_file, config, "batched")
+            if cached_text is not None:
+                results[index] = (cached_text, output_file)
+            else:
+                pending.append((index, file_path, output_file, cache_key))
+        except Exception as e:
+            results[index] = e
+    
+    if not pending:
+        return results
+    
+    # Hold the model for the whole batch so a concurrent load cannot evict it
+    with _model_manager.use_model(config) as model:
+        fp16 = _use_fp16(config, model)
+        _apply_thread_setting(config)
+        start_time = time.time()
+        
+        # Split every file into padded mel windows of at most 30 seconds, cut at silence
+        windows = []  # (item_index, start_seconds, end_seconds, mel)
+        audio_durations: Dict[int, float] = {}
+        file_seconds: Dict[int, float] = {}  # Processing time attributed to each file
+        audio_by_item: Dict[int, Any] = {}  # Kept only when low-confidence windows may be re-decoded
+        sample_rate = whisper.audio.SAMPLE_RATE
+        window_samples = WINDOW_SECONDS * sample_rate
+        for index, file_path, _, _ in pending:
+            file_start = time.time()
+            try:
+                audio = whisper.load_audio(str(file_path))
+                audio_durations[index] = len(audio) / sample_rate
+                if config.adaptive_beam_size > 1:
+                    audio_by_item[index] = audio
+                offset = 0
+                while True:
+                    end = min(len(audio), offset + window_samples)
+                    if end < len(audio):
+                        end = _quiet_boundary(audio, end)
+                    chunk = whisper.pad_or_trim(audio[offset:end])
+                    mel = whisper.log_mel_spectrogram(chunk, model.dims.n_mels)
+                    windows.append((index, offset / sample_rate, end / sample_rate, mel))
+                    if end >= len(audio):
+                        break
+                    offset = end
+            except Exception as e:
+                logger.error(f"Audio decoding failed for {file_path}: {e}")
+                results[index] = RuntimeError(f"STT processing failed for {file_path.name}: {e}")
+            file_seconds[index] = time.time() - file_start
+        
+        window_mb = _estimate_window_memory_mb(model, fp16)
+        max_windows = max(1, int(memory_budget_mb // window_mb))
+        options = whisper.DecodingOptions(
+            task="transcribe",
+            language=config.language,
+            temperature=config.temperature,
+            beam_size=config.beam_size if config.beam_size > 1 else None,
+            fp16=fp16,
+            sample_len=window_token_budget(config),
+            without_timestamps=True
+        )
+        
+        # Decode batches and collect segments per file
+        segments_by_item: Dict[int, List[Dict[str, Any]]] = {index: [] for index in audio_durations}
+        with transcription_context():
+            for batch_start in range(0, len(windows), max_windows):
+                batch = windows[batch_start:batch_start + max_windows]
+                batch_start_time = time.time()
+                mel_batch = torch.stack([mel for _, _, _, mel in batch]).to(model.device)
+                try:
+                    with torch.no_grad():
+                        decoded = whisper.decode(model, mel_batch, options)
+                except Exception as e:
+                    logger.error(f"Batched decoding failed: {e}")
+                    for index, _, _, _ in batch:
+                        results[index] = RuntimeError(f"STT batch decoding failed: {e}")
+                    continue
+                finally:
+                    # Each file is charged for its share of the batch's windows
+                    window_seconds = (time.time() - batch_start_time) / len(batch)
+                    for index, _, _, _ in batch:
+                        file_seconds[index] += window_seconds
+                
+                for (index, offset, end, _), result in zip(batch, decoded):
+                    segments_by_item[index].append({
+                        "seek": offset,
+                        "start": offset,
+                        "end": end,
+                        "text": result.text,
+                        "tokens": result.tokens,
+                        "avg_logprob": result.avg_logprob,
+                        "no_speech_prob": result.no_speech_prob,
+                        "compression_ratio": result.compression_ratio
+                    })
+                metrics.observe("stt.batch.windows", len(batch))
+        
+        # Demultiplex into per-file transcripts
+        for index, file_path, output_file, cache_key in pending:
+            if results[index] is not None:
+                continue
+            file_start = time.time()
+            segments = sorted(segments_by_item.get(index, []), key=lambda seg: seg["start"])
+            segments = apply_guardrails(segments, config)
+            if index in audio_by_item:
+                segments = redecode_low_confidence(model, audio_by_item.pop(index), segments, config, fp16)
+            formatted_text = format_transcription(segments) if segments else "[No speech detected]"
+            file_seconds[index] += time.time() - file_start
+            
+            structured = compact_segments(segments)
+            _write_transcription_file(output_file, formatted_text, file_path, config, file_seconds[index], len(segments))
+            _write_segments_file(
+                output_file, structured, file_path, config, audio_durations[index], config.language, "batched"
+            )
+            _store_cached_transcript(
+                cache_key, formatted_text, structured, config, file_seconds[index], audio_durations[index], config.language
+            )
+            metrics.observe("stt.transcribe_seconds", file_seconds[index])
+            results[index] = (formatted_text, output_file)
+        
+        duration = time.time() - start_time
+        _record_real_time_factor(config, duration, sum(audio_durations.values()))
+        metrics.increment("stt.batch.files", len(pending))
+        metrics.observe("stt.batch.seconds", duration)
+        logger.info(f"Batched transcription of {len(pending)} files ({len(windows)} windows, "
+                    f"{max_windows} per batch) completed in {duration:.2f}s")
+    return results
+
+def _write_transcription_file(
+    output_file: Path,
+    formatted_text: str,
+    file_path: Path,
+    config: TranscriptionConfig,
+    duration: float,
+    segment_count: int,
+    cache_hit: bool = False
+) -> None:
+    """Write the formatted transcript followed by the metadata footer"""
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write(formatted_text)
+        
+        # Add metadata
+        metadata = f"\n\n--- Transcription Metadata ---\n"
+        metadata += f"File: {file_path.name}\n"
+        metadata += f"Model: {config.model_size}\n"
+        metadata += f"Duration: {duration:.2f}s\n"
+        metadata += f"Segments: {segment_count}\n"
+        if cache_hit:
+            metadata += "Cache: hit\n"
+        f.write(metadata)
+
+def _write_segments_file(
+    output_file: Path,
+    segments: List[Dict[str, Any]],
+    file_path: Path,
+    config: TranscriptionConfig,
+    audio_duration: Optional[float],
+    language: Optional[str],
+    decode_mode: str = "full"
+) -> Path:
+    """
+    Write the compact segments sidecar next to the transcript.
+
+    decode_mode is recorded so readers can tell real Whisper segment timings
+    ("full", "streamed") from batched decodes, which hold one segment per window.
+    """
+    sidecar = segments_path_for(output_file)
+    payload = {
+        "version": SEGMENTS_FORMAT_VERSION,
+        "file": file_path.name,
+        "model": config.model_size,
+        "language": language,
+        "audio_duration": round(audio_duration, 2) if audio_duration is not None else None,
+        "decode_mode": decode_mode,
+        "segments": segments
+    }
+    with open(sidecar, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+    return sidecar
+
 def cleanup_resources() -> None:
     """Cleanup all cached resources - call this on application shutdown"""
     global _model_manager
@@ -0,0 +1,426 @@
+"""
+Out-of-Process STT Service for ConvAi-IntroEval
+
+Runs Whisper in a dedicated process so its CPU-bound work no longer competes
+with the FastAPI event loop. The web process (TwoPhaseQueueManager) talks to
+it over a local multiprocessing.connection channel authenticated with a
+shared key. Requests carry the upload's path and the service decodes it
+itself, so ffmpeg decoding and the audio buffers stay out of the web
+process.
+
+Start the service:
+    STT_SERVICE_AUTHKEY=<secret> python stt_service.py --address 127.0.0.1:8765
+
+Point the web app at it (unset = transcribe in-process as before):
+    STT_SERVICE_ADDRESS=127.0.0.1:8765 STT_SERVICE_AUTHKEY=<secret> python main.py
+
+Pre-fork mode (CPU only): the parent loads Whisper once, then forks workers
+that share the read-only weights copy-on-write and accept on the same socket:
+    STT_SERVICE_AUTHKEY=<secret> python stt_service.py --workers 4
+
+Protocol: each request is a dict {"op": ..., ...}; the service answers with
+{"ok": True, ...} or {"ok": False, "error": ...}. A streaming transcription
+sends {"event": "segment", "segment": {...}} messages before the final reply.
+"""
+
+import argparse
+import gc
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from dataclasses import asdict
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import torch
+
+import stt
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)  # Only log warnings and errors to reduce overhead
+
+# Service location: "host:port" for TCP or a filesystem path for a Unix socket ("" = in-process STT)
+STT_SERVICE_ADDRESS = os.environ.get("STT_SERVICE_ADDRESS", "")
+STT_SERVICE_AUTHKEY = os.environ.get("STT_SERVICE_AUTHKEY", "")
+STT_SERVICE_TIMEOUT = float(os.environ.get("STT_SERVICE_TIMEOUT", "900"))  # Seconds per request
+DEFAULT_SERVICE_ADDRESS = "127.0.0.1:8765"
+STT_SERVICE_WORKERS = int(os.environ.get("STT_SERVICE_WORKERS", "1"))  # >1 = pre-fork workers (CPU only)
+
+
+def parse_address(address: str) -> Union[Tuple[str, int], str]:
+    """Turn "host:port" into a TCP address tuple; anything else is a Unix socket path"""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return (host or "127.0.0.1", int(port))
+    return address
+
+
+def _authkey(authkey: Optional[str] = None) -> bytes:
+    """Return the shared key; the channel is never opened unauthenticated"""
+    key = authkey if authkey is not None else STT_SERVICE_AUTHKEY
+    if not key:
+        raise ValueError("STT_SERVICE_AUTHKEY must be set to use the STT service")
+    return key.encode("utf-8")
+
+
+def read_memory_rollup(pid: int) -> Optional[Dict[str, float]]:
+    """
+    Summarize a process's memory from /proc/<pid>/smaps_rollup (Linux).
+
+    Shared pages (the copy-on-write model weights) show up in shared_mb and are
+    only split proportionally in pss_mb; private_mb is what the process alone costs.
+
+    Returns:
+        dict of MB values, or None if the process is gone or /proc is unavailable
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    values_kb = {}
+    for line in lines:
+        key, _, rest = line.partition(":")
+        parts = rest.split()
+        if len(parts) == 2 and parts[1] == "kB":
+            values_kb[key.strip()] = int(parts[0])
+
+    def mb(*keys: str) -> float:
+        return round(sum(values_kb.get(k, 0) for k in keys) / 1024, 1)
+
+    return {
+        "rss_mb": mb("Rss"),
+        "pss_mb": mb("Pss"),
+        "shared_mb": mb("Shared_Clean", "Shared_Dirty"),
+        "private_mb": mb("Private_Clean", "Private_Dirty"),
+        "swap_mb": mb("Swap")
+    }
+
+
+def _config_from_dict(values: Optional[Dict[str, Any]]) -> Optional[stt.TranscriptionConfig]:
+    return stt.TranscriptionConfig(**values) if values else None
+
+
+class STTService:
+    """Serves transcription requests from the web process over a local connection"""
+
+    def __init__(self, address: str = DEFAULT_SERVICE_ADDRESS, authkey: Optional[str] = None):
+        self.address = parse_address(address)
+        self.authkey = _authkey(authkey)
+        # Whisper models are not safe to run concurrently; connections are served in
+        # parallel (ping/report stay responsive) but decoding is serialized
+        self._decode_lock = threading.Lock()
+        self._preview_lock = threading.Lock()  # Preview uses its own small model; never waits on the final pass
+        self._running = False
+        self._parent_pid = os.getpid()
+        self._worker_pids = None  # Shared pid table in pre-fork mode
+
+    def serve_forever(self) -> None:
+        """Accept connections until interrupted"""
+        with Listener(self.address, authkey=self.authkey) as listener:
+            print(f"🎙️ STT service listening on {self.address}")
+            self._serve(listener)
+
+    def _serve(self, listener: Listener) -> None:
+        """Accept loop shared by the single-process and pre-fork modes"""
+        self._running = True
+        while self._running:
+            try:
+                conn = listener.accept()
+            except Exception as e:  # Failed handshake (wrong key) or interrupted accept
+                logger.warning(f"Rejected STT service connection: {e}")
+                continue
+            threading.Thread(target=self._handle_connection, args=(conn,), daemon=True).start()
+
+    def serve_prefork(self, workers: int) -> None:
+        """
+        Load Whisper once in this process, then fork workers that share its weights.
+
+        The weights are never written after loading, so the forked workers keep
+        sharing those pages copy-on-write instead of each holding a private copy.
+        All workers accept on the one inherited listening socket; the parent
+        only supervises and re-forks workers that exit.
+        """
+        if torch.cuda.is_available():
+            # CUDA contexts do not survive fork(); GPU boxes run a single process
+            print("⚠️ Pre-fork workers are CPU only; serving from a single process on CUDA")
+            stt.preload_model()
+            self.serve_forever()
+            return
+
+        stt.preload_model()
+        gc.collect()
+        gc.freeze()  # Keep the GC from touching (and so copying) objects inherited by workers
+
+        threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+        self._worker_pids = multiprocessing.Array("i", workers, lock=False)  # Shared memory, visible to workers
+
+        with Listener(self.address, authkey=self.authkey) as listener:
+            print(f"🎙️ STT service listening on {self.address} with {workers} pre-forked workers "
+                  f"({threads_per_worker} torch threads each)")
+            for slot in range(workers):
+                self._fork_worker(slot, listener, threads_per_worker)
+
+            try:
+                while True:
+                    pid, status = os.wait()
+                    if pid in self._worker_pids:
+                        slot = list(self._worker_pids).index(pid)
+                        logger.warning(f"STT worker {pid} exited with status {status}; restarting")
+                        self._fork_worker(slot, listener, threads_per_worker)
+            except KeyboardInterrupt:
+                for pid in self._worker_pids:
+                    if pid:
+                        try:
+                            os.kill(pid, signal.SIGTERM)
+                        except ProcessLookupError:
+                            pass
+                raise
+
+    def _fork_worker(self, slot: int, listener: Listener, num_threads: int) -> None:
+        """Fork one worker that serves connections from the shared listener"""
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)  # The parent handles Ctrl+C
+            exit_code = 0
+            try:
+                torch.set_num_threads(num_threads)
+                self._serve(listener)
+            except Exception as e:
+                logger.error(f"STT worker {os.getpid()} crashed: {e}")
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        self._worker_pids[slot] = pid
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Resident vs shared memory of the service parent and every worker"""
+        report = {"parent": {"pid": self._parent_pid, **(read_memory_rollup(self._parent_pid) or {})}}
+        if self._worker_pids is not None:
+            report["workers"] = [
+                {"pid": pid, **(read_memory_rollup(pid) or {})} for pid in self._worker_pids if pid
+            ]
+        return report
+
+    def _handle_connection(self, conn) -> None:
+        """Answer requests on one connection until the client closes it"""
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    response = self._dispatch(request, conn)
+                    response["ok"] = True
+                except Exception as e:
+                    logger.error(f"STT service request {request.get('op')} failed: {e}")
+                    response = {"ok": False, "error": str(e)}
+                try:
+                    conn.send(response)
+                except (EOFError, OSError):
+                    return
+
+    def _dispatch(self, request: Dict[str, Any], conn) -> Dict[str, Any]:
+        op = request.get("op")
+        config = _config_from_dict(request.get("config"))
+
+        if op == "ping":
+            return {"pid": os.getpid(), "loaded_models": stt.get_loaded_models()}
+
+        if op == "report":
+            report = stt.get_model_report()
+            report["service_memory"] = self.memory_report()
+            return {"report": report, "cache": stt.get_transcript_cache_stats()}
+
+        if op == "is_loaded":
+            return {"loaded": stt.is_model_loaded(config), "loaded_models": stt.get_loaded_models()}
+
+        if op == "preload":
+            stt.preload_model(config)
+            return {"loaded_models": stt.get_loaded_models()}
+
+        if op == "transcribe":
+            on_segment = None
+            if request.get("stream"):
+                def on_segment(segment: Dict[str, Any]) -> None:
+                    for compact in stt.compact_segments([segment]):
+                        conn.send({"event": "segment", "segment": compact})
+            with self._decode_lock:
+                text, output_file = stt.transcribe_file(
+                    Path(request["file_path"]),
+                    Path(request["output_dir"]),
+                    request.get("roll_number"),
+                    config=config,
+                    on_segment=on_segment
+                )
+            return {"text": text, "output_file": str(output_file)}
+
+        if op == "transcribe_batch":
+            items = [(Path(f), Path(d), r) for f, d, r in request["items"]]
+            with self._decode_lock:
+                results = stt.transcribe_batch(items, config=config)
+            return {"results": [
+                {"error": str(r)} if isinstance(r, Exception) else {"text": r[0], "output_file": str(r[1])}
+                for r in results
+            ]}
+
+        if op == "preview":
+            with self._preview_lock:
+                return {"text": stt.transcribe_preview(Path(request["file_path"]), request["model_size"])}
+
+        raise ValueError(f"Unknown STT service operation: {op}")
+
+
+class STTServiceClient:
+    """Calls the STT service from the web process; mirrors the stt module functions"""
+
+    def __init__(self, address: str = STT_SERVICE_ADDRESS, authkey: Optional[str] = None,
+                 timeout: float = STT_SERVICE_TIMEOUT):
+        self.address = parse_address(address)
+        self.authkey = _authkey(authkey)
+        self.timeout = timeout
+
+    def _call(self, request: Dict[str, Any],
+              on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+              timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send one request and wait for its final reply, forwarding streamed events"""
+        timeout = self.timeout if timeout is None else timeout
+        start_time = time.time()
+        with Client(self.address, authkey=self.authkey) as conn:
+            conn.send(request)
+            while True:
+                remaining = timeout - (time.time() - start_time)
+                if remaining <= 0 or not conn.poll(remaining):
+                    raise TimeoutError(f"STT service did not answer {request['op']} within {timeout:.0f}s")
+                message = conn.recv()
+                if "event" in message:
+                    if on_event is not None:
+                        on_event(message)
+                    continue
+                break
+
+        metrics.observe(f"stt.service.{request['op']}_seconds", time.time() - start_time)
+        if not message.get("ok"):
+            raise RuntimeError(f"STT service error: {message.get('error')}")
+        return message
+
+    def ping(self, timeout: float = 2) -> bool:
+        """Return True if the service is reachable"""
+        try:
+            self._call({"op": "ping"}, timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    def preload_model(self, config: Optional[stt.TranscriptionConfig] = None) -> None:
+        self._call({"op": "preload", "config": asdict(config) if config else None})
+
+    def is_model_loaded(self, config: Optional[stt.TranscriptionConfig] = None) -> bool:
+        try:
+            return self._call({"op": "is_loaded", "config": asdict(config) if config else None}, timeout=5)["loaded"]
+        except Exception:
+            return False
+
+    def get_loaded_models(self) -> List[str]:
+        """Whisper models resident in the service process ([] if it is unreachable)"""
+        try:
+            return self._call({"op": "ping"}, timeout=5)["loaded_models"]
+        except Exception:
+            return []
+
+    def get_model_report(self) -> Dict[str, Any]:
+        return self._call({"op": "report"}, timeout=10)["report"]
+
+    def transcribe_file(
+        self,
+        file_path: Path,
+        output_dir: Path,
+        roll_number: Optional[str] = None,
+        config: Optional[stt.TranscriptionConfig] = None,
+        on_segment: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Tuple[str, Path]:
+        """
+        Transcribe a file in the service process.
+
+        Only the path is sent; the service validates and decodes the file itself.
+
+        Returns:
+            tuple: (transcription_text, output_file_path)
+        """
+        response = self._call(
+            {
+                "op": "transcribe",
+                "file_path": str(Path(file_path).resolve()),
+                "output_dir": str(Path(output_dir).resolve()),
+                "roll_number": roll_number,
+                "config": asdict(config) if config else None,
+                "stream": on_segment is not None
+            },
+            on_event=(lambda message: on_segment(message["segment"])) if on_segment else None
+        )
+        return response["text"], Path(response["output_file"])
+
+    def transcribe_batch(
+        self,
+        items: List[Tuple[Path, Path, Optional[str]]],
+        config: Optional[stt.TranscriptionConfig] = None
+    ) -> List[Any]:
+        """Batched transcription in the service; same return shape as stt.transcribe_batch"""
+        response = self._call({
+            "op": "transcribe_batch",
+            "items": [(str(Path(f).resolve()), str(Path(d).resolve()), r) for f, d, r in items],
+            "config": asdict(config) if config else None
+        })
+        return [
+            RuntimeError(r["error"]) if "error" in r else (r["text"], Path(r["output_file"]))
+            for r in response["results"]
+        ]
+
+    def transcribe_preview(self, file_path: Path, model_size: str) -> str:
+        return self._call({"op": "preview", "file_path": str(Path(file_path).resolve()),
+                           "model_size": model_size})["text"]
+
+
+def get_stt_service() -> Optional[STTServiceClient]:
+    """Return a client for the configured STT service, or None to transcribe in-process"""
+    if not STT_SERVICE_ADDRESS:
+        return None
+    return STTServiceClient()
+
+
+__all__ = ['STTService', 'STTServiceClient', 'get_stt_service', 'read_memory_rollup']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ConvAi-IntroEval out-of-process STT service")
+    parser.add_argument("--address", default=STT_SERVICE_ADDRESS or DEFAULT_SERVICE_ADDRESS,
+                        help="host:port or Unix socket path to listen on")
+    parser.add_argument("--no-preload", action="store_true", help="Load Whisper on first request instead of at startup")
+    parser.add_argument("--workers", type=int, default=STT_SERVICE_WORKERS,
+                        help="Pre-fork this many workers sharing one copy of the model (CPU only)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    service = STTService(args.address)
+    try:
+        if args.workers > 1:
+            service.serve_prefork(args.workers)
+        else:
+            if not args.no_preload:
+                print("⏳ Loading Whisper model...")
+                stt.preload_model()
+                print(f"✅ Whisper ready: {stt.get_loaded_models()}")
+            service.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 STT service stopped")
+
+
+if __name__ == "__main__":
+    main()
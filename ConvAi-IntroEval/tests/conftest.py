@@ -0,0 +1,43 @@
+"""
+Shared test setup
+
+Makes the top-level modules (stt, metrics, disk_cache, ...) importable and,
+when Whisper or torch is not installed, registers stand-in modules so code
+that imports them at load time (stt, stt_service, the queue manager) can
+still be tested without a GPU stack. Nothing in these tests decodes audio.
+"""
+
+import importlib.util
+import sys
+import types
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def _stub_module(name: str) -> types.ModuleType:
+    """Module whose public attributes are MagicMocks created on first access"""
+    module = types.ModuleType(name)
+
+    def __getattr__(attr):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        value = mock.MagicMock(name=f"{name}.{attr}")
+        setattr(module, attr, value)
+        return value
+
+    module.__getattr__ = __getattr__
+    return module
+
+
+if importlib.util.find_spec("torch") is None:
+    torch_stub = _stub_module("torch")
+    torch_stub.cuda.is_available.return_value = False
+    torch_stub.backends.mps.is_available.return_value = False
+    sys.modules["torch"] = torch_stub
+
+if importlib.util.find_spec("whisper") is None:
+    sys.modules["whisper"] = _stub_module("whisper")
@@ -0,0 +1,81 @@
+"""
+Tests for DiskLRUCache TTL expiry and LRU eviction
+"""
+
+import json
+import os
+import time
+
+from disk_cache import DiskLRUCache
+
+KEYS = ["aa01", "bb02", "cc03"]
+
+
+def set_age(cache, key, seconds):
+    """Backdate an entry's file time (its LRU recency)"""
+    past = time.time() - seconds
+    os.utime(cache._entry_path(key), (past, past))
+
+
+def test_round_trip_and_miss(tmp_path):
+    cache = DiskLRUCache("test_round_trip", tmp_path, max_bytes=10_000)
+    assert cache.get("aa01") is None
+    cache.put("aa01", {"text": "hello"})
+    assert cache.get("aa01") == {"text": "hello"}
+    assert cache.invalidate("aa01")
+    assert cache.get("aa01") is None
+
+
+def test_least_recently_used_entry_evicted(tmp_path):
+    """Over budget, the entry read longest ago goes first"""
+    value = {"text": "x" * 100}
+    entry_size = len(json.dumps(value).encode("utf-8"))
+    cache = DiskLRUCache("test_eviction", tmp_path, max_bytes=entry_size * 2)
+    for age, key in zip((30, 20), KEYS):
+        cache.put(key, value)
+        set_age(cache, key, age)
+
+    assert cache.get(KEYS[0]) == value  # Refreshes the older entry
+    cache.put(KEYS[2], value)
+
+    assert cache.get(KEYS[1]) is None
+    assert cache.get(KEYS[0]) == value
+    assert cache.get(KEYS[2]) == value
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = DiskLRUCache("test_ttl", tmp_path, max_bytes=10_000, ttl_seconds=60)
+    cache.put("aa01", {"text": "hello"})
+    assert cache.get("aa01") == {"text": "hello"}
+
+    path = cache._entry_path("aa01")
+    entry = json.loads(path.read_text(encoding="utf-8"))
+    entry["_stored_at"] -= 120
+    path.write_text(json.dumps(entry), encoding="utf-8")
+
+    assert cache.get("aa01") is None
+    assert not path.exists()
+    assert cache.stats()["expired"] == 1
+
+
+def test_legacy_entry_expires_despite_repeated_reads(tmp_path):
+    """An entry written without a TTL ages from its file time, not its last read"""
+    DiskLRUCache("test_legacy", tmp_path, max_bytes=10_000).put("aa01", {"text": "hello"})
+    cache = DiskLRUCache("test_legacy", tmp_path, max_bytes=10_000, ttl_seconds=60)
+    set_age(cache, "aa01", 50)
+
+    assert cache.get("aa01") == {"text": "hello"}  # Refreshes the file time
+    stored = json.loads(cache._entry_path("aa01").read_text(encoding="utf-8"))
+    assert time.time() - stored["_stored_at"] >= 50
+
+    stored["_stored_at"] -= 20  # Same entry, 20 s later
+    cache._entry_path("aa01").write_text(json.dumps(stored), encoding="utf-8")
+    assert cache.get("aa01") is None
+
+
+def test_oversized_entry_not_stored(tmp_path):
+    cache = DiskLRUCache("test_oversized", tmp_path, max_bytes=10)
+    cache.put("aa01", {"text": "far too long for the budget"})
+    assert cache.get("aa01") is None
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,53 @@
+"""
+Tests for PromptBuilder token budgets and transcript compaction
+"""
+
+from app.llm.prompt_builder import (
+    LLM_NUM_CTX, STAGE_COMPLETION_TOKENS, TRUNCATION_MARK, PromptBuilder, compact_transcript, count_tokens,
+    stage_prompt_budget
+)
+from metrics import metrics
+
+RUBRIC = "Rate the introduction on structure, clarity and confidence. " * 5
+TRANSCRIPT = "[00:00 - 00:05] " + "I am a final year computer science student who enjoys building things. " * 40
+CLOSING = "Answer with JSON only."
+
+
+def test_compact_transcript_strips_markers_and_footer():
+    text = "[00:00 - 00:04] Hello everyone.\n\n[00:04 - 00:09]  I study physics.\n\n--- Transcription Metadata ---\nModel: base"
+    assert compact_transcript(text) == "Hello everyone. I study physics."
+    assert compact_transcript("") == ""
+
+
+def test_prompt_within_budget_is_unchanged():
+    budget = count_tokens(RUBRIC) + count_tokens(compact_transcript(TRANSCRIPT)) + count_tokens(CLOSING) + 50
+    prompt = PromptBuilder("test_fits", budget).add("rubric", RUBRIC).add_transcript(TRANSCRIPT).add("closing", CLOSING).build()
+    assert prompt == RUBRIC + compact_transcript(TRANSCRIPT) + CLOSING
+    assert metrics.get_counter("llm.test_fits.prompt_trimmed") == 0
+
+
+def test_transcript_trimmed_to_budget_at_word_boundary():
+    """Only the trimmable transcript is cut; fixed sections stay intact"""
+    budget = count_tokens(RUBRIC) + count_tokens(CLOSING) + 60
+    prompt = PromptBuilder("test_trim", budget).add("rubric", RUBRIC).add_transcript(TRANSCRIPT).add("closing", CLOSING).build()
+
+    assert prompt.startswith(RUBRIC) and prompt.endswith(TRUNCATION_MARK + CLOSING)
+    transcript_part = prompt[len(RUBRIC):-len(TRUNCATION_MARK + CLOSING)]
+    assert compact_transcript(TRANSCRIPT).startswith(transcript_part + " ")
+    assert sum(count_tokens(part) for part in (RUBRIC, transcript_part + TRUNCATION_MARK, CLOSING)) <= budget
+    assert metrics.get_counter("llm.test_trim.prompt_trimmed") == 1
+
+
+def test_fixed_sections_over_budget_are_recorded():
+    """A prompt that cannot fit even without a transcript is flagged, not silently cut"""
+    prompt = PromptBuilder("test_over", count_tokens(RUBRIC) // 2).add("rubric", RUBRIC).add_transcript(TRANSCRIPT).build()
+    assert prompt.startswith(RUBRIC)
+    assert metrics.get_counter("llm.test_over.prompt_over_budget") == 1
+
+
+def test_stage_budget_reserves_completion_tokens(monkeypatch):
+    monkeypatch.delenv("LLM_PROMPT_BUDGET_INTRO", raising=False)
+    assert stage_prompt_budget("intro") == LLM_NUM_CTX - STAGE_COMPLETION_TOKENS["intro"]
+    monkeypatch.setenv("LLM_PROMPT_BUDGET_INTRO", "1234")
+    assert stage_prompt_budget("intro") == 1234
+    assert PromptBuilder("intro").budget == 1234
@@ -0,0 +1,61 @@
+"""
+Tests for TwoPhaseQueueManager rating concurrency
+
+Run from ConvAi-IntroEval:
+    python -m pytest tests
+"""
+
+import threading
+import time
+
+from app.llm import queue_manager
+from app.llm.queue_manager import ProcessingTask, TwoPhaseQueueManager
+
+RATING_SECONDS = 0.5
+
+
+def test_rating_calls_run_concurrently_across_workers(monkeypatch):
+    """Every evaluation worker gets rating_concurrency ratings in flight at once"""
+    monkeypatch.setenv("EVAL_WORKERS", "3")
+    monkeypatch.setenv("LLM_RATING_CONCURRENCY", "2")
+    monkeypatch.setattr(queue_manager, "DISABLE_LLM", False)
+
+    manager = TwoPhaseQueueManager()
+    expected = manager.evaluation_workers * manager.rating_concurrency
+    assert expected == 6
+
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def fake_rating(path, on_partial=None):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(RATING_SECONDS)
+        with lock:
+            in_flight -= 1
+        return {"status": "success", "data": {}}
+
+    monkeypatch.setattr(queue_manager, "evaluate_profile_rating", fake_rating)
+    monkeypatch.setattr(queue_manager, "evaluate_intro_rating", fake_rating)
+    monkeypatch.setattr(manager, "_save_ratings", lambda task, profile, intro: None)
+
+    tasks = [
+        ProcessingTask(user_id=f"user{i}", roll_number=f"roll{i}", file_path=f"video{i}.mp4",
+                       transcript_path=f"transcript{i}.txt", form_path=f"form{i}.json")
+        for i in range(manager.evaluation_workers)
+    ]
+    workers = [threading.Thread(target=manager._process_rating_generation, args=(task,)) for task in tasks]
+    start = time.time()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=10)
+    elapsed = time.time() - start
+
+    assert all(task.status == queue_manager.TaskStatus.COMPLETE for task in tasks)
+    assert peak == expected
+    assert elapsed < RATING_SECONDS * 2
+    manager.rating_executor.shutdown()
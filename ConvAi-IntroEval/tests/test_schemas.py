@@ -0,0 +1,31 @@
+"""
+Tests for the extraction field list shared by the schema and the prompt
+"""
+
+from app.llm.form_extractor import EXTRACTION_INSTRUCTIONS
+from app.llm.schemas import EXTRACTION_FIELD_COUNT, EXTRACTION_SCHEMA, EXTRACTION_SECTIONS
+
+
+def test_field_count_matches_schema():
+    sections = EXTRACTION_SCHEMA["properties"]
+    assert EXTRACTION_FIELD_COUNT == 44
+    assert sum(len(section["properties"]) for section in sections.values()) == EXTRACTION_FIELD_COUNT
+    assert EXTRACTION_SCHEMA["required"] == list(sections)
+    for section in sections.values():
+        assert section["required"] == list(section["properties"])
+
+
+def test_keys_are_unique():
+    keys = [key for key, _, _ in EXTRACTION_SECTIONS]
+    assert len(set(keys)) == len(keys)
+    for _, _, fields in EXTRACTION_SECTIONS:
+        names = [field for field, _ in fields]
+        assert len(set(names)) == len(names)
+
+
+def test_prompt_names_every_schema_key():
+    """The model is told exactly the keys its output is constrained to"""
+    for key, title, fields in EXTRACTION_SECTIONS:
+        assert f'### {title} ("{key}")' in EXTRACTION_INSTRUCTIONS
+        for field, description in fields:
+            assert f'- "{field}": {description}' in EXTRACTION_INSTRUCTIONS
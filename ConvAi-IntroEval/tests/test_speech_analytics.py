@@ -0,0 +1,83 @@
+"""
+Tests for compute_speech_metrics and describe_pacing edge cases
+"""
+
+import pytest
+
+from speech_analytics import compute_speech_metrics, describe_pacing
+
+RATE_KEYS = ("words_per_minute", "articulation_rate_wpm", "fillers_per_minute")
+
+
+def test_no_speech_returns_empty_metrics():
+    """Blank segments count as no speech"""
+    assert compute_speech_metrics([]) == {}
+    assert compute_speech_metrics([{"start": 0, "end": 2, "text": "  "}]) == {}
+    assert describe_pacing({}) == "Fluency: Not enough speech to measure pacing"
+
+
+@pytest.mark.parametrize("segments", [
+    [{"start": 3.0, "end": 3.0, "text": "Hello everyone"}],
+    [{"start": 1.0, "end": 1.4, "text": "Hi"}, {"start": 1.5, "end": 1.8, "text": "there"}]
+])
+def test_short_speech_span_has_no_rates(segments):
+    """Zero or sub-second spans report no rates instead of dividing by ~0"""
+    metrics = compute_speech_metrics(segments)
+    assert metrics["total_words"] > 0
+    assert all(metrics[key] is None for key in RATE_KEYS)
+    assert metrics["pause_ratio"] is None
+    assert describe_pacing(metrics) == "Fluency: Not enough speech to measure pacing"
+
+
+def test_rates_and_pauses_from_segment_timings():
+    """Pauses are gaps of at least PAUSE_MIN_SECONDS; rates use the speech span"""
+    segments = [
+        {"start": 0.5, "end": 10.5, "text": "one two three four five six seven eight nine ten um"},
+        {"start": 13.5, "end": 20.5, "text": "eleven twelve thirteen fourteen fifteen"},
+        {"start": 20.7, "end": 30.5, "text": "sixteen seventeen eighteen nineteen twenty"}
+    ]
+    metrics = compute_speech_metrics(segments, audio_duration=32.0)
+    assert metrics["duration_seconds"] == 32.0
+    assert metrics["total_words"] == 21
+    assert metrics["words_per_minute"] == 42.0
+    assert metrics["articulation_rate_wpm"] == 46.7
+    assert metrics["pause_count"] == 1
+    assert metrics["long_pause_count"] == 1
+    assert metrics["longest_pause_seconds"] == 3.0
+    assert metrics["pause_ratio"] == 0.1
+    assert metrics["leading_silence_seconds"] == 0.5
+    assert metrics["filler_words"] == {"um": 1}
+    assert metrics["timing_source"] == "segments"
+    assert describe_pacing(metrics).startswith("Fluency: Slow-paced delivery (42 words/min, 10% of the time in pauses")
+
+
+def test_word_timestamps_preferred_when_every_segment_has_them():
+    """Word-level timings catch pauses inside a segment"""
+    segments = [{
+        "start": 0.0, "end": 4.0, "text": "hello there friend",
+        "words": [
+            {"word": "hello", "start": 0.0, "end": 0.5},
+            {"word": "there", "start": 2.5, "end": 3.0},
+            {"word": "friend", "start": 3.1, "end": 4.0}
+        ]
+    }]
+    metrics = compute_speech_metrics(segments)
+    assert metrics["timing_source"] == "words"
+    assert metrics["pause_count"] == 1
+    assert metrics["longest_pause_seconds"] == 2.0
+
+
+def test_batched_transcript_skips_timing_metrics():
+    """Batched decodes hold one segment per window, so no pause or rate metrics"""
+    segments = [
+        {"start": 0.0, "end": 30.0, "text": "word " * 60},
+        {"start": 30.0, "end": 60.0, "text": "um word " * 30}
+    ]
+    metrics = compute_speech_metrics(segments, audio_duration=60.0, decode_mode="batched")
+    assert metrics["timing_source"] == "windows"
+    assert metrics["total_words"] == 120
+    assert metrics["filler_count"] == 30
+    assert all(metrics[key] is None for key in RATE_KEYS)
+    assert metrics["pause_ratio"] is None
+    assert metrics["pause_count"] is None
+    assert describe_pacing(metrics).startswith("Fluency: Pacing not measured")
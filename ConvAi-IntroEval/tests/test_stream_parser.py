@@ -0,0 +1,76 @@
+"""
+Tests for IncrementalJSONParser (streamed LLM output)
+"""
+
+import json
+
+from app.llm.stream_parser import IncrementalJSONParser, partial_token_handler
+
+RESPONSE = {
+    "grading_explanation": {"structure": "Clear opening", "score": 4.5},
+    "insights": ["Confident \"tone\"", "Good pacing, mostly"],
+    "intro_rating": 8,
+    "passed": True,
+    "notes": None
+}
+
+
+def parse_in_chunks(text, chunk_size, max_depth=2):
+    values = []
+    parser = IncrementalJSONParser(lambda path, value: values.append((path, value)), max_depth)
+    for start in range(0, len(text), chunk_size):
+        parser.feed(text[start:start + chunk_size])
+    return values
+
+
+def test_values_reported_regardless_of_chunking():
+    """Every value up to max_depth is reported once, however the text is split"""
+    text = json.dumps(RESPONSE, indent=2)
+    expected = parse_in_chunks(text, len(text))
+    for chunk_size in (1, 3, 7):
+        assert parse_in_chunks(text, chunk_size) == expected
+
+    reported = dict(expected)
+    assert reported[("grading_explanation", "structure")] == "Clear opening"
+    assert reported[("grading_explanation", "score")] == 4.5
+    assert reported[("grading_explanation",)] == RESPONSE["grading_explanation"]
+    assert reported[("insights", 0)] == 'Confident "tone"'
+    assert reported[("insights", 1)] == "Good pacing, mostly"
+    assert reported[("intro_rating",)] == 8
+    assert reported[("passed",)] is True
+    assert reported[("notes",)] is None
+
+
+def test_value_reported_as_soon_as_it_closes():
+    """A section is reported before the rest of the object has arrived"""
+    values = []
+    parser = IncrementalJSONParser(lambda path, value: values.append((path, value)))
+    parser.feed('{"grading_explanation": {"structure": "Clear"}, "insights": ["')
+    assert (("grading_explanation",), {"structure": "Clear"}) in values
+    assert not any(path[0] == "insights" for path, _ in values)
+
+
+def test_max_depth_limits_reported_paths():
+    """Nested values below max_depth are not reported on their own"""
+    values = parse_in_chunks(json.dumps(RESPONSE), 5, max_depth=1)
+    assert all(len(path) == 1 for path, _ in values)
+    assert (("insights",), RESPONSE["insights"]) in values
+
+
+def test_malformed_stream_stops_quietly():
+    """A broken stream stops parsing instead of raising into the generation"""
+    values = []
+    parser = IncrementalJSONParser(lambda path, value: values.append((path, value)))
+    parser.feed('{"score": 4.5.1, "other": "x"}')
+    parser.feed('{"later": 1}')
+    assert values == []
+
+
+def test_partial_token_handler():
+    """on_partial receives the stage and a list path; no listener means no handler"""
+    assert partial_token_handler("intro", None) is None
+
+    partials = []
+    handler = partial_token_handler("intro", lambda stage, path, value: partials.append((stage, path, value)))
+    handler('{"intro_rating": 7}')
+    assert partials == [("intro", ["intro_rating"], 7)]
@@ -0,0 +1,38 @@
+"""
+Tests for trim_repetition (Whisper repetition-loop guardrail)
+
+stt imports Whisper and torch at load time; conftest.py stands in for them
+when they are not installed.
+"""
+
+from stt import trim_repetition
+
+
+def test_repeated_sentence_collapsed_to_one():
+    assert trim_repetition("Thank you. Thank you. Thank you. Thank you.") == "Thank you."
+
+
+def test_text_around_the_loop_is_kept():
+    text = "My name is Priya and I like I like I like I like I like coding in Python."
+    assert trim_repetition(text) == "My name is Priya and I like coding in Python."
+
+
+def test_single_word_loop_ignores_case_and_punctuation():
+    assert trim_repetition("so so, So. so and then") == "so and then"
+
+
+def test_repeats_below_threshold_are_kept():
+    """Ordinary doubled words are not loops"""
+    assert trim_repetition("I had had enough, very very good") == "I had had enough, very very good"
+    assert trim_repetition("go go go", min_repeats=4) == "go go go"
+
+
+def test_phrases_longer_than_max_words_are_not_checked():
+    phrase = "one two three four five"
+    text = " ".join([phrase] * 3)
+    assert trim_repetition(text, max_words=4) == text
+    assert trim_repetition(text, max_words=5) == phrase
+
+
+def test_empty_text():
+    assert trim_repetition("") == ""